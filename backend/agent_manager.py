@@ -6,12 +6,19 @@ Follows the flow: Request → Intent Classification → Retriever → Response G
 from services.intent_service.intent_service import IntentService
 from services.external_api.deepseek_client import DeepSeekClient
 from services.outofscope_service import OutOfScopeService
+from services.context_service import ContextService
+from services.prompt_service import get_prompt_template
+from services.model_router import ModelRouter, is_conclusive_lookup
+from services.fast_answer_service import FastAnswerService
+from services.metrics_service import stage_timer, record_intent, record_answer
+from services.resilience import Deadline
+from config import LLM_DEFAULT_LATENCY_TARGET_MS, GENERATION_MIN_REMAINING_MS
 from services.retrievers.qan_retriever.qan_retriever import qan_retrieve
 from services.retrievers.compatibility_retriever.compatibility_retriever import compatibility_retrieve
 from services.retrievers.symptom_retriever.symptom_retriever import symptom_retrieve
 from services.retrievers.installation_retriever.installation_retriever import installation_retrieve
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class AgentManager:
@@ -28,45 +35,109 @@ class AgentManager:
         self.intent_service = IntentService()
         self.llm_client = DeepSeekClient()
         self.outofscope_service = OutOfScopeService()
+        self.context_service = ContextService()
+        self.model_router = ModelRouter()
+        self.fast_answer_service = FastAnswerService()
     
-    def handle_chat_request(self, query: str, model: str = "deepseek-chat") -> Dict[str, Any]:
+    def handle_chat_request(self, query: str, model: str = "deepseek-chat", latency_target_ms: Optional[int] = None, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Main entry point for chat requests. Follows the complete flow from the diagram on the main README.
         
         Args:
             query: User's question/request
-            model: The model to use for response generation (deepseek-chat or deepseek-reasoning)
+            model: The model the client asked for (deepseek-chat or deepseek-reasoning);
+                   the model router has the final say
+            latency_target_ms: Optional per-request latency target used for routing
+            deadline: End-to-end deadline shared by every stage
+                      (default: Deadline.for_request(latency_target_ms))
             
         Returns:
-            Dict containing response, intent, and any retrieved data
+            Dict containing response, intent, and any retrieved data. "degraded"
+            lists any stage that was skipped or cut short to meet the deadline.
+            "answer_mode" is "template"/"polished" for fast answers, "llm" for a
+            generated answer, "skipped" or "error" when generation didn't run or failed
         """
+        if deadline is None:
+            deadline = Deadline.for_request(latency_target_ms)
         
-        intent = self.intent_service.classify_intent(query)
+        with stage_timer("intent_classification"):
+            classified = self.intent_service.classify(query, deadline=deadline)
+        intent = classified["intent"]
+        record_intent(intent)
         
         # handle out of scope immediately using OutOfScopeService
         if intent == "out_of_scope":
             return self.outofscope_service.get_out_of_scope_response()
         
         # route to appropriate retriever based on intent
-        retrieved_data = self._route_to_retriever(intent, query)
+        with stage_timer(f"{intent}_retrieval"):
+            retrieved_data = self._route_to_retriever(intent, query, deadline=deadline)
+        degraded = classified["degraded"] + (list(retrieved_data.get("degraded", [])) if isinstance(retrieved_data, dict) else [])
         
-        # generate response using LLM with retrieved data
-        response = self._generate_response(intent, query, retrieved_data, model)
+        # conclusive direct lookups (part/model cross-check, exact install manual) are templated, no LLM call
+        with stage_timer("fast_answer"):
+            fast_answer = self.fast_answer_service.answer(intent, retrieved_data)
+        if fast_answer is not None:
+            record_answer(intent, fast_answer["answer_mode"])
+            return {
+                "response": fast_answer["response"],
+                "intent": intent,
+                "retrieved_data": retrieved_data,
+                "model": None,
+                "routing": None,
+                "answer_mode": fast_answer["answer_mode"],
+                "answer_source": fast_answer["answer_source"],
+                "usage": None,
+                "degraded": degraded
+            }
+        
+        # pack the retrieved evidence into the prompt token budget
+        with stage_timer("prompt_build"):
+            context = self.context_service.build_context(intent, retrieved_data)
+        
+        # server-side choice of model and generation limits, never planning past the deadline
+        target_ms = deadline.cap_ms(latency_target_ms or LLM_DEFAULT_LATENCY_TARGET_MS)
+        route = self.model_router.route(
+            intent,
+            requested_model=model,
+            context_tokens=context["tokens"],
+            conclusive=is_conclusive_lookup(intent, retrieved_data),
+            latency_target_ms=target_ms
+        )
+        
+        # generate response using LLM with retrieved data, within what's left of the deadline
+        if deadline.remaining_ms() < GENERATION_MIN_REMAINING_MS:
+            degraded.append("generation_skipped:deadline")
+            generated = {
+                "response": "I'm sorry, this request took too long to complete. Please try again in a moment.",
+                "usage": None,
+                "answer_mode": "skipped"
+            }
+        else:
+            generated = self._generate_response(intent, query, retrieved_data, route["model"], context=context, route=route, timeout=deadline.remaining())
+        record_answer(intent, generated["answer_mode"])
         
         return {
-            "response": response,
+            "response": generated["response"],
             "intent": intent,
             "retrieved_data": retrieved_data,
-            "model": model
+            "model": route["model"],
+            "routing": route,
+            "context_stats": {k: v for k, v in context.items() if k != "text"},
+            "answer_mode": generated["answer_mode"],
+            "answer_source": "llm",
+            "usage": generated["usage"],
+            "degraded": degraded
         }
     
-    def _route_to_retriever(self, intent: str, query: str) -> Any:
+    def _route_to_retriever(self, intent: str, query: str, deadline: Optional[Deadline] = None) -> Any:
         """
         Route query to the appropriate retriever based on classified intent.
         
         Args:
             intent: The classified intent
             query: User's query
+            deadline: Optional request deadline passed to the retriever
             
         Returns:
             Retrieved data from the appropriate retriever
@@ -74,17 +145,17 @@ class AgentManager:
         
         # route to appropriate retriever based on intent
         if intent == "qna":
-            return qan_retrieve(query, appliance=None, k=5)
+            return qan_retrieve(query, appliance=None, k=5, deadline=deadline)
         elif intent == "compatibility":
-            return compatibility_retrieve(query, appliance=None, k=3)
+            return compatibility_retrieve(query, appliance=None, k=3, deadline=deadline)
         elif intent == "installation":
-            return installation_retrieve(query, appliance=None, k=3)
+            return installation_retrieve(query, appliance=None, k=3, deadline=deadline)
         elif intent == "troubleshoot":
-            return symptom_retrieve(query, appliance=None, k=3)
+            return symptom_retrieve(query, appliance=None, k=3, deadline=deadline)
         else: # this is just for safety, this condition can't happen
             return None
     
-    def _generate_response(self, intent: str, query: str, retrieved_data: Any, model: str = "deepseek-chat") -> str:
+    def _generate_response(self, intent: str, query: str, retrieved_data: Any, model: str = "deepseek-chat", context: Optional[Dict[str, Any]] = None, route: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Generate response using DeepSeek LLM based on intent, query, and retrieved data.
         
@@ -93,194 +164,40 @@ class AgentManager:
             query: User's original query
             retrieved_data: Data retrieved from the appropriate retriever
             model: The model to use for response generation
+            context: Prebuilt context from ContextService (built here if not given)
+            route: Routing decision from ModelRouter (max_tokens and temperature)
+            timeout: Seconds the LLM call may take (default: LLM_REQUEST_TIMEOUT_S)
             
         Returns:
-            Generated response string
+            Dict containing the generated "response" string, the API "usage"
+            (None if generation failed) and "answer_mode" ("llm" or "error")
         """
-        # create system prompt based on intent
-        system_prompts = {
-            "compatibility": """You are a PartSelect compatibility specialist with access to enhanced compatibility data including direct JSON mappings and semantic search results.
-
-CRITICAL INSTRUCTIONS FOR ENHANCED DATA STRUCTURE:
-- The retrieved data contains TWO sources: "direct_lookup" and "semantic_search"
-- ALWAYS PRIORITIZE "direct_lookup" results - these are 100% accurate JSON mappings
-- Use "semantic_search" only as supplementary information or when direct lookup is empty
-- NEVER hallucinate part numbers, prices, or descriptions not in the retrieved data
-- Reference the exact confidence levels provided (HIGH, VERY_HIGH)
-
-DIRECT LOOKUP DATA STRUCTURE:
-- "part_to_models": Part number → list of compatible models
-- "model_to_parts": Model number → list of compatible part numbers  
-- "cross_check": Definitive compatibility between specific part + model
-- ALWAYS cite these exact part numbers and model numbers from the data
-
-RESPONSE RULES:
-- If cross_check exists: Use its YES/NO result with VERY_HIGH confidence
-- If direct matches exist: List the exact part numbers or model numbers found
-- DO NOT invent prices, descriptions, or specifications
-- DO NOT reference part numbers not in the retrieved data
-- State when information comes from direct lookup vs semantic search
-
-FORMAT YOUR RESPONSE:
-1. Direct compatibility answer (YES/NO/UNCERTAIN) with confidence level
-2. Exact part numbers or models from direct_lookup results
-3. Cross-check results if available (definitive compatibility)
-4. Semantic search supplements only if relevant
-5. Honest statement about limitations of available data""",
-
-            "troubleshoot": """You are a PartSelect troubleshooting expert with access to real symptom-to-part solution data.
-
-CRITICAL INSTRUCTIONS:
-- ALWAYS reference the specific symptoms, parts, and fix percentages from the retrieved data
-- Cite exact part names and part numbers that fix the reported issue
-- Include the fix percentage when available (e.g., "fixes 57% of cases")
-- Prioritize solutions by their success rates from the data
-- Provide part descriptions and installation difficulty when available
-- Reference multiple solution options from the retrieved results
-- If the symptom isn't clearly covered, suggest related symptoms from the data
-
-FORMAT YOUR RESPONSE:
-1. Problem diagnosis based on retrieved symptoms
-2. Top solutions ranked by fix percentage
-3. Specific part numbers and descriptions
-4. Additional troubleshooting steps if needed
-5. When to call a professional""",
-
-            "qna": """You are a PartSelect appliance parts expert with access to detailed part specifications and technical data.
-
-CRITICAL INSTRUCTIONS:
-- ALWAYS cite specific part numbers, brands, model compatibility, and prices from retrieved data
-- Reference exact part descriptions and technical specifications provided
-- Include installation difficulty, tools required, and safety warnings when available
-- Mention compatible appliance models and brands from the data
-- Provide PartSelect part numbers (PS numbers) for ordering
-- If multiple similar parts exist, explain the differences using retrieved data
-- Always ground your response in the specific retrieved information - don't generalize
-
-FORMAT YOUR RESPONSE:
-1. Direct answer using retrieved part data
-2. Specific part numbers and compatibility info
-3. Technical details and specifications
-4. Installation requirements and difficulty
-5. Pricing and ordering information when available""",
-
-            "installation": """You are a PartSelect installation expert with access to enhanced installation data including direct manual lookup and semantic search results.
-
-CRITICAL INSTRUCTIONS FOR ENHANCED DATA STRUCTURE:
-- The retrieved data contains TWO sources: "direct_lookup" and "semantic_search"
-- ALWAYS PRIORITIZE "direct_lookup" results - these are exact installation manuals for specific parts
-- Use "semantic_search" only as supplementary information or when direct lookup is empty
-- NEVER hallucinate installation steps, tools, or procedures not in the retrieved data
-- Reference the exact confidence levels provided (HIGH, VERY_HIGH)
-
-DIRECT LOOKUP DATA STRUCTURE:
-- "installation_manual": Part number → exact installation instructions
-- ALWAYS cite the specific part numbers and installation text from the data
-
-RESPONSE RULES:
-- If direct matches exist: Use the exact installation text and procedures provided
-- Include specific tools mentioned in the installation text
-- Reference safety warnings and precautions from the data
-- DO NOT invent installation steps not in the retrieved data
-- State when information comes from direct lookup vs semantic search
-
-FORMAT YOUR RESPONSE:
-1. Part identification and confirmation
-2. Step-by-step installation instructions from retrieved data
-3. Required tools and safety precautions mentioned in data
-4. Additional tips or warnings from the installation text
-5. Honest statement about limitations if data is incomplete"""
-        }
-        
-        system_prompt = system_prompts.get(intent, "You are a helpful appliance parts assistant.")
-        
-        # Create user prompt with context - format the retrieved data properly
-        context_text = ""
+        # precompiled template: static system prompt + instructions first, evidence and query last
+        template = get_prompt_template(intent)
         
-        # Handle enhanced data structures (compatibility and installation)
-        if retrieved_data and isinstance(retrieved_data, dict):
-            if "direct_lookup" in retrieved_data and "semantic_search" in retrieved_data:
-                # Enhanced retriever format (compatibility or installation)
-                if intent == "compatibility":
-                    context_text = "COMPATIBILITY DATA RETRIEVED:\n\n"
-                elif intent == "installation":
-                    context_text = "INSTALLATION DATA RETRIEVED:\n\n"
-                else:
-                    context_text = "ENHANCED DATA RETRIEVED:\n\n"
-                
-                # Add extracted identifiers
-                extracted = retrieved_data.get("extracted_identifiers", {})
-                if extracted.get("part_numbers") or extracted.get("model_numbers"):
-                    context_text += f"EXTRACTED FROM QUERY:\n"
-                    context_text += f"- Part Numbers: {extracted.get('part_numbers', [])}\n"
-                    context_text += f"- Model Numbers: {extracted.get('model_numbers', [])}\n\n"
-                
-                # Add direct lookup results (PRIORITY)
-                direct = retrieved_data.get("direct_lookup", {})
-                if direct.get("direct_matches"):
-                    context_text += f"DIRECT LOOKUP RESULTS (Confidence: {direct.get('confidence', 'HIGH')}):\n"
-                    for match in direct["direct_matches"]:
-                        if match.get("type") == "part_to_models":
-                            context_text += f"- Part {match['part_number']} is compatible with {match['count']} models:\n"
-                            context_text += f"  Models: {', '.join(match['compatible_models'][:10])}{'...' if match['count'] > 10 else ''}\n"
-                        elif match.get("type") == "model_to_parts":
-                            context_text += f"- Model {match['model_number']} is compatible with {match['count']} parts:\n"
-                            context_text += f"  Parts: {', '.join(match['compatible_parts'])}\n"
-                        elif match.get("type") == "cross_check":
-                            context_text += f"- CROSS-CHECK RESULTS:\n"
-                            for check in match["cross_check_results"]:
-                                status = "COMPATIBLE" if check["is_compatible"] else "NOT COMPATIBLE"
-                                context_text += f"  {check['part_number']} + {check['model_number']}: {status} (Confidence: {check['confidence']})\n"
-                        elif match.get("type") == "installation_manual":
-                            context_text += f"- INSTALLATION MANUAL for {match['part_number']}:\n"
-                            context_text += f"  Title: {match['title']}\n"
-                            context_text += f"  Instructions: {match['installation_text'][:200]}{'...' if len(match['installation_text']) > 200 else ''}\n"
-                            context_text += f"  Full Instructions: {match['installation_text']}\n"
-                            context_text += f"  URL: {match['url']}\n"
-                            context_text += f"  Confidence: {match['confidence']}\n"
-                    context_text += "\n"
-                
-                # Add semantic search as supplementary
-                semantic = retrieved_data.get("semantic_search", {})
-                if semantic.get("documents") and semantic["documents"][0]:
-                    context_text += "SEMANTIC SEARCH SUPPLEMENTS:\n"
-                    for i, (doc, meta) in enumerate(zip(semantic["documents"][0][:2], semantic["metadatas"][0][:2]), 1):
-                        context_text += f"- Part {meta.get('part_number', 'N/A')}: {meta.get('title', 'N/A')}\n"
-                        context_text += f"  Preview: {doc[:100]}...\n"
-                    context_text += "\n"
-                    
-            elif "documents" in retrieved_data:
-                # Standard retriever format (QnA, troubleshooting, etc.)
-                documents = retrieved_data["documents"][0] if retrieved_data["documents"] else []
-                metadatas = retrieved_data["metadatas"][0] if retrieved_data.get("metadatas") else []
-                
-                context_text = "Here are relevant appliance parts and information:\n\n"
-                for i, (doc, meta) in enumerate(zip(documents, metadatas), 1):
-                    part_id = meta.get("part_id", meta.get("part_number", "Unknown"))
-                    brand = meta.get("brand", "Unknown")
-                    title = meta.get("title", "Unknown Part")
-                    price = meta.get("price", "N/A")
-                    
-                    context_text += f"Part {i}: {title} ({brand})\n"
-                    context_text += f"Part ID: {part_id} | Price: ${price}\n"
-                    context_text += f"Description: {doc}\n\n"
+        # token-budgeted evidence, direct lookup results packed first
+        if context is None:
+            context = self.context_service.build_context(intent, retrieved_data)
         
-        user_prompt = f"""User Question: {query}
-
-{context_text}
-
-Based on the specific parts and information above, please provide a detailed, helpful response that references the actual parts, their part numbers, brands, and prices when relevant. Use the technical details from the part descriptions to give accurate information."""
+        user_prompt = template.render_user_prompt(query, context["text"])
 
         try:
-            return self.llm_client.chat_with_system(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                model=model,
-                max_tokens=500,
-                temperature=0.7
-            )
+            with stage_timer("llm_generation"):
+                completion = self.llm_client.chat_completion(
+                    system_prompt=template.system_prompt,
+                    user_prompt=user_prompt,
+                    model=model,
+                    max_tokens=route["max_tokens"] if route else 500,
+                    temperature=route["temperature"] if route else 0.7,
+                    timeout=timeout
+                )
+            return {"response": completion["content"], "usage": completion["usage"], "answer_mode": "llm"}
         except Exception as e:
-            return f"I apologize, but I encountered an error while generating a response. Please try rephrasing your question. Error: {str(e)}"
+            return {
+                "response": f"I apologize, but I encountered an error while generating a response. Please try rephrasing your question. Error: {str(e)}",
+                "usage": None,
+                "answer_mode": "error"
+            }
     
     def get_intent_only(self, query: str) -> str:
         """
@@ -1,13 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
+from contextlib import asynccontextmanager
 from agent_manager import AgentManager
 from services.health_service.health_service import HealthService
-from services.intent_service.intent_service import IntentService
+from services.health_service.health_prober import get_health_prober
+from services.resilience import Deadline
+from services.response_service import FastJSONResponse, project_chat_response
+from services.metrics_service import stage_timer, render_metrics
+from services.tracing_service import start_trace, current_trace
+from services.profiling_service import get_request_profiler
+from services.runtime_service import EventLoopLagMonitor, collect_runtime_stats
+from config import RESPONSE_COMPRESSION_MIN_BYTES, TRACE_FORCE_HEADER, TRACE_ADMIN_TOKEN, TRACE_TRUST_TRACEPARENT, DEBUG_ADMIN_TOKEN, EVENT_LOOP_LAG_INTERVAL_MS, INTENT_BATCH_MAX_QUERIES
+import hmac
 import time
 
-app = FastAPI(title="PartSelect Assistant API", version="1.0.0")
+# samples how late the event loop runs scheduled callbacks (reported by /debug/runtime)
+loop_lag_monitor = EventLoopLagMonitor(interval_ms=EVENT_LOOP_LAG_INTERVAL_MS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # dependency checks run in the background; /health/ready reads their cached results
+    prober = get_health_prober()
+    prober.start()
+    loop_lag_monitor.start()
+    yield
+    loop_lag_monitor.stop()
+    prober.stop()
+
+app = FastAPI(title="PartSelect Assistant API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -18,14 +42,44 @@ app.add_middleware(
     allow_headers=["*"], # allow all headers
 )
 
+# compress large bodies; brotli when available (it falls back to gzip for clients without br)
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
+
+# trace sampled requests and summarize their spans in a Server-Timing header;
+# outside callers can't force sampling (and exporter load) past TRACE_SAMPLE_RATE
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    force_token = request.headers.get(TRACE_FORCE_HEADER)
+    trusted = bool(TRACE_ADMIN_TOKEN and force_token and hmac.compare_digest(force_token, TRACE_ADMIN_TOKEN))
+    with start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        force=trusted,
+        trust_parent=trusted or TRACE_TRUST_TRACEPARENT
+    ) as trace:
+        response = await call_next(request)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
 # Pydantic models for request/response validation
 class ChatRequest(BaseModel):
     query: str
-    model: str = "deepseek-chat"
+    model: str = "deepseek-chat"  # a preference; the server's model router decides
+    latency_target_ms: Optional[int] = None
+    view: Optional[Literal["answer", "cards", "debug"]] = None  # default: CHAT_RESPONSE_VIEW
 
 class QueryRequest(BaseModel):
     query: str
 
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(..., max_length=INTENT_BATCH_MAX_QUERIES)
+
 class SearchRequest(BaseModel):
     query: str
     k: int = 5
@@ -39,6 +93,9 @@ class IntentResponse(BaseModel):
     query: str
     intent: str
 
+class BatchIntentResponse(BaseModel):
+    results: List[IntentResponse]
+
 class SearchResponse(BaseModel):
     query: str
     results: List[Any]
@@ -48,19 +105,43 @@ START_TIME = time.time()
 
 # services
 health_service = HealthService(START_TIME)
-intent_service = IntentService()
 
-# manager instance
+# manager instance; /intents shares its IntentService (and batcher) with /chat
 agent_manager = AgentManager()
+intent_service = agent_manager.intent_service
 
-@app.post("/chat")
-async def chat(request: ChatRequest) -> Dict[str, Any]:
+@app.post("/chat", response_class=FastJSONResponse)
+async def chat(request: ChatRequest, x_profile_token: Optional[str] = Header(None)) -> FastJSONResponse:
     """
     Main chat endpoint - handles user queries through the complete flow:
     Intent Classification → Retriever → Response Generation
+
+    Send X-Profile-Token: <PROFILE_ADMIN_TOKEN> to profile this request.
     """
-    response = agent_manager.handle_chat_request(request.query, request.model)
-    return response
+    # one end-to-end deadline, started at the edge and shared by every stage;
+    # a longer latency target (up to REQUEST_MAX_DEADLINE_MS) extends it
+    deadline = Deadline.for_request(request.latency_target_ms)
+    
+    # the pipeline is blocking; run it off the event loop so concurrent requests
+    # overlap and their embedding calls can be coalesced into shared batches
+    args = (request.query, request.model, request.latency_target_ms, deadline)
+    headers = {}
+    with stage_timer("chat_total"):
+        profiler = get_request_profiler()
+        if profiler.should_profile(x_profile_token):
+            # sampled in the worker thread; folded stacks go to PROFILE_OUTPUT_DIR
+            trace = current_trace()
+            response, profile_path = await run_in_threadpool(
+                profiler.run, agent_manager.handle_chat_request, *args, request_id=trace.trace_id if trace else None
+            )
+            # randomly sampled requests are profiled silently; only an admin learns the file name
+            if profile_path and profiler.is_admin(x_profile_token):
+                headers["X-Profile-File"] = profile_path.rsplit("/", 1)[-1]
+        else:
+            response = await run_in_threadpool(agent_manager.handle_chat_request, *args)
+    
+    # the browser renders the answer; full retrieval data only in the debug view
+    return FastJSONResponse(project_chat_response(response, request.view), headers=headers)
 
 @app.get("/health")
 async def health() -> HealthResponse:
@@ -70,15 +151,70 @@ async def health() -> HealthResponse:
     health_data = health_service.get_health_status()
     return HealthResponse(**health_data)
 
+@app.get("/health/live")
+async def health_live() -> HealthResponse:
+    """
+    Liveness probe - the process is up; never checks dependencies
+    """
+    return HealthResponse(**health_service.get_liveness_status())
+
+@app.get("/health/ready", response_class=FastJSONResponse)
+async def health_ready() -> FastJSONResponse:
+    """
+    Readiness probe - cached results of the background dependency checks
+    (collection counts, map sizes, upstream reachability, circuit states).
+    503 when a critical dependency is down so the load balancer stops routing here
+    """
+    status = health_service.get_readiness_status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """
+    Prometheus metrics endpoint - per-stage latency histograms, in-flight
+    gauges, and intent / cache / token / upstream error counters
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/debug/runtime", response_class=FastJSONResponse)
+async def debug_runtime(x_admin_token: Optional[str] = Header(None)) -> FastJSONResponse:
+    """
+    Admin runtime internals - lookup map memory, cache hit rates and entry
+    counts, event-loop lag, executor / batcher queue depths and open upstream
+    connections. Requires X-Admin-Token: <DEBUG_ADMIN_TOKEN>
+    """
+    if not DEBUG_ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token, DEBUG_ADMIN_TOKEN):
+        raise HTTPException(status_code=404)
+    # runs on the loop on purpose: the threadpool stats must be read from it
+    return FastJSONResponse(collect_runtime_stats(agent_manager, lag_monitor=loop_lag_monitor))
+
 @app.post("/intents")
 async def intents(request: QueryRequest) -> IntentResponse:
     """
     Intent classification endpoint - classifies user queries into intent categories
     """
-    intent = intent_service.classify_intent(request.query)
+    classified = await run_in_threadpool(intent_service.classify, request.query)
+    if classified["degraded"]:
+        raise HTTPException(status_code=503, detail="Intent classification is temporarily unavailable")
     return IntentResponse(
         query=request.query,
-        intent=intent
+        intent=classified["intent"]
+    )
+
+@app.post("/intents/batch")
+async def intents_batch(request: BatchQueryRequest) -> BatchIntentResponse:
+    """
+    Batch intent classification endpoint - classifies many queries with one LLM call
+    per chunk (used for offline labeling jobs)
+    """
+    try:
+        intents = await run_in_threadpool(intent_service.classify_intents, request.queries)
+    except Exception as e:
+        print(f"Error in batch intent classification: {e}")
+        raise HTTPException(status_code=503, detail="Intent classification is temporarily unavailable")
+    return BatchIntentResponse(
+        results=[IntentResponse(query=q, intent=i) for q, i in zip(request.queries, intents)]
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+"""
+Benchmarks Package
+
+Offline end-to-end benchmarks for the PartSelect Assistant API, run against
+local stand-ins for the DeepSeek and OpenAI APIs.
+"""
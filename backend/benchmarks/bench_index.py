@@ -0,0 +1,147 @@
+"""
+Bench Index - Builds Chroma stores for benchmarks with stand-in embeddings
+
+Mirrors the ingest scripts (partselect-docs from the JSON files, the
+installation passages from installation_passages.json, the per-appliance
+parts collections from the CSVs) but embeds with the stub
+server's deterministic vectors, so queries embedded through the stand-in
+OpenAI API find sensible neighbours without an API key.
+"""
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict
+
+import chromadb
+import pandas as pd
+from chromadb.config import Settings
+
+from benchmarks.stub_servers import stub_embedding
+from config import BACKEND_DIR, INSTALLATION_PASSAGES_COLLECTION
+from services.embedding_service import CoalescingOpenAIEmbeddingFunction
+
+sys.path.append(str(BACKEND_DIR / "scripts" / "ingest"))
+from build_installation_passages import passage_items  # noqa: E402
+from ingest_compatibility_installation_troubleshooting import load_json, to_doc  # noqa: E402
+
+DATA_DIR = BACKEND_DIR / "data"
+DOCS_FILES = {
+    "installation": DATA_DIR / "installation.json",
+    "compatibility": DATA_DIR / "compatibility.json",
+    "troubleshooting": DATA_DIR / "troubleshooting.json",
+}
+PASSAGES_FILE = DATA_DIR / "maps" / "installation_passages.json"
+PARTS_FILES = {
+    "dishwasher_parts": DATA_DIR / "appliance_parts_dishwasher.csv",
+    "refrigerator_parts": DATA_DIR / "appliance_parts_refrigerator.csv",
+}
+
+
+def build_docs_store(path: Path) -> int:
+    """partselect-docs, as ingest_compatibility_installation_troubleshooting.py builds it"""
+    client = chromadb.Client(Settings(is_persistent=True, persist_directory=str(path)))
+    collection = client.get_or_create_collection(
+        name="partselect-docs",
+        embedding_function=_embedding_function(),
+    )
+
+    docs: Dict[str, Dict] = {}
+    for source, file_path in DOCS_FILES.items():
+        for raw in load_json(file_path):
+            doc = to_doc(source, raw)
+            if doc["document"]:
+                docs.setdefault(doc["id"], doc)
+
+    rows = list(docs.values())
+    for i in range(0, len(rows), 128):
+        chunk = rows[i:i + 128]
+        collection.add(
+            ids=[d["id"] for d in chunk],
+            documents=[d["document"] for d in chunk],
+            metadatas=[d["metadata"] for d in chunk],
+            embeddings=[stub_embedding(d["document"]) for d in chunk],
+        )
+    return len(rows)
+
+
+def build_passages_collection(path: Path) -> int:
+    """installation-passages in the docs store, as build_installation_passages.py builds it"""
+    client = chromadb.Client(Settings(is_persistent=True, persist_directory=str(path)))
+    collection = client.get_or_create_collection(
+        name=INSTALLATION_PASSAGES_COLLECTION,
+        embedding_function=_embedding_function(),
+        metadata={"hnsw:space": "cosine"},
+    )
+
+    appliances = {r.get("part_number"): r.get("appliance", "") for r in load_json(DOCS_FILES["installation"])}
+    items = passage_items(json.loads(PASSAGES_FILE.read_text()), appliances)
+    for i in range(0, len(items), 128):
+        chunk = items[i:i + 128]
+        collection.add(
+            ids=[d["id"] for d in chunk],
+            documents=[d["text"] for d in chunk],
+            metadatas=[d["metadata"] for d in chunk],
+            embeddings=[stub_embedding(d["text"]) for d in chunk],
+        )
+    return len(items)
+
+
+def build_parts_store(path: Path) -> int:
+    """dishwasher_parts / refrigerator_parts, as ingest_parts.py builds them"""
+    client = chromadb.PersistentClient(path=str(path))
+    total = 0
+    for collection_name, csv_path in PARTS_FILES.items():
+        df = pd.read_csv(csv_path).fillna("").drop_duplicates(subset=["part_id"]).reset_index(drop=True)
+        collection = client.get_or_create_collection(collection_name, metadata={"hnsw:space": "cosine"})
+        docs = (
+            df["title"] + " — " + df["description"] +
+            " | brand: " + df["brand"] + " | part_id: " + df["part_id"]
+        ).tolist()
+        ids = df["part_id"].tolist()
+        metas = df.to_dict(orient="records")
+        for i in range(0, len(docs), 128):
+            collection.add(
+                ids=ids[i:i + 128],
+                documents=docs[i:i + 128],
+                metadatas=metas[i:i + 128],
+                embeddings=[stub_embedding(d) for d in docs[i:i + 128]],
+            )
+        total += len(docs)
+    return total
+
+
+def _embedding_function() -> CoalescingOpenAIEmbeddingFunction:
+    return CoalescingOpenAIEmbeddingFunction(api_key="benchmark", model_name="text-embedding-3-small")
+
+
+def _has_collection(path: Path, name: str) -> bool:
+    client = chromadb.Client(Settings(is_persistent=True, persist_directory=str(path)))
+    return name in {getattr(c, "name", c) for c in client.list_collections()}
+
+
+def build_bench_index(root: Path, rebuild: bool = False) -> Dict[str, str]:
+    """
+    Build (or reuse) the benchmark stores under `root`.
+
+    Args:
+        root: Directory holding the docs/ and parts/ stores
+        rebuild: Delete and rebuild existing stores
+
+    Returns:
+        Env vars pointing the retrievers at the stores
+    """
+    docs_path, parts_path = root / "docs", root / "parts"
+    if rebuild and root.exists():
+        shutil.rmtree(root)
+    if not (docs_path / "chroma.sqlite3").exists() or not (parts_path / "chroma.sqlite3").exists():
+        root.mkdir(parents=True, exist_ok=True)
+        print(f"📦 building benchmark index in {root} ...")
+        print(f"   partselect-docs: {build_docs_store(docs_path)} docs")
+        print(f"   {INSTALLATION_PASSAGES_COLLECTION}: {build_passages_collection(docs_path)} passages")
+        print(f"   parts: {build_parts_store(parts_path)} parts")
+    elif not _has_collection(docs_path, INSTALLATION_PASSAGES_COLLECTION):
+        # index built before passages existed
+        print(f"📦 adding {INSTALLATION_PASSAGES_COLLECTION} to {docs_path} ...")
+        print(f"   {INSTALLATION_PASSAGES_COLLECTION}: {build_passages_collection(docs_path)} passages")
+    return {"CHROMA_DOCS_PATH": str(docs_path), "CHROMA_PARTS_PATH": str(parts_path)}
@@ -0,0 +1,230 @@
+"""
+HNSW Sweep - Recall vs latency vs memory for the vector collections
+
+The collections are built with Chroma's default HNSW settings. This sweep
+copies the vectors of partselect-docs, dishwasher_parts and
+refrigerator_parts into scratch collections built with different
+construction parameters (M / max_neighbors, ef_construction), then varies
+ef_search on each. Every configuration is scored against exact brute-force
+ground truth computed with numpy:
+
+- recall@k: share of the true k nearest neighbours returned
+- query latency p50/p95, one query per call as in production
+- build time and estimated index memory
+
+partselect-docs is queried with the production `source` filter, and its
+ground truth is restricted to the same source. Queries are stored vectors
+with Gaussian noise added, so no embedding API is needed. When the real
+stores aren't available, the benchmark index (stand-in embeddings) is used.
+
+    python -m benchmarks.hnsw_sweep --m 8,16,32 --ef-construction 100,200 --ef-search 10,20,50,100 --k 5
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from benchmarks.run_benchmark import BENCH_DIR, git_commit, percentile
+from config import CHROMA_DOCS_PATH, CHROMA_PARTS_PATH
+
+# collection -> (store, metadata field used as the production filter)
+COLLECTIONS = {
+    "partselect-docs": ("docs", "source"),
+    "dishwasher_parts": ("parts", None),
+    "refrigerator_parts": ("parts", None),
+}
+
+
+def open_store(path: str) -> Any:
+    return chromadb.Client(Settings(is_persistent=True, persist_directory=str(path)))
+
+
+def load_vectors(client: Any, name: str, filter_field: Optional[str]) -> Optional[Dict[str, Any]]:
+    """All ids, vectors and filter values of a collection (None if missing or empty)"""
+    try:
+        collection = client.get_collection(name)
+    except Exception:
+        return None
+    data = collection.get(include=["embeddings", "metadatas"])
+    if not len(data["ids"]):
+        return None
+    space = (collection.configuration.get("hnsw") or {}).get("space") or (collection.metadata or {}).get("hnsw:space", "l2")
+    return {
+        "ids": list(data["ids"]),
+        "vectors": np.asarray(data["embeddings"], dtype=np.float32),
+        "groups": [(m or {}).get(filter_field) for m in data["metadatas"]] if filter_field else None,
+        "space": space,
+    }
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Noisy copies of randomly chosen stored vectors; returns (queries, source row indices)"""
+    rows = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    base = vectors[rows]
+    scale = np.linalg.norm(base, axis=1, keepdims=True) / np.sqrt(vectors.shape[1])
+    return (base + noise * scale * rng.standard_normal(base.shape)).astype(np.float32), rows
+
+
+def brute_force(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """Exact k nearest neighbours (row indices) under the collection's distance"""
+    if space == "cosine":
+        v = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        q = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        distances = -q @ v.T
+    elif space == "ip":
+        distances = -queries @ vectors.T
+    else:
+        distances = (queries ** 2).sum(1, keepdims=True) - 2 * queries @ vectors.T + (vectors ** 2).sum(1)
+    k = min(k, vectors.shape[0])
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(np.take_along_axis(distances, top, axis=1), axis=1), axis=1)
+
+
+def estimate_index_mb(n: int, dim: int, m: int) -> float:
+    """
+    hnswlib memory: every element stores its vector, 2*M level-0 links and a
+    label; about 1/ln(M) of elements also keep M links per upper level.
+    """
+    level0 = n * (dim * 4 + (2 * m + 1) * 4 + 8)
+    upper = n * (m + 1) * 4 / max(np.log(m), 1.0)
+    return round((level0 + upper) / (1024 * 1024), 2)
+
+
+def sweep_collection(name: str, data: Dict[str, Any], args: argparse.Namespace, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    vectors, ids, groups, space = data["vectors"], data["ids"], data["groups"], data["space"]
+    queries, rows = make_queries(vectors, args.queries, args.noise, rng)
+
+    # ground truth per query, restricted to the query's filter group when the collection is filtered in production
+    truth: List[set] = []
+    for query, row in zip(queries, rows):
+        if groups is not None:
+            members = np.array([i for i, g in enumerate(groups) if g == groups[row]])
+            nearest = members[brute_force(vectors[members], query[None, :], args.k, space)[0]]
+        else:
+            nearest = brute_force(vectors, query[None, :], args.k, space)[0]
+        truth.append({ids[i] for i in nearest})
+
+    scratch = chromadb.EphemeralClient()
+    results = []
+    for m in args.m:
+        for ef_construction in args.ef_construction:
+            scratch_name = f"sweep-{name}-m{m}-efc{ef_construction}"
+            collection = scratch.create_collection(
+                scratch_name,
+                configuration={"hnsw": {"space": space, "max_neighbors": m, "ef_construction": ef_construction, "ef_search": max(args.ef_search)}},
+            )
+            started = time.perf_counter()
+            for i in range(0, len(ids), 1000):
+                collection.add(
+                    ids=ids[i:i + 1000],
+                    embeddings=vectors[i:i + 1000],
+                    metadatas=[{"group": g} for g in groups[i:i + 1000]] if groups is not None else None,
+                )
+            build_s = time.perf_counter() - started
+
+            for ef_search in args.ef_search:
+                collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+                latencies, hits = [], 0
+                for query, row, expected in zip(queries, rows, truth):
+                    where = {"group": groups[row]} if groups is not None else None
+                    t = time.perf_counter()
+                    found = collection.query(query_embeddings=[query.tolist()], n_results=args.k, where=where, include=[])
+                    latencies.append((time.perf_counter() - t) * 1000.0)
+                    hits += len(expected & set(found["ids"][0]))
+
+                results.append({
+                    "collection": name,
+                    "space": space,
+                    "vectors": len(ids),
+                    "dim": int(vectors.shape[1]),
+                    "m": m,
+                    "ef_construction": ef_construction,
+                    "ef_search": ef_search,
+                    f"recall@{args.k}": round(hits / sum(len(t) for t in truth), 4),
+                    "latency_p50_ms": percentile(latencies, 50),
+                    "latency_p95_ms": percentile(latencies, 95),
+                    "build_s": round(build_s, 3),
+                    "est_index_mb": estimate_index_mb(len(ids), int(vectors.shape[1]), m),
+                })
+            scratch.delete_collection(scratch_name)
+
+    mark_pareto(results, f"recall@{args.k}")
+    return results
+
+
+def mark_pareto(results: List[Dict[str, Any]], recall_key: str):
+    """Flag configurations no other configuration beats on both recall and p95 latency"""
+    for r in results:
+        r["pareto"] = not any(
+            o is not r and o[recall_key] >= r[recall_key] and o["latency_p95_ms"] <= r["latency_p95_ms"]
+            and (o[recall_key] > r[recall_key] or o["latency_p95_ms"] < r["latency_p95_ms"])
+            for o in results
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall/latency sweep")
+    parser.add_argument("--m", default="8,16,32,48", help="max_neighbors (M) values")
+    parser.add_argument("--ef-construction", default="100,200,400")
+    parser.add_argument("--ef-search", default="10,20,50,100,200")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per collection")
+    parser.add_argument("--noise", type=float, default=0.3, help="Query noise relative to the vector scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--collections", default=",".join(COLLECTIONS))
+    parser.add_argument("--docs-path", default=CHROMA_DOCS_PATH)
+    parser.add_argument("--parts-path", default=CHROMA_PARTS_PATH)
+    parser.add_argument("--out", default=str(BENCH_DIR / "results"))
+    args = parser.parse_args()
+    args.m = [int(v) for v in args.m.split(",")]
+    args.ef_construction = [int(v) for v in args.ef_construction.split(",")]
+    args.ef_search = [int(v) for v in args.ef_search.split(",")]
+
+    stores = {"docs": open_store(args.docs_path), "parts": open_store(args.parts_path)}
+    bench_stores = None
+    rng = np.random.default_rng(args.seed)
+
+    all_results, sources = [], {}
+    for name in args.collections.split(","):
+        store, filter_field = COLLECTIONS[name]
+        data = load_vectors(stores[store], name, filter_field)
+        sources[name] = "store"
+        if data is None:
+            # no real store here; fall back to the benchmark index built with stand-in embeddings
+            if bench_stores is None:
+                from benchmarks.bench_index import build_bench_index
+                paths = build_bench_index(BENCH_DIR / ".bench_index")
+                bench_stores = {"docs": open_store(paths["CHROMA_DOCS_PATH"]), "parts": open_store(paths["CHROMA_PARTS_PATH"])}
+            data = load_vectors(bench_stores[store], name, filter_field)
+            sources[name] = "bench_index"
+        print(f"🔎 {name}: {len(data['ids'])} vectors ({sources[name]}, {data['space']})")
+
+        for r in sweep_collection(name, data, args, rng):
+            all_results.append(r)
+            print(
+                f"   M={r['m']:<3} efC={r['ef_construction']:<4} ef={r['ef_search']:<4} "
+                f"recall@{args.k} {r[f'recall@{args.k}']:.3f}  p50 {r['latency_p50_ms']}ms  p95 {r['latency_p95_ms']}ms  "
+                f"~{r['est_index_mb']}MB{'  *' if r['pareto'] else ''}"
+            )
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    commit = git_commit()
+    out_path = out_dir / f"hnsw_{time.strftime('%Y%m%d-%H%M%S')}{'_' + commit if commit else ''}.json"
+    out_path.write_text(json.dumps({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "settings": {k: v for k, v in vars(args).items() if k not in ("out",)},
+        "vector_sources": sources,
+        "results": all_results,
+    }, indent=2))
+    print(f"✅ results written to {out_path} (* = on the recall/p95 Pareto front)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Load Driver - Replays a workload against /chat at a target request rate
+
+Open loop: requests are scheduled at the target rate (constant spacing or
+Poisson arrivals) whether or not earlier ones have finished, which is how
+real users arrive. Latency is measured from each request's scheduled send
+time, so queueing inside the driver when the API falls behind is counted
+rather than hidden (no coordinated omission). The service time from the
+actual send is recorded too.
+
+Against a running API:
+    python -m benchmarks.load_driver --url http://127.0.0.1:8000 --rate 20 --duration 60 --seed 7
+
+Fully offline (starts the stand-ins and the API like run_benchmark):
+    python -m benchmarks.load_driver --with-stubs --rate 20 --duration 60 --seed 7
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.run_benchmark import BENCH_DIR, git_commit, process_memory_mb, summarize
+from benchmarks.workload import WorkloadGenerator, parse_mix
+
+
+def load_workload(path: Optional[str], count: int, seed: int, mix: Optional[Dict[str, float]], zipf_s: float) -> List[Dict[str, Any]]:
+    """Queries from a JSONL workload file, or freshly generated from the seed"""
+    if path:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()][:count]
+    return WorkloadGenerator(seed=seed, mix=mix, zipf_s=zipf_s).generate(count)
+
+
+async def drive(base_url: str, workload: List[Dict[str, Any]], rate: float, arrivals: str, seed: int, max_in_flight: int, view: str, timeout_s: float) -> List[Dict[str, Any]]:
+    """
+    Send every workload query at `rate` requests/s.
+
+    Returns:
+        One record per request: path, intent, status, latency_ms (from the
+        scheduled time), service_ms (from the actual send) and answer_mode
+    """
+    rng = random.Random(f"{seed}:arrivals")
+    offsets, t = [], 0.0
+    for _ in workload:
+        offsets.append(t)
+        t += rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    records: List[Dict[str, Any]] = []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout_s) as client:
+        started = time.perf_counter()
+
+        async def one(item: Dict[str, Any], offset: float):
+            await asyncio.sleep(max(0.0, started + offset - time.perf_counter()))
+            scheduled = started + offset
+            async with in_flight:
+                sent = time.perf_counter()
+                status, answer_mode = 0, None
+                try:
+                    response = await client.post("/chat", json={"query": item["query"], "view": view})
+                    status = response.status_code
+                    if status == 200:
+                        answer_mode = response.json().get("answer_mode")
+                except httpx.HTTPError:
+                    pass
+                finished = time.perf_counter()
+            records.append({
+                "path": item.get("path"),
+                "intent": item.get("intent"),
+                "status": status,
+                "answer_mode": answer_mode,
+                "latency_ms": round((finished - scheduled) * 1000.0, 2),
+                "service_ms": round((finished - sent) * 1000.0, 2),
+            })
+
+        await asyncio.gather(*(one(item, offset) for item, offset in zip(workload, offsets)))
+    return records
+
+
+def report(records: List[Dict[str, Any]], duration_s: float) -> Dict[str, Any]:
+    ok = [r for r in records if r["status"] == 200]
+    by_path: Dict[str, List[float]] = {}
+    for r in ok:
+        by_path.setdefault(r["path"], []).append(r["latency_ms"])
+    return {
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "duration_s": round(duration_s, 3),
+        "achieved_rps": round(len(ok) / duration_s, 2) if duration_s else None,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "service_ms": summarize([r["service_ms"] for r in ok]),
+        "by_path": {path: summarize(values) for path, values in sorted(by_path.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop /chat load driver")
+    parser.add_argument("--url", default="", help="Base URL of a running API")
+    parser.add_argument("--with-stubs", action="store_true", help="Start the API against local stand-ins instead of --url")
+    parser.add_argument("--rate", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic (count = rate * duration)")
+    parser.add_argument("--arrivals", default="poisson", choices=["poisson", "constant"])
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--workload", default="", help="JSONL file from benchmarks.workload (generated from --seed if empty)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", default="", help="Intent weights for a generated workload")
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--view", default="cards", choices=["answer", "cards", "debug"])
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--llm-latency", default="lognormal:800,0.5", help="Stub LLM latency (with --with-stubs)")
+    parser.add_argument("--embed-latency", default="lognormal:120,0.3", help="Stub embeddings latency (with --with-stubs)")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the API process (with --with-stubs)")
+    parser.add_argument("--label", default="")
+    parser.add_argument("--out", default=str(BENCH_DIR / "results"))
+    parser.add_argument("--records-out", default="", help="Optional JSONL file for per-request records")
+    args = parser.parse_args()
+
+    count = max(1, int(args.rate * args.duration))
+    workload = load_workload(args.workload, count, args.seed, parse_mix(args.mix) if args.mix else None, args.zipf)
+
+    api, stub = None, None
+    base_url = args.url
+    if args.with_stubs:
+        from benchmarks.bench_index import build_bench_index
+        from benchmarks.run_benchmark import free_port, start_api
+        from benchmarks.stub_servers import start_stub_server
+
+        stub = start_stub_server(0, args.llm_latency, args.embed_latency, seed=args.seed)
+        stub_url = f"http://127.0.0.1:{stub.server_port}/v1"
+        env = {
+            "DEEPSEEK_API_KEY": "benchmark",
+            "DEEPSEEK_BASE_URL": stub_url,
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": stub_url,
+            **build_bench_index(BENCH_DIR / ".bench_index"),
+            **dict(item.split("=", 1) for item in args.env),
+        }
+        port = free_port()
+        api = start_api(port, env)
+        base_url = f"http://127.0.0.1:{port}"
+    elif not base_url:
+        raise SystemExit("pass --url or --with-stubs")
+
+    try:
+        started = time.perf_counter()
+        records = asyncio.run(drive(base_url, workload, args.rate, args.arrivals, args.seed, args.max_in_flight, args.view, args.timeout))
+        summary = report(records, time.perf_counter() - started)
+        if api is not None:
+            summary["server_memory"] = process_memory_mb(api.pid)
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait(timeout=10)
+        if stub is not None:
+            stub.shutdown()
+
+    lat = summary["latency_ms"]
+    print(f"target {args.rate} req/s → achieved {summary['achieved_rps']} req/s, errors {summary['errors']}")
+    print(f"latency p50 {lat['p50']}ms  p95 {lat['p95']}ms  p99 {lat['p99']}ms")
+
+    result = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "settings": {
+            "rate": args.rate,
+            "duration": args.duration,
+            "arrivals": args.arrivals,
+            "seed": args.seed,
+            "mix": args.mix or "default",
+            "zipf": args.zipf,
+            "workload": args.workload or "generated",
+            "with_stubs": args.with_stubs,
+        },
+        "summary": summary,
+    }
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = "_".join(p for p in ["load", time.strftime("%Y%m%d-%H%M%S"), result["git_commit"] or "", args.label] if p)
+    out_path = out_dir / f"{name}.json"
+    out_path.write_text(json.dumps(result, indent=2))
+    if args.records_out:
+        with open(args.records_out, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    print(f"✅ results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
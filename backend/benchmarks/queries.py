@@ -0,0 +1,63 @@
+"""
+Benchmark queries - A fixed query set covering every intent path
+
+Identifiers come from the data maps, so the compatibility cross-check and
+installation manual paths hit real direct-lookup entries.
+"""
+import json
+import re
+from typing import List, Tuple
+
+from config import BACKEND_DIR
+
+MAPS_DIR = BACKEND_DIR / "data" / "maps"
+
+# model numbers the compatibility retriever's extraction regexes recognise
+MODEL_PATTERN = re.compile(r"^[A-Z]{2,4}\d{3,4}[A-Z]{2,4}\d{0,2}$")
+
+
+def benchmark_queries(per_path: int = 3) -> List[Tuple[str, str]]:
+    """
+    (path, query) pairs, `per_path` per pipeline path.
+
+    Paths: compatibility_cross_check, compatibility_semantic,
+    installation_manual, installation_semantic, troubleshoot, qna, out_of_scope.
+    """
+    parts_to_models = json.loads((MAPS_DIR / "parts_to_models.json").read_text())
+    installation_manual = json.loads((MAPS_DIR / "installation_manual.json").read_text())
+
+    pairs = [(part, model) for part, models in sorted(parts_to_models.items()) for model in models if MODEL_PATTERN.match(model)]
+    step = max(1, len(pairs) // per_path)
+    cross_checks = [f"Is {part} compatible with my {model}?" for part, model in pairs[::step][:per_path]]
+    manual = [f"How do I install {part}?" for part in sorted(installation_manual)[:per_path]]
+
+    paths = {
+        "compatibility_cross_check": cross_checks,
+        "compatibility_semantic": [
+            "Will this drain pump work with my Whirlpool dishwasher?",
+            "Is the door shelf bin compatible with Frigidaire refrigerators?",
+            "Does the upper rack adjuster fit Kenmore dishwashers?",
+        ],
+        "installation_manual": manual,
+        "installation_semantic": [
+            "How do I replace the water inlet valve on my refrigerator?",
+            "How do I install a new dishwasher door gasket?",
+            "How do I replace the ice maker assembly?",
+        ],
+        "troubleshoot": [
+            "My dishwasher is not draining properly",
+            "The ice maker stopped making ice",
+            "My refrigerator is leaking water on the floor",
+        ],
+        "qna": [
+            "What does the drain pump do?",
+            "Tell me about the upper rack adjuster kit",
+            "What is a door shelf bin used for?",
+        ],
+        "out_of_scope": [
+            "What's the weather like today?",
+            "Tell me a joke",
+            "Who won the football game?",
+        ],
+    }
+    return [(path, query) for path, queries in paths.items() for query in queries[:per_path]]
@@ -0,0 +1,235 @@
+"""
+Run Benchmark - Drives app.py end to end against local API stand-ins
+
+Starts the stub DeepSeek/OpenAI server, builds (or reuses) a benchmark Chroma
+index, launches the API with uvicorn pointed at both, then sends the
+benchmark queries at each concurrency level (closed loop: every worker sends
+its next request as soon as the previous one returns).
+
+Reports p50/p95/p99 latency overall and per pipeline path, throughput, and
+the API process's memory, and writes everything to a JSON file so builds can
+be compared. Run from backend/:
+
+    python -m benchmarks.run_benchmark --concurrency 1,4,16 --requests 200
+    python -m benchmarks.run_benchmark --label no-hedge --env LLM_HEDGE_ENABLED=false
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.bench_index import build_bench_index
+from benchmarks.queries import benchmark_queries
+from benchmarks.stub_servers import start_stub_server
+from config import BACKEND_DIR
+
+BENCH_DIR = BACKEND_DIR / "benchmarks"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return round(ordered[min(rank, len(ordered)) - 1], 2)
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(latencies),
+        "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": round(max(latencies), 2) if latencies else None,
+    }
+
+
+def process_memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """Current and peak RSS of a process from /proc (None where unavailable)"""
+    memory: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                memory["rss_mb"] = round(int(line.split()[1]) / 1024.0, 1)
+            elif line.startswith("VmHWM:"):
+                memory["peak_rss_mb"] = round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return memory
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def start_api(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=str(BACKEND_DIR),
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"API exited during startup (code {process.returncode})")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise SystemExit("API did not become healthy within 60s")
+
+
+def run_level(base_url: str, queries: List[Tuple[str, str]], concurrency: int, total: int, view: str) -> Dict[str, Any]:
+    """Send `total` requests with `concurrency` closed-loop workers"""
+    schedule = itertools.cycle(queries)
+    lock = threading.Lock()
+    results: List[Tuple[str, float, bool]] = []
+    remaining = [total]
+
+    def worker():
+        session = requests.Session()
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+                path, query = next(schedule)
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{base_url}/chat", json={"query": query, "view": view}, timeout=120)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with lock:
+                results.append((path, elapsed_ms, ok))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    duration = time.perf_counter() - started
+
+    ok_latencies = [ms for _, ms, ok in results if ok]
+    by_path: Dict[str, List[float]] = {}
+    for path, ms, ok in results:
+        if ok:
+            by_path.setdefault(path, []).append(ms)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": sum(1 for _, _, ok in results if not ok),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(ok_latencies) / duration, 2) if duration else None,
+        "latency_ms": summarize(ok_latencies),
+        "by_path": {path: summarize(values) for path, values in sorted(by_path.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end /chat benchmark")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--llm-latency", default="lognormal:800,0.5", help="Stub LLM time-to-first-token: fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--embed-latency", default="lognormal:120,0.3", help="Stub embeddings latency distribution")
+    parser.add_argument("--decode-tps", type=float, default=50.0, help="Stub LLM generation speed (tokens/s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--view", default="cards", choices=["answer", "cards", "debug"], help="/chat response view")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the API process (repeatable)")
+    parser.add_argument("--index-dir", default=str(BENCH_DIR / ".bench_index"), help="Where the benchmark Chroma stores live")
+    parser.add_argument("--rebuild-index", action="store_true")
+    parser.add_argument("--label", default="", help="Name for this run in the results file")
+    parser.add_argument("--out", default=str(BENCH_DIR / "results"), help="Directory for JSON results")
+    args = parser.parse_args()
+
+    stub = start_stub_server(0, args.llm_latency, args.embed_latency, args.decode_tps, args.seed)
+    stub_url = f"http://127.0.0.1:{stub.server_port}/v1"
+
+    env = {
+        "DEEPSEEK_API_KEY": "benchmark",
+        "DEEPSEEK_BASE_URL": stub_url,
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": stub_url,
+        **build_bench_index(Path(args.index_dir), args.rebuild_index),
+    }
+    env.update(dict(item.split("=", 1) for item in args.env))
+
+    port = free_port()
+    api = start_api(port, env)
+    base_url = f"http://127.0.0.1:{port}"
+    queries = benchmark_queries()
+
+    try:
+        # warm-up: one pass over every query (lazy clients, Chroma loads)
+        run_level(base_url, queries, 1, len(queries), args.view)
+
+        levels = []
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            level = run_level(base_url, queries, concurrency, args.requests, args.view)
+            level["server_memory"] = process_memory_mb(api.pid)
+            levels.append(level)
+            lat = level["latency_ms"]
+            print(
+                f"c={concurrency:<3} {level['throughput_rps']:>7} req/s  "
+                f"p50 {lat['p50']}ms  p95 {lat['p95']}ms  p99 {lat['p99']}ms  "
+                f"errors {level['errors']}  rss {level['server_memory']['rss_mb']}MB"
+            )
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+        stub.shutdown()
+
+    commit = git_commit()
+    result = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "settings": {
+            "requests_per_level": args.requests,
+            "llm_latency": args.llm_latency,
+            "embed_latency": args.embed_latency,
+            "decode_tps": args.decode_tps,
+            "seed": args.seed,
+            "view": args.view,
+            "env": dict(item.split("=", 1) for item in args.env),
+        },
+        "stub_calls": dict(stub.state.counts),
+        "levels": levels,
+    }
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = "_".join(p for p in [time.strftime("%Y%m%d-%H%M%S"), commit or "", args.label] if p)
+    out_path = out_dir / f"{name}.json"
+    out_path.write_text(json.dumps(result, indent=2))
+    print(f"✅ results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Stub Servers - Local stand-ins for the DeepSeek and OpenAI APIs
+
+One HTTP server answers both:
+- POST /v1/chat/completions (DeepSeek): intent prompts get a keyword-based
+  label, everything else a canned answer sized to max_tokens
+- POST /v1/embeddings (OpenAI): deterministic feature-hashed vectors, so
+  texts sharing words land near each other and every run embeds identically
+
+Latency is drawn from a configurable distribution with a fixed seed, so runs
+are comparable. Run standalone from backend/:
+
+    python -m benchmarks.stub_servers --port 8900 --llm-latency lognormal:800,0.5
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+EMBED_DIM = 1536
+
+INTENT_KEYWORDS = [
+    ("out_of_scope", ["weather", "stock market", "recipe", "football", "joke"]),
+    ("compatibility", ["compatible", "fit ", "fits ", "work with", "works with"]),
+    ("installation", ["install", "replace", "put in", "remove the"]),
+    ("troubleshoot", ["not ", "won't", "isn't", "leak", "noisy", "broken", "problem", "stopped"]),
+]
+
+
+class LatencyModel:
+    """
+    Seeded latency distribution, parsed from a spec:
+    "fixed:MS", "uniform:LO,HI" or "lognormal:MEDIAN_MS,SIGMA".
+    """
+
+    def __init__(self, spec: str, seed: int = 0):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution: {spec}")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                return self.params[0]
+            if self.kind == "uniform":
+                return self._rng.uniform(self.params[0], self.params[1])
+            median, sigma = self.params
+            return self._rng.lognormvariate(math.log(median), sigma)
+
+
+def stub_embedding(text: str, dim: int = EMBED_DIM) -> List[float]:
+    """Deterministic unit vector: each word hashes to a dimension and a sign"""
+    vector = [0.0] * dim
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def classify_stub(query: str) -> str:
+    text = query.lower()
+    for intent, keywords in INTENT_KEYWORDS:
+        if any(k in text for k in keywords):
+            return intent
+    return "qna"
+
+
+class StubState:
+    """Latency models and request counters shared by the handler threads"""
+
+    def __init__(self, llm_latency: str, embed_latency: str, decode_tps: float, seed: int):
+        self.llm_latency = LatencyModel(llm_latency, seed)
+        self.embed_latency = LatencyModel(embed_latency, seed + 1)
+        self.decode_tps = decode_tps
+        self.counts = {"chat": 0, "embeddings": 0, "embedded_texts": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key: str, n: int = 1):
+        with self.lock:
+            self.counts[key] += n
+
+
+def _chat_response(body: Dict[str, Any], state: StubState) -> Dict[str, Any]:
+    messages = body.get("messages", [])
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = messages[-1]["content"] if messages else ""
+
+    if "intent classifier" in system:
+        if "JSON array" in system:
+            queries = [re.sub(r"^\d+\.\s*", "", line) for line in user.splitlines() if line.strip()]
+            content = json.dumps([classify_stub(q) for q in queries])
+        else:
+            content = classify_stub(user)
+        completion_tokens = max(1, len(content) // 4)
+    else:
+        completion_tokens = min(int(body.get("max_tokens", 500)), 120)
+        content = ("Based on the PartSelect data provided, here is what you need to know. " * 12)[: completion_tokens * 4]
+
+    prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+    # decode time on top of the sampled time-to-first-token
+    time.sleep((state.llm_latency.sample_ms() + completion_tokens / state.decode_tps * 1000.0) / 1000.0)
+    return {
+        "id": "stub-completion",
+        "object": "chat.completion",
+        "model": body.get("model", "deepseek-chat"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "prompt_cache_hit_tokens": 0,
+            "prompt_cache_miss_tokens": prompt_tokens,
+        },
+    }
+
+
+def _embeddings_response(body: Dict[str, Any], state: StubState) -> Dict[str, Any]:
+    texts = body.get("input", [])
+    if isinstance(texts, str):
+        texts = [texts]
+    state.count("embedded_texts", len(texts))
+    time.sleep(state.embed_latency.sample_ms() / 1000.0)
+    return {
+        "object": "list",
+        "model": body.get("model", "text-embedding-3-small"),
+        "data": [{"object": "embedding", "index": i, "embedding": stub_embedding(t)} for i, t in enumerate(texts)],
+        "usage": {"prompt_tokens": 0, "total_tokens": 0},
+    }
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.endswith("/chat/completions"):
+                state.count("chat")
+                payload = _chat_response(body, state)
+            elif self.path.endswith("/embeddings"):
+                state.count("embeddings")
+                payload = _embeddings_response(body, state)
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(
+    port: int = 0,
+    llm_latency: str = "lognormal:800,0.5",
+    embed_latency: str = "lognormal:120,0.3",
+    decode_tps: float = 50.0,
+    seed: int = 0,
+) -> ThreadingHTTPServer:
+    """
+    Start the stand-in server on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        llm_latency: Time-to-first-token distribution for chat completions
+        embed_latency: Latency distribution for embedding calls
+        decode_tps: Simulated generation speed in tokens per second
+        seed: Seed for the latency distributions
+
+    Returns:
+        The running server; its base URL is http://127.0.0.1:<server.server_port>/v1
+    """
+    state = StubState(llm_latency, embed_latency, decode_tps, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--llm-latency", default="lognormal:800,0.5")
+    parser.add_argument("--embed-latency", default="lognormal:120,0.3")
+    parser.add_argument("--decode-tps", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.llm_latency, args.embed_latency, args.decode_tps, args.seed)
+    print(f"✅ stub DeepSeek/OpenAI server on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,215 @@
+"""
+Workload - Synthetic /chat queries sampled from the catalog data
+
+Queries reference real part numbers, model numbers, titles and symptoms from
+data/appliance_parts_*.csv, data/maps/parts_to_models.json,
+data/maps/installation_manual.json and data/troubleshooting.json, so load
+tests exercise the same direct lookups and retrievals as real traffic.
+
+Catalog items are drawn with Zipfian popularity (a few parts get most of the
+questions, like a real storefront), and the mix across intents is weighted.
+Everything is derived from one seed, so a workload can be regenerated exactly.
+
+    python -m benchmarks.workload --count 1000 --seed 7 --out workload.jsonl
+"""
+import argparse
+import bisect
+import json
+import random
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from config import BACKEND_DIR
+
+DATA_DIR = BACKEND_DIR / "data"
+
+DEFAULT_MIX = {
+    "compatibility": 0.40,
+    "installation": 0.20,
+    "troubleshoot": 0.15,
+    "qna": 0.15,
+    "out_of_scope": 0.10,
+}
+
+# query shapes within each intent, with their relative weights
+SUB_PATHS = {
+    "compatibility": {"cross_check": 0.6, "part_models": 0.2, "model_parts": 0.2},
+    "installation": {"manual": 0.5, "part": 0.5},
+    "troubleshoot": {"symptom": 1.0},
+    "qna": {"part_info": 1.0},
+    "out_of_scope": {"off_topic": 1.0},
+}
+
+OUT_OF_SCOPE = [
+    "What's the weather like today?",
+    "Tell me a joke",
+    "Who won the football game last night?",
+    "Can you write me a recipe for lasagna?",
+    "How is the stock market doing?",
+    "Recommend a good movie",
+]
+
+
+class ZipfSampler:
+    """
+    Draws items with probability proportional to 1 / rank^s. Ranks are a
+    seeded shuffle of the items, so which items are popular depends on the seed.
+    """
+
+    def __init__(self, items: Sequence[Any], s: float, rng: random.Random):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(accumulate(1.0 / (rank ** s) for rank in range(1, len(self.items) + 1)))
+        self.rng = rng
+
+    def sample(self) -> Any:
+        x = self.rng.random() * self.cum_weights[-1]
+        return self.items[bisect.bisect_left(self.cum_weights, x)]
+
+
+class WorkloadGenerator:
+    """
+    Generates a reproducible, weighted mix of catalog-grounded queries.
+    """
+
+    def __init__(self, seed: int = 0, mix: Optional[Dict[str, float]] = None, zipf_s: float = 1.1, mismatch_rate: float = 0.2):
+        """
+        Args:
+            seed: Seed for every random choice
+            mix: Intent weights (default DEFAULT_MIX)
+            zipf_s: Zipf exponent for catalog popularity (0 is uniform)
+            mismatch_rate: Share of cross-checks that pair a part with a model it doesn't fit
+        """
+        self.seed = seed
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.zipf_s = zipf_s
+        self.mismatch_rate = mismatch_rate
+        self.rng = random.Random(seed)
+
+        parts = self._load_parts()
+        parts_to_models = json.loads((DATA_DIR / "maps" / "parts_to_models.json").read_text())
+        model_to_parts = json.loads((DATA_DIR / "maps" / "model_to_parts.json").read_text())
+        manual = json.loads((DATA_DIR / "maps" / "installation_manual.json").read_text())
+        symptoms = self._load_symptoms()
+
+        # separate sampler per catalog, each with its own derived seed
+        def sampler(items, salt):
+            return ZipfSampler(sorted(items, key=str), zipf_s, random.Random(f"{seed}:{salt}"))
+
+        self.parts = sampler(parts, "parts")
+        self.mapped_parts = sampler([(p, m) for p, m in parts_to_models.items() if m], "mapped_parts")
+        self.models = sampler(model_to_parts.keys(), "models")
+        self.all_models = sorted(model_to_parts.keys())
+        self.manual_parts = sampler([(p, e["title"]) for p, e in manual.items()], "manual")
+        self.symptoms = sampler(symptoms, "symptoms")
+
+    def _load_parts(self) -> List[Dict[str, str]]:
+        parts = []
+        for appliance in ("dishwasher", "refrigerator"):
+            df = pd.read_csv(DATA_DIR / f"appliance_parts_{appliance}.csv").fillna("")
+            for row in df.drop_duplicates(subset=["part_id"]).itertuples():
+                parts.append({"part_id": row.part_id, "title": row.title, "brand": row.brand, "appliance": appliance})
+        return parts
+
+    def _load_symptoms(self) -> List[Dict[str, str]]:
+        symptoms = []
+        for record in json.loads((DATA_DIR / "troubleshooting.json").read_text()):
+            for symptom in record.get("symptom", "").split(","):
+                if symptom.strip():
+                    symptoms.append({"appliance": record.get("appliance", "appliance"), "symptom": symptom.strip()})
+        # de-duplicate, keeping a stable order
+        return [dict(t) for t in dict.fromkeys(tuple(sorted(s.items())) for s in symptoms)]
+
+    def _choose(self, weights: Dict[str, float]) -> str:
+        names = sorted(weights)
+        return self.rng.choices(names, weights=[weights[n] for n in names])[0]
+
+    def next_query(self) -> Dict[str, Any]:
+        """One query: {"intent", "path", "query", "identifiers"}"""
+        intent = self._choose(self.mix)
+        sub_path = self._choose(SUB_PATHS[intent])
+        query, identifiers = getattr(self, f"_{intent}_{sub_path}")()
+        return {"intent": intent, "path": f"{intent}_{sub_path}", "query": query, "identifiers": identifiers}
+
+    def generate(self, count: int) -> List[Dict[str, Any]]:
+        return [self.next_query() for _ in range(count)]
+
+    def _compatibility_cross_check(self):
+        part, models = self.mapped_parts.sample()
+        if self.rng.random() < self.mismatch_rate:
+            model = self.rng.choice(self.all_models)
+        else:
+            model = self.rng.choice(models)
+        template = self.rng.choice([
+            "Is {part} compatible with my {model}?",
+            "Will part {part} fit model {model}?",
+            "Does {part} work with {model}?",
+        ])
+        return template.format(part=part, model=model), {"part_number": part, "model_number": model}
+
+    def _compatibility_part_models(self):
+        part, _ = self.mapped_parts.sample()
+        return f"Which models is {part} compatible with?", {"part_number": part}
+
+    def _compatibility_model_parts(self):
+        model = self.models.sample()
+        return f"What parts are compatible with my {model}?", {"model_number": model}
+
+    def _installation_manual(self):
+        part, title = self.manual_parts.sample()
+        return self.rng.choice([f"How do I install {part}?", f"How do I replace the {title} ({part})?"]), {"part_number": part}
+
+    def _installation_part(self):
+        part = self.parts.sample()
+        return f"How do I install the {part['title']} {part['part_id']} on my {part['appliance']}?", {"part_number": part["part_id"]}
+
+    def _troubleshoot_symptom(self):
+        item = self.symptoms.sample()
+        symptom = item["symptom"].lower()
+        template = self.rng.choice([
+            "My {appliance} has a problem: {symptom}",
+            "{appliance} issue - {symptom}. What part is broken?",
+            "Help, my {appliance} is not working right: {symptom}",
+        ])
+        return template.format(appliance=item["appliance"], symptom=symptom), {"appliance": item["appliance"]}
+
+    def _qna_part_info(self):
+        part = self.parts.sample()
+        template = self.rng.choice([
+            "What does the {title} do?",
+            "Tell me about part {part_id}",
+            "What is the price of the {brand} {title}?",
+        ])
+        return template.format(**part), {"part_number": part["part_id"]}
+
+    def _out_of_scope_off_topic(self):
+        return self.rng.choice(OUT_OF_SCOPE), {}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """"compatibility=0.5,qna=0.5" -> {"compatibility": 0.5, "qna": 0.5}"""
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SUB_PATHS:
+            raise ValueError(f"unknown intent in mix: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a catalog-grounded /chat workload")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", default="", help="Intent weights, e.g. compatibility=0.5,troubleshoot=0.5")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for catalog popularity")
+    parser.add_argument("--out", default="workload.jsonl")
+    args = parser.parse_args()
+
+    generator = WorkloadGenerator(seed=args.seed, mix=parse_mix(args.mix) if args.mix else None, zipf_s=args.zipf)
+    with open(args.out, "w") as f:
+        for item in generator.generate(args.count):
+            f.write(json.dumps(item) + "\n")
+    print(f"✅ wrote {args.count} queries to {args.out} (seed {args.seed})")
@@ -1,8 +1,121 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_db")
\ No newline at end of file
+CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_db")
+
+# optional OpenAI API base URL override (e.g. a local stand-in for benchmarks)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+
+# chroma stores read by the retrievers: partselect-docs (compatibility/installation/troubleshooting)
+# and the per-appliance parts collections (qna)
+BACKEND_DIR = Path(__file__).resolve().parent
+CHROMA_DOCS_PATH = os.getenv("CHROMA_DOCS_PATH", str(BACKEND_DIR / "chroma_store"))
+CHROMA_PARTS_PATH = os.getenv("CHROMA_PARTS_PATH", str(BACKEND_DIR / "backend" / "chroma_db"))
+
+# embeddings: concurrent single-text requests are coalesced into one API call
+EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "64"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+EMBED_BATCH_MAX_IN_FLIGHT = int(os.getenv("EMBED_BATCH_MAX_IN_FLIGHT", "4"))
+
+# intent classification: optional coalescing of concurrent queries into one LLM call
+INTENT_BATCHING_ENABLED = os.getenv("INTENT_BATCHING_ENABLED", "false").lower() == "true"
+INTENT_BATCH_MAX_SIZE = int(os.getenv("INTENT_BATCH_MAX_SIZE", "16"))
+INTENT_BATCH_MAX_WAIT_MS = float(os.getenv("INTENT_BATCH_MAX_WAIT_MS", "10"))
+INTENT_BATCH_MAX_IN_FLIGHT = int(os.getenv("INTENT_BATCH_MAX_IN_FLIGHT", "2"))
+# most queries one POST /intents/batch may carry; larger lists are rejected with 422
+INTENT_BATCH_MAX_QUERIES = int(os.getenv("INTENT_BATCH_MAX_QUERIES", "256"))
+# intent used when the classifier is down (timeout, open circuit); the response is marked degraded
+INTENT_FALLBACK = os.getenv("INTENT_FALLBACK", "qna")
+
+# prompt context: evidence is packed into this many tokens, highest priority first
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_MAX_LIST_ITEMS = int(os.getenv("CONTEXT_MAX_LIST_ITEMS", "25"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+# installation answers use step-level passages (scripts/ingest/build_installation_passages.py), not whole manuals
+INSTALLATION_PASSAGES_COLLECTION = os.getenv("INSTALLATION_PASSAGES_COLLECTION", "installation-passages")
+INSTALLATION_MAX_PASSAGES = int(os.getenv("INSTALLATION_MAX_PASSAGES", "3"))
+
+# LLM routing: server-side policy for model choice and generation limits
+LLM_DEFAULT_MODEL = os.getenv("LLM_DEFAULT_MODEL", "deepseek-chat")
+LLM_REASONING_MODEL = os.getenv("LLM_REASONING_MODEL", "deepseek-reasoner")
+LLM_REASONING_ENABLED = os.getenv("LLM_REASONING_ENABLED", "true").lower() == "true"
+LLM_REASONING_INTENTS = [i.strip() for i in os.getenv("LLM_REASONING_INTENTS", "troubleshoot,qna").split(",") if i.strip()]
+LLM_REASONING_MIN_LATENCY_MS = int(os.getenv("LLM_REASONING_MIN_LATENCY_MS", "20000"))
+LLM_DEFAULT_LATENCY_TARGET_MS = int(os.getenv("LLM_DEFAULT_LATENCY_TARGET_MS", "15000"))
+
+# LLM upstreams: primary DeepSeek plus an optional OpenAI-compatible secondary for hedging
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+LLM_SECONDARY_BASE_URL = os.getenv("LLM_SECONDARY_BASE_URL", "")
+LLM_SECONDARY_API_KEY = os.getenv("LLM_SECONDARY_API_KEY", "")
+LLM_SECONDARY_MODEL = os.getenv("LLM_SECONDARY_MODEL", "")
+LLM_REQUEST_TIMEOUT_S = float(os.getenv("LLM_REQUEST_TIMEOUT_S", "30"))
+
+# hedging: fire a duplicate request once the first is slower than this percentile
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_DELAY_MS = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "250"))
+LLM_HEDGE_DEFAULT_DELAY_MS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "8000"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_POOL_SIZE = int(os.getenv("LLM_HEDGE_POOL_SIZE", "32"))
+
+# request deadline set at the API edge; each stage gets a share of what's left
+REQUEST_DEADLINE_MS = int(os.getenv("REQUEST_DEADLINE_MS", "20000"))
+# a client's latency_target_ms can extend its deadline (e.g. for the reasoning model) up to this
+REQUEST_MAX_DEADLINE_MS = int(os.getenv("REQUEST_MAX_DEADLINE_MS", "60000"))
+INTENT_BUDGET_FRACTION = float(os.getenv("INTENT_BUDGET_FRACTION", "0.2"))
+RETRIEVAL_BUDGET_FRACTION = float(os.getenv("RETRIEVAL_BUDGET_FRACTION", "0.25"))
+SEMANTIC_SEARCH_MIN_REMAINING_MS = int(os.getenv("SEMANTIC_SEARCH_MIN_REMAINING_MS", "3000"))
+GENERATION_MIN_REMAINING_MS = int(os.getenv("GENERATION_MIN_REMAINING_MS", "1000"))
+EMBED_REQUEST_TIMEOUT_S = float(os.getenv("EMBED_REQUEST_TIMEOUT_S", "10"))
+
+# circuit breakers: stop calling an upstream after repeated failures
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_TIMEOUT_S = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT_S", "30"))
+
+# fast answers: conclusive direct-lookup hits are templated without an LLM call
+FAST_ANSWER_INTENTS = [i.strip() for i in os.getenv("FAST_ANSWER_INTENTS", "compatibility,installation").split(",") if i.strip()]
+FAST_ANSWER_POLISH_ENABLED = os.getenv("FAST_ANSWER_POLISH_ENABLED", "false").lower() == "true"
+FAST_ANSWER_POLISH_CACHE_SIZE = int(os.getenv("FAST_ANSWER_POLISH_CACHE_SIZE", "2048"))
+
+# /chat response payloads: "answer", "cards" (answer plus compact result cards) or "debug" (everything)
+CHAT_RESPONSE_VIEW = os.getenv("CHAT_RESPONSE_VIEW", "cards")
+CHAT_RESPONSE_MAX_CARDS = int(os.getenv("CHAT_RESPONSE_MAX_CARDS", "5"))
+CHAT_RESPONSE_MAX_LIST_ITEMS = int(os.getenv("CHAT_RESPONSE_MAX_LIST_ITEMS", "10"))
+# responses at least this large are compressed (brotli if brotli-asgi is installed, else gzip)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1000"))
+
+# tracing: share of requests traced (0 disables), where spans go, and the header that forces a trace
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.0"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # none, file or otlp
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "traces/spans.otlp.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_FORCE_HEADER = os.getenv("TRACE_FORCE_HEADER", "x-partselect-trace")
+# forcing a trace needs TRACE_FORCE_HEADER: <TRACE_ADMIN_TOKEN> (empty disables it); a caller's sampled
+# traceparent is only honored with that token, or from every caller when TRACE_TRUST_TRACEPARENT (behind a trusted gateway)
+TRACE_ADMIN_TOKEN = os.getenv("TRACE_ADMIN_TOKEN", "")
+TRACE_TRUST_TRACEPARENT = os.getenv("TRACE_TRUST_TRACEPARENT", "false").lower() == "true"
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "partselect-assistant")
+
+# on-demand profiling of /chat: admin header token or a sample rate; folded stacks land in PROFILE_OUTPUT_DIR
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+
+# Health probing (/health/ready serves cached results of these background checks)
+HEALTH_PROBE_INTERVAL_S = float(os.getenv("HEALTH_PROBE_INTERVAL_S", "10"))
+HEALTH_UPSTREAM_PROBE_INTERVAL_S = float(os.getenv("HEALTH_UPSTREAM_PROBE_INTERVAL_S", "60"))
+HEALTH_UPSTREAM_PROBE_ENABLED = os.getenv("HEALTH_UPSTREAM_PROBE_ENABLED", "true").lower() == "true"
+HEALTH_UPSTREAM_TIMEOUT_S = float(os.getenv("HEALTH_UPSTREAM_TIMEOUT_S", "2"))
+
+# Admin /debug/runtime endpoint (send X-Admin-Token; disabled when empty)
+DEBUG_ADMIN_TOKEN = os.getenv("DEBUG_ADMIN_TOKEN", "")
+EVENT_LOOP_LAG_INTERVAL_MS = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_MS", "100"))
@@ -0,0 +1,214 @@
+# backend/scripts/ingest/build_installation_passages.py
+"""
+Split installation manuals into step-level passages.
+
+The installation retriever used to hand whole `installation_text` blobs to
+the prompt. This build step splits every manual (data/installation.json
+plus data/maps/installation_manual.json) into short passages, each tagged
+with its kind, the tools it mentions and the part numbers it names:
+
+- data/maps/installation_passages.json: part number -> title, url, passages
+  (read by the retriever's direct lookup)
+- the `installation-passages` Chroma collection in the docs store, one
+  document per passage (semantic search); synced incrementally like the
+  other ingest scripts
+
+Usage (from backend/):
+    python scripts/ingest/build_installation_passages.py [--no_index]
+"""
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+DATA_DIR = Path("data")
+INSTALLATION_JSON = DATA_DIR / "installation.json"
+MANUAL_JSON = DATA_DIR / "maps" / "installation_manual.json"
+PASSAGES_JSON = DATA_DIR / "maps" / "installation_passages.json"
+
+# a passage is a run of sentences of the same kind, up to about this many characters
+MAX_PASSAGE_CHARS = 320
+
+TOOL_PATTERNS = [
+    r"(?:\d+/\d+(?:\s*(?:inch|in\.?|\"))?\s+)?(?:nut ?driver|socket(?: wrench)?)",
+    r"(?:phillips|flat[- ]?head|flat[- ]blade|torx|t-?\d+)?\s*screw ?driver",
+    r"ratchet", r"(?:adjustable |crescent )?wrench", r"(?:needle[- ]nose )?pliers",
+    r"putty knife", r"multimeter", r"drill", r"hex key|allen (?:key|wrench)",
+    r"wire cutters?", r"(?:work )?gloves", r"towels?", r"bucket",
+]
+TOOL_RE = re.compile(r"\b(" + "|".join(TOOL_PATTERNS) + r")\b", re.IGNORECASE)
+TOOL_FREE_RE = re.compile(r"\b(tool[- ]free|no tools|without tools)\b", re.IGNORECASE)
+SAFETY_RE = re.compile(
+    r"\b(unplug|turn off|shut off|disconnect (?:the )?(?:power|water|electric)|power supply|"
+    r"water supply|circuit breaker|safety|caution|warning)\b",
+    re.IGNORECASE,
+)
+STEP_RE = re.compile(
+    r"\b(remove|install|insert|align|snap|attach|detach|unscrew|screw|slide|lift|reconnect|"
+    r"connect|replace|mount|lubricate|push|pull|press|open|close|tighten|loosen|secure|"
+    r"disassembl\w*|reassembl\w*|clip|plug|route|position|place|turn)\b",
+    re.IGNORECASE,
+)
+PART_NUMBER_RE = re.compile(r"\b(PS\d{5,}|[A-Z]{1,5}\d{5,}[A-Z0-9]*)\b")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\s*\n+\s*|\s(?=(?:[Ss]tep\s*)?\d+[.)]\s+[A-Z])")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences and numbered steps, whitespace-normalized"""
+    pieces = SENTENCE_SPLIT_RE.split(text or "")
+    return [re.sub(r"\s+", " ", p).strip() for p in pieces if p and p.strip()]
+
+
+def classify(sentence: str) -> str:
+    """tools, safety, step or note (descriptive text that isn't an instruction)"""
+    if TOOL_RE.search(sentence) or TOOL_FREE_RE.search(sentence) or re.search(r"\byou will need\b", sentence, re.IGNORECASE):
+        return "tools"
+    if SAFETY_RE.search(sentence):
+        return "safety"
+    if STEP_RE.search(sentence):
+        return "step"
+    return "note"
+
+
+def extract_tools(text: str) -> List[str]:
+    tools = [re.sub(r"\s+", " ", m.group(1).strip().lower()) for m in TOOL_RE.finditer(text)]
+    if TOOL_FREE_RE.search(text):
+        tools.append("tool-free")
+    return list(dict.fromkeys(tools))
+
+
+def split_passages(text: str, max_chars: int = MAX_PASSAGE_CHARS) -> List[Dict[str, Any]]:
+    """
+    Split one manual into passages of consecutive same-kind sentences.
+
+    Args:
+        text: The manual's installation text
+        max_chars: Soft cap on a passage's length (one long sentence stays whole)
+
+    Returns:
+        Passages in document order: {"step", "kind", "text", "tools", "part_numbers"}
+    """
+    groups: List[Dict[str, Any]] = []
+    for sentence in split_sentences(text):
+        kind = classify(sentence)
+        last = groups[-1] if groups else None
+        if last and last["kind"] == kind and len(last["text"]) + 1 + len(sentence) <= max_chars:
+            last["text"] += " " + sentence
+        else:
+            groups.append({"kind": kind, "text": sentence})
+
+    passages = []
+    for step, group in enumerate(groups):
+        passages.append({
+            "step": step,
+            "kind": group["kind"],
+            "text": group["text"],
+            "tools": extract_tools(group["text"]),
+            "part_numbers": list(dict.fromkeys(PART_NUMBER_RE.findall(group["text"]))),
+        })
+    return passages
+
+
+def build_passages_map(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    part number -> {"title", "url", "part_numbers", "passages"}. Records are
+    dicts with part_number, title, url and "text" or "installation_text";
+    a later record for the same part replaces an earlier one.
+    """
+    passages_map: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        part_number = record.get("part_number")
+        text = (record.get("installation_text") or record.get("text") or "").strip()
+        if not part_number or not text:
+            continue
+        title = record.get("title", "")
+        passages = split_passages(text)
+        # the manufacturer number in the title ("... W10712395") identifies the part too
+        passages_map[part_number] = {
+            "title": title,
+            "url": (record.get("url") or "").split("?", 1)[0],
+            "part_numbers": list(dict.fromkeys([part_number] + PART_NUMBER_RE.findall(title))),
+            "passages": passages,
+        }
+    return passages_map
+
+
+def passage_items(passages_map: Dict[str, Dict[str, Any]], appliances: Dict[str, str]) -> List[Dict[str, Any]]:
+    """One Chroma item per passage, metadata flattened to strings for filtering"""
+    items = []
+    for part_number, entry in passages_map.items():
+        for passage in entry["passages"]:
+            items.append({
+                "id": f"{part_number}-install-{passage['step']}",
+                "text": f"{entry['title']}: {passage['text']}" if entry["title"] else passage["text"],
+                "metadata": {
+                    "source": "installation",
+                    "part_number": part_number,
+                    "title": entry["title"],
+                    "url": entry["url"],
+                    "appliance": appliances.get(part_number, ""),
+                    "step": passage["step"],
+                    "kind": passage["kind"],
+                    "tools": ", ".join(passage["tools"]),
+                    "part_numbers": ", ".join(entry["part_numbers"] + passage["part_numbers"]),
+                },
+            })
+    return items
+
+
+def _load(path: Path):
+    if not path.exists():
+        print(f"[warn] missing file: {path}")
+        return None
+    return json.loads(path.read_text())
+
+
+def main(args):
+    installation = _load(INSTALLATION_JSON) or []
+    manual = _load(MANUAL_JSON) or {}
+    # the direct-lookup manual wins over installation.json for the same part
+    passages_map = build_passages_map(list(installation) + list(manual.values()))
+    appliances = {r.get("part_number"): r.get("appliance", "") for r in installation}
+
+    PASSAGES_JSON.write_text(json.dumps(passages_map, indent=2, ensure_ascii=False))
+    total = sum(len(e["passages"]) for e in passages_map.values())
+    kinds: Dict[str, int] = {}
+    for entry in passages_map.values():
+        for passage in entry["passages"]:
+            kinds[passage["kind"]] = kinds.get(passage["kind"], 0) + 1
+    print(f"[passages] {len(passages_map)} manuals -> {total} passages {kinds} -> {PASSAGES_JSON}")
+
+    if args.no_index:
+        return
+
+    import chromadb
+    from chromadb.config import Settings
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    from embedding_pipeline import pipeline_from_args
+    from incremental import sync_collection
+
+    load_dotenv()
+    client = chromadb.Client(Settings(is_persistent=True, persist_directory=args.persist_dir))
+    collection = client.get_or_create_collection(name=args.collection, metadata={"hnsw:space": "cosine"})
+    openai_client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+    pipeline = pipeline_from_args(openai_client, args)
+    result = sync_collection(collection, passage_items(passages_map, appliances), pipeline, prune=not args.no_prune)
+    pipeline.close()
+    print(f"✅ done. '{args.collection}': {result['embedded']} embedded, {result['metadata_only']} metadata-only, "
+          f"{result['unchanged']} unchanged, {result['deleted']} deleted (persist_dir={args.persist_dir})")
+
+
+if __name__ == "__main__":
+    from embedding_pipeline import add_pipeline_args
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default="installation-passages", help="Chroma collection for the passages")
+    parser.add_argument("--persist_dir", default="chroma_store", help="Docs Chroma store directory")
+    parser.add_argument("--no_index", action="store_true", help="Only write installation_passages.json")
+    parser.add_argument("--no_prune", action="store_true", help="Keep passages no longer produced by the split")
+    add_pipeline_args(parser)
+    main(parser.parse_args())
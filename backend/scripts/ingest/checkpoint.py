@@ -0,0 +1,120 @@
+# backend/scripts/ingest/checkpoint.py
+"""
+Durable ingest checkpoints, so a crashed or preempted ingest can resume.
+
+The checkpoint is an append-only JSONL journal. After every batch is
+committed to Chroma, one line records the collection, the batch's ids and
+content hashes, and the running offset; the line is fsynced before the next
+batch is written. Appending keeps each checkpoint O(batch) no matter how
+large the catalog is.
+
+With --resume the journal is replayed and any document whose id and content
+hash were already committed is not embedded again. A batch is journaled only
+after Chroma accepted it, so the journal never claims more than the store
+holds. Without --resume the journal starts over.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def file_fingerprint(path: Path) -> str:
+    """sha256 of a source file, to tell whether it changed since the checkpoint"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class IngestCheckpoint:
+    """
+    Append-only journal of committed ingest batches.
+    """
+
+    def __init__(self, path: str, job: str, resume: bool = False):
+        self.path = Path(path)
+        self.job = job
+        self.committed: Dict[str, Dict[str, str]] = {}
+        self.offsets: Dict[str, int] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.completed = set()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._replay()
+            total = sum(self.offsets.values())
+            print(f"[checkpoint] resuming {job}: {total} docs already committed ({self.path})")
+            self._file = open(self.path, "a")
+        else:
+            if resume:
+                print(f"[checkpoint] no checkpoint at {self.path}; starting from the beginning")
+            self._file = open(self.path, "w")
+        self._append({"type": "start", "job": job, "resume": resume, "at": time.time()})
+
+    def begin_source(self, collection: str, source: Path):
+        """Record which file feeds a collection; warn if it changed since the checkpoint"""
+        fingerprint = file_fingerprint(source)
+        previous = self.fingerprints.get(str(source))
+        if previous and previous != fingerprint:
+            # committed hashes are still valid per document, so resuming stays correct
+            print(f"[checkpoint] {source} changed since the checkpoint; only unchanged committed docs are skipped")
+        self.fingerprints[str(source)] = fingerprint
+        self._append({"type": "source", "collection": collection, "source": str(source), "fingerprint": fingerprint})
+
+    def is_committed(self, collection: str, doc_id: str, content_hash: str) -> bool:
+        return self.committed.get(collection, {}).get(doc_id) == content_hash
+
+    def record_batch(self, collection: str, batch: List[Dict[str, Any]], hash_field: str = "content_hash"):
+        """Journal a batch after it was written to Chroma (durable before returning)"""
+        with self._lock:
+            # only journaled, not kept in memory: `committed` holds what a resume replayed
+            ids = {item["id"]: item["metadata"][hash_field] for item in batch}
+            self.offsets[collection] = self.offsets.get(collection, 0) + len(batch)
+            self._append({"type": "batch", "collection": collection, "offset": self.offsets[collection], "ids": ids})
+
+    def finish(self, collection: str):
+        with self._lock:
+            self.completed.add(collection)
+            self._append({"type": "done", "collection": collection, "offset": self.offsets.get(collection, 0)})
+
+    def close(self):
+        self._file.close()
+
+    def _append(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _replay(self):
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn last line from a crash mid-write; that batch is redone
+                    continue
+                kind = entry.get("type")
+                collection = entry.get("collection")
+                if kind == "batch":
+                    self.committed.setdefault(collection, {}).update(entry["ids"])
+                    self.offsets[collection] = entry["offset"]
+                elif kind == "source":
+                    self.fingerprints[entry["source"]] = entry["fingerprint"]
+                elif kind == "done":
+                    self.completed.add(collection)
+
+
+def add_checkpoint_args(parser, default_path: str):
+    """Shared --resume / --checkpoint flags for the ingest scripts"""
+    parser.add_argument("--resume", action="store_true", help="Continue from the last committed batch in the checkpoint")
+    parser.add_argument("--checkpoint", default=default_path, help="Checkpoint journal path")
+
+
+def checkpoint_from_args(args, job: str) -> IngestCheckpoint:
+    return IngestCheckpoint(args.checkpoint, job, resume=args.resume)
@@ -0,0 +1,376 @@
+# backend/scripts/ingest/embedding_pipeline.py
+"""
+Concurrent, rate-limit-aware embedding for the ingest scripts.
+
+The ingest scripts used to embed fixed 128-document batches one after
+another, so a re-ingest took the sum of every round trip. Here:
+
+- batches are cut by token count (and an input cap), not document count
+- several batches are embedded at once on a thread pool
+- every request first takes from request-per-minute and token-per-minute
+  buckets, so concurrency never outruns the account's rate limits
+- a 429 pauses the shared buckets for its Retry-After, so all workers back
+  off together; 5xx / timeouts retry with jittered exponential backoff
+- a single writer thread stores finished batches while the next ones embed
+- `prefetch` runs the source reader on its own thread behind a bounded queue,
+  so parsing, embedding and writing all overlap with bounded memory
+- with an EmbeddingStore, texts embedded by any earlier run (for any
+  collection) are served from disk and never sent to the API again
+- inputs over the 8191-token limit are embedded from their first 8191 tokens
+  (the full text is still what gets written)
+"""
+import math
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from embedding_store import EmbeddingStore
+
+# OpenAI limits: 2048 inputs and 300k tokens per request, 8191 tokens per input
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_INPUT = 8191
+
+_encoder = None
+_encoder_loaded = False
+
+
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"[warn] tiktoken unavailable ({e}); estimating tokens from characters")
+            _encoder = None
+        _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """cl100k_base token count when tiktoken can load it, else ~4 chars per token"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def truncate_tokens(text: str, max_tokens: int = MAX_TOKENS_PER_INPUT) -> str:
+    """First `max_tokens` tokens of `text` (same tokenizer / estimate as count_tokens)"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+    return text[: max_tokens * 4]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_min`.
+    `pause(seconds)` empties it until then (used for Retry-After).
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate_per_s = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until `amount` tokens are available and take them. Requests
+        larger than the capacity wait for a full bucket.
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+                    self._updated = now
+                    if self._tokens >= amount:
+                        self._tokens -= amount
+                        return waited
+                    delay = (amount - self._tokens) / self.rate_per_s
+                else:
+                    delay = self._paused_until - now
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hand out nothing for `seconds` and restart from an empty bucket"""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After (or OpenAI's retry-after-ms) from a 429 response, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def token_batches(items: Iterable[Dict[str, Any]], max_tokens: int, max_items: int = MAX_INPUTS_PER_REQUEST) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Group items (dicts with "text" and "tokens") into batches of at most
+    `max_tokens` tokens and `max_items` inputs. An item larger than
+    `max_tokens` gets a batch of its own.
+    """
+    buf: List[Dict[str, Any]] = []
+    buf_tokens = 0
+    for item in items:
+        if buf and (buf_tokens + item["tokens"] > max_tokens or len(buf) >= max_items):
+            yield buf
+            buf, buf_tokens = [], 0
+        buf.append(item)
+        buf_tokens += item["tokens"]
+    if buf:
+        yield buf
+
+
+def prefetch(iterable: Iterable[Any], maxsize: int = 4) -> Iterator[Any]:
+    """
+    Run a producer (e.g. CSV parsing) on its own thread, at most `maxsize`
+    items ahead of the consumer. Producer exceptions are re-raised here.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+        except BaseException as e:
+            put(("error", e))
+            return
+        put(("end", None))
+
+    producer = threading.Thread(target=produce, name="ingest-reader", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        # the consumer stopped early (or failed): let the producer exit
+        stop.set()
+
+
+class EmbeddingPipeline:
+    """
+    Embeds items concurrently under rate limits and hands each finished
+    batch to `write_fn` on a single writer thread.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str = "text-embedding-3-small",
+        concurrency: int = 8,
+        requests_per_min: float = 3000,
+        tokens_per_min: float = 1_000_000,
+        batch_tokens: int = 20_000,
+        max_batch_size: int = 512,
+        max_retries: int = 6,
+        store: Optional[EmbeddingStore] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.batch_tokens = batch_tokens
+        self.max_batch_size = min(max_batch_size, MAX_INPUTS_PER_REQUEST)
+        self.max_retries = max_retries
+        self.store = store
+        self.request_bucket = TokenBucket(requests_per_min)
+        self.token_bucket = TokenBucket(tokens_per_min)
+        self.stats = {"items": 0, "cached": 0, "batches": 0, "tokens": 0, "retries": 0, "rate_limited": 0, "throttled_s": 0.0, "truncated": 0}
+        self._stats_lock = threading.Lock()
+
+    def run(self, items: Iterable[Dict[str, Any]], write_fn: Callable[[List[Dict[str, Any]], List[List[float]]], None]) -> Dict[str, Any]:
+        """
+        Embed every item and write the results.
+
+        Args:
+            items: Dicts with at least "text"; anything else is passed through to write_fn
+            write_fn: Called as write_fn(batch, vectors) on the writer thread, in completion order
+
+        Returns:
+            Stats: items, cached, batches, tokens, retries, rate_limited, throttled_s, truncated, seconds
+        """
+        started = time.perf_counter()
+        # finished batches wait here for the writer; bounded so embedding can't run far ahead of storage
+        done: "queue.Queue" = queue.Queue(maxsize=self.concurrency * 2)
+        write_errors: List[BaseException] = []
+
+        def writer():
+            while True:
+                entry = done.get()
+                if entry is None:
+                    return
+                if not write_errors:
+                    try:
+                        write_fn(*entry)
+                    except BaseException as e:
+                        write_errors.append(e)
+
+        writer_thread = threading.Thread(target=writer, name="ingest-writer", daemon=True)
+        writer_thread.start()
+
+        # at most 2x concurrency batches submitted at once, so huge inputs stream through
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+
+        def embed_and_queue(batch):
+            try:
+                done.put((batch, self._embed_with_retries(batch)))
+            finally:
+                slots.release()
+
+        def with_tokens(rows):
+            for item in rows:
+                item["input"] = item["text"]
+                item["tokens"] = count_tokens(item["text"])
+                if item["tokens"] > MAX_TOKENS_PER_INPUT:
+                    # the API rejects the whole request otherwise; embed the head of the document
+                    print(f"[warn] {item.get('id', '?')}: {item['tokens']} tokens, embedding the first {MAX_TOKENS_PER_INPUT}")
+                    item["input"] = truncate_tokens(item["text"])
+                    item["tokens"] = count_tokens(item["input"])
+                    self._count(truncated=1)
+                yield item
+
+        def uncached(rows):
+            # cache hits go straight to the writer in batches; only misses are embedded
+            hits, vectors = [], []
+            for item in rows:
+                vector = self.store.get(item["text"]) if self.store is not None else None
+                if vector is None:
+                    yield item
+                    continue
+                hits.append(item)
+                vectors.append(vector)
+                if len(hits) >= self.max_batch_size:
+                    done.put((hits, vectors))
+                    self._count(cached=len(hits))
+                    hits, vectors = [], []
+            if hits:
+                done.put((hits, vectors))
+                self._count(cached=len(hits))
+
+        futures = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest-embed") as pool:
+                for batch in token_batches(with_tokens(uncached(items)), self.batch_tokens, self.max_batch_size):
+                    if write_errors:
+                        break
+                    slots.acquire()
+                    futures.append(pool.submit(embed_and_queue, batch))
+                    # re-raise an embedding failure now rather than after the whole run
+                    for f in [f for f in futures if f.done()]:
+                        f.result()
+                    futures = [f for f in futures if not f.done()]
+                for f in futures:
+                    f.result()
+        finally:
+            done.put(None)
+            writer_thread.join()
+
+        if write_errors:
+            raise write_errors[0]
+        return {**self.stats, "throttled_s": round(self.stats["throttled_s"], 2), "seconds": round(time.perf_counter() - started, 2)}
+
+    def _embed_with_retries(self, batch: List[Dict[str, Any]]) -> List[List[float]]:
+        tokens = sum(item["tokens"] for item in batch)
+        for attempt in range(self.max_retries + 1):
+            throttled = self.request_bucket.acquire(1) + self.token_bucket.acquire(tokens)
+            try:
+                response = self.client.embeddings.create(model=self.model, input=[item["input"] for item in batch])
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if attempt >= self.max_retries or not retryable:
+                    raise
+                if status == 429:
+                    # everyone backs off, not just this worker
+                    wait = retry_after_seconds(e) or min(60.0, 2 ** attempt)
+                    self.request_bucket.pause(wait)
+                    self.token_bucket.pause(wait)
+                    self._count(rate_limited=1)
+                else:
+                    time.sleep(min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+                self._count(retries=1, throttled_s=throttled)
+                continue
+
+            self._count(items=len(batch), batches=1, tokens=tokens, throttled_s=throttled)
+            vectors = [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+            if self.store is not None:
+                self.store.put_many([item["text"] for item in batch], vectors)
+            return vectors
+        raise RuntimeError("unreachable")
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+
+def add_pipeline_args(parser):
+    """Shared CLI flags for the ingest scripts (defaults from the environment)"""
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("INGEST_EMBED_CONCURRENCY", "8")), help="Embedding requests in flight")
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("INGEST_EMBED_RPM", "3000")), help="Embedding requests per minute allowed")
+    parser.add_argument("--tpm", type=float, default=float(os.getenv("INGEST_EMBED_TPM", "1000000")), help="Embedding tokens per minute allowed")
+    parser.add_argument("--batch_tokens", type=int, default=int(os.getenv("INGEST_EMBED_BATCH_TOKENS", "20000")), help="Max tokens per embedding request")
+    parser.add_argument("--max_batch_size", type=int, default=int(os.getenv("INGEST_EMBED_MAX_BATCH_SIZE", "512")), help="Max inputs per embedding request")
+    parser.add_argument("--embedding_cache", default=os.getenv("INGEST_EMBED_CACHE_DIR", "embedding_cache"), help="Content-addressed embedding store ('' disables it)")
+
+
+def pipeline_from_args(client: Any, args, model: str = "text-embedding-3-small") -> EmbeddingPipeline:
+    return EmbeddingPipeline(
+        client,
+        model=model,
+        concurrency=args.concurrency,
+        requests_per_min=args.rpm,
+        tokens_per_min=args.tpm,
+        batch_tokens=args.batch_tokens,
+        max_batch_size=args.max_batch_size,
+        store=EmbeddingStore(args.embedding_cache, model) if args.embedding_cache else None,
+    )
@@ -0,0 +1,144 @@
+# backend/scripts/ingest/embedding_store.py
+"""
+Content-addressed embedding cache shared by every ingest run and collection.
+
+The parts CSVs overlap heavily with the compatibility/installation JSON
+texts, and rebuilding a Chroma store from scratch used to re-embed all of
+it. Vectors are keyed by (model, text): the key is the first 16 bytes of
+sha256("{model}\\n{text}"), the same digest as the incremental ingest's
+`content_hash`. One file per model holds
+
+    header:  b"PSEMBED1" | uint32 dim
+    records: 16-byte key | dim x float32     (fixed size, append-only)
+
+Opening the store reads only the keys (an id -> offset index); vectors are
+read from disk on lookup. A torn last record from a crash is truncated
+away. Entries are never rewritten, so the file can be copied or shared
+between machines while nothing is appending to it.
+"""
+import hashlib
+import os
+import re
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+MAGIC = b"PSEMBED1"
+HEADER = struct.Struct("<8sI")
+KEY_BYTES = 16
+SCAN_RECORDS = 4096
+
+
+def text_key(text: str, model: str) -> bytes:
+    """16-byte content address of (model, text)"""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).digest()[:KEY_BYTES]
+
+
+class EmbeddingStore:
+    """
+    Append-only on-disk map of (model, text) -> float32 vector.
+    Thread-safe; the embedding workers write to it concurrently.
+    """
+
+    def __init__(self, directory: str, model: str):
+        self.model = model
+        self.path = Path(directory) / (re.sub(r"[^A-Za-z0-9._-]+", "_", model) + ".vec")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dim: Optional[int] = None
+        self._offsets: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a+b")
+        self._load_index()
+
+    @property
+    def record_size(self) -> int:
+        return KEY_BYTES + 4 * (self.dim or 0)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """The cached vector for `text`, or None"""
+        offset = self._offsets.get(text_key(text, self.model))
+        if offset is None:
+            return None
+        with self._lock:
+            self._file.seek(offset + KEY_BYTES)
+            raw = self._file.read(4 * self.dim)
+        vector = array("f")
+        vector.frombytes(raw)
+        return vector.tolist()
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> int:
+        """
+        Append vectors for texts not yet stored, durable before returning.
+
+        Args:
+            texts: Embedded texts
+            vectors: Their embeddings, in the same order
+
+        Returns:
+            Number of new entries written
+        """
+        with self._lock:
+            if self.dim is None and vectors:
+                self._write_header(len(vectors[0]))
+            chunks = []
+            keys = []
+            for text, vector in zip(texts, vectors):
+                key = text_key(text, self.model)
+                if key in self._offsets or key in keys:
+                    continue
+                if len(vector) != self.dim:
+                    raise ValueError(f"embedding dim {len(vector)} != store dim {self.dim} ({self.path})")
+                keys.append(key)
+                chunks.append(key + array("f", vector).tobytes())
+            if not chunks:
+                return 0
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            for key in keys:
+                self._offsets[key] = offset
+                offset += self.record_size
+            return len(keys)
+
+    def close(self):
+        self._file.close()
+
+    def _write_header(self, dim: int):
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(HEADER.pack(MAGIC, dim))
+        self._file.flush()
+        self.dim = dim
+
+    def _load_index(self):
+        size = self.path.stat().st_size
+        if size < HEADER.size:
+            if size:
+                # a crash while writing the header: nothing was stored yet
+                self._file.truncate(0)
+            return
+        self._file.seek(0)
+        magic, dim = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an embedding store")
+        self.dim = dim
+
+        whole = (size - HEADER.size) // self.record_size
+        end = HEADER.size + whole * self.record_size
+        if end != size:
+            print(f"[warn] {self.path}: dropping a torn record ({size - end} bytes) from an interrupted run")
+            self._file.truncate(end)
+
+        offset = HEADER.size
+        self._file.seek(offset)
+        while offset < end:
+            block = self._file.read(min(SCAN_RECORDS, (end - offset) // self.record_size) * self.record_size)
+            for i in range(0, len(block), self.record_size):
+                self._offsets.setdefault(block[i:i + KEY_BYTES], offset + i)
+            offset += len(block)
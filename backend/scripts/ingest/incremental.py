@@ -0,0 +1,219 @@
+# backend/scripts/ingest/incremental.py
+"""
+Incremental ingest: only re-embed documents whose embedded text changed.
+
+Every document carries a `content_hash` metadata field: a hash of the
+embedding model and the exact text that was embedded. The source is read
+chunk by chunk, and each chunk is diffed against the hashes stored for just
+those ids:
+
+- new id, or same id with a different hash  -> embed + upsert
+- same hash, different metadata (e.g. price) -> metadata-only update, no embedding
+- same hash, same metadata                   -> skipped
+- id no longer in the source data            -> deleted (unless pruning is off)
+
+so a nightly refresh costs embeddings proportional to what changed. Nothing
+here holds the whole catalog: ids seen so far are kept as 8-byte hashes for
+dedupe and pruning, everything else is per chunk.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from checkpoint import IngestCheckpoint
+from embedding_pipeline import EmbeddingPipeline, prefetch
+
+HASH_FIELD = "content_hash"
+READ_PAGE_SIZE = 5000
+WRITE_CHUNK_SIZE = 1000
+
+
+def content_hash(text: str, model: str) -> str:
+    """Hash of what was embedded; a model change re-embeds everything"""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()[:32]
+
+
+class CompactIdSet:
+    """
+    Set of ids stored as 64-bit hashes (~40 bytes per id in CPython instead of
+    the full string). Collisions are negligible below billions of ids.
+    """
+
+    def __init__(self):
+        self._hashes = set()
+
+    @staticmethod
+    def _key(doc_id: str) -> int:
+        return int.from_bytes(hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def add(self, doc_id: str) -> bool:
+        """Add an id; False if it was already present"""
+        key = self._key(doc_id)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self._key(doc_id) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class IngestPlan:
+    """What a sync will do with one chunk: items to embed, metadata-only updates"""
+
+    def __init__(self):
+        self.to_embed: List[Dict[str, Any]] = []
+        self.metadata_only: List[Dict[str, Any]] = []
+        self.unchanged = 0
+
+
+def plan_changes(items: Iterable[Dict[str, Any]], stored: Dict[str, Dict[str, Any]], model: str) -> IngestPlan:
+    """
+    Diff source items against the stored metadata.
+
+    Args:
+        items: Dicts with "id", "text" and "metadata"; metadata gets the content hash added
+        stored: id -> metadata already in the collection for these ids
+        model: Embedding model name, part of the hash
+
+    Returns:
+        The IngestPlan
+    """
+    plan = IngestPlan()
+    for item in items:
+        item["metadata"] = {**item["metadata"], HASH_FIELD: content_hash(item["text"], model)}
+        current = stored.get(item["id"])
+        if current is None or current.get(HASH_FIELD) != item["metadata"][HASH_FIELD]:
+            plan.to_embed.append(item)
+        elif current != item["metadata"]:
+            plan.metadata_only.append(item)
+        else:
+            plan.unchanged += 1
+    return plan
+
+
+def stored_metadata(collection, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """id -> stored metadata for just these ids"""
+    if not ids:
+        return {}
+    found = collection.get(ids=ids, include=["metadatas"])
+    return {doc_id: meta or {} for doc_id, meta in zip(found["ids"], found["metadatas"])}
+
+
+def stale_ids(collection, seen: CompactIdSet) -> Iterator[str]:
+    """Ids in the collection that the source no longer has, read a page at a time"""
+    offset = 0
+    while True:
+        page = collection.get(include=[], limit=READ_PAGE_SIZE, offset=offset)
+        for doc_id in page["ids"]:
+            if doc_id not in seen:
+                yield doc_id
+        if len(page["ids"]) < READ_PAGE_SIZE:
+            return
+        offset += READ_PAGE_SIZE
+
+
+def chunked(items: Iterable[Dict[str, Any]], size: int = WRITE_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    buf = []
+    for item in items:
+        buf.append(item)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def sync_stream(
+    collection,
+    chunks: Iterable[List[Dict[str, Any]]],
+    pipeline: EmbeddingPipeline,
+    prune: bool = True,
+    dry_run: bool = False,
+    checkpoint: Optional[IngestCheckpoint] = None,
+    prefetch_chunks: int = 2,
+) -> Dict[str, Any]:
+    """
+    Incrementally sync a stream of item chunks into `collection`.
+
+    Reading/diffing, embedding and writing overlap: chunks are produced on a
+    reader thread behind a bounded queue, changed items flow into the
+    embedding pipeline, and a writer thread upserts finished batches.
+
+    Args:
+        collection: Target Chroma collection
+        chunks: Lists of dicts with "id", "text" and "metadata" (duplicate ids: first wins)
+        pipeline: Embedding pipeline for new and changed texts
+        prune: Delete ids that didn't appear in the stream
+        dry_run: Only count what would change
+        checkpoint: Optional journal; every upserted batch is recorded in it, and
+                    docs it already holds with the same hash aren't embedded again
+        prefetch_chunks: How many chunks the reader may run ahead
+
+    Returns:
+        Counts: embedded, metadata_only, unchanged, deleted, duplicates, resumed, plus pipeline stats
+    """
+    seen = CompactIdSet()
+    counts = {"embedded": 0, "metadata_only": 0, "unchanged": 0, "deleted": 0, "duplicates": 0, "resumed": 0}
+
+    def changed_items() -> Iterator[Dict[str, Any]]:
+        for chunk in prefetch(chunks, prefetch_chunks):
+            unique = [item for item in chunk if seen.add(item["id"])]
+            counts["duplicates"] += len(chunk) - len(unique)
+            plan = plan_changes(unique, stored_metadata(collection, [i["id"] for i in unique]), pipeline.model)
+            counts["unchanged"] += plan.unchanged
+            counts["metadata_only"] += len(plan.metadata_only)
+            # no documents passed, so Chroma keeps the stored vectors and text
+            if plan.metadata_only and not dry_run:
+                collection.update(ids=[c["id"] for c in plan.metadata_only], metadatas=[c["metadata"] for c in plan.metadata_only])
+            for item in plan.to_embed:
+                if checkpoint is not None and checkpoint.is_committed(collection.name, item["id"], item["metadata"][HASH_FIELD]):
+                    counts["resumed"] += 1
+                    continue
+                counts["embedded"] += 1
+                yield item
+
+    def write(batch, vectors):
+        # upsert, not add: add silently skips ids that already exist, so changed texts never landed
+        collection.upsert(
+            ids=[b["id"] for b in batch],
+            documents=[b["text"] for b in batch],
+            metadatas=[b["metadata"] for b in batch],
+            embeddings=vectors,
+        )
+        if checkpoint is not None:
+            checkpoint.record_batch(collection.name, batch, HASH_FIELD)
+
+    if dry_run:
+        for _ in changed_items():
+            pass
+        stats = {}
+    else:
+        stats = pipeline.run(changed_items(), write)
+
+    if prune:
+        stale = list(stale_ids(collection, seen))
+        counts["deleted"] = len(stale)
+        if not dry_run:
+            for i in range(0, len(stale), WRITE_CHUNK_SIZE):
+                collection.delete(ids=stale[i:i + WRITE_CHUNK_SIZE])
+
+    if checkpoint is not None and not dry_run:
+        checkpoint.finish(collection.name)
+    print(f"[ingest] {collection.name}: {counts['embedded']} embedded, {counts['metadata_only']} metadata-only, "
+          f"{counts['unchanged']} unchanged, {counts['deleted']} deleted, {counts['duplicates']} duplicate ids")
+    return {**counts, "pipeline": stats}
+
+
+def sync_collection(
+    collection,
+    items: Iterable[Dict[str, Any]],
+    pipeline: EmbeddingPipeline,
+    prune: bool = True,
+    dry_run: bool = False,
+    checkpoint: Optional[IngestCheckpoint] = None,
+) -> Dict[str, Any]:
+    """sync_stream over a flat iterable of items"""
+    return sync_stream(collection, chunked(items), pipeline, prune=prune, dry_run=dry_run, checkpoint=checkpoint)
@@ -7,6 +7,11 @@ import chromadb
 from chromadb.config import Settings
 from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 from dotenv import load_dotenv
+from openai import OpenAI
+
+from checkpoint import add_checkpoint_args, checkpoint_from_args
+from embedding_pipeline import add_pipeline_args, pipeline_from_args
+from incremental import sync_collection
 
 # Load environment variables from .env file
 load_dotenv()
@@ -86,7 +91,7 @@ def batch(iterable, size=100):
     if buf:
         yield buf
 
-def main(collection_name: str, persist_dir: str, dry_run: bool):
+def main(collection_name: str, persist_dir: str, dry_run: bool, args=None):
     # ---- Embeddings
     openai_key = os.getenv("OPENAI_API_KEY")
     print(f"[debug] OPENAI_API_KEY found: {'YES' if openai_key else 'NO'}")
@@ -145,19 +150,30 @@ def main(collection_name: str, persist_dir: str, dry_run: bool):
         unique_docs.append(d)
 
     if not dry_run:
-        # ---- Ingest in batches
-        inserted = 0
-        for chunk in batch(unique_docs, size=128):
-            collection.add(
-                ids=[c["id"] for c in chunk],
-                documents=[c["document"] for c in chunk],
-                metadatas=[c["metadata"] for c in chunk],
-            )
-            inserted += len(chunk)
-            print(f"[ingest] total inserted: {inserted}")
+        # ---- Incremental sync: embed only new/changed texts (content hash), update
+        # metadata-only changes, delete ids no longer in the JSONs. Changed texts are
+        # embedded in token-sized batches concurrently while a writer thread upserts them
+        # (the collection keeps its embedding function for query-time embedding)
+        openai_client = OpenAI(api_key=openai_key, base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+        pipeline = pipeline_from_args(openai_client, args)
+        items = ({"id": d["id"], "text": d["document"], "metadata": d["metadata"]} for d in unique_docs)
+        # every committed batch is journaled; rerun with --resume after a crash or preemption
+        checkpoint = checkpoint_from_args(args, "ingest_docs")
+        for path in FILES.values():
+            if path.exists():
+                checkpoint.begin_source(collection_name, path)
+        result = sync_collection(collection, items, pipeline, prune=not args.no_prune, checkpoint=checkpoint)
+        checkpoint.close()
+        pipeline.close()
 
         # ChromaDB with persistent storage automatically saves to disk
-        print(f"✅ done. inserted {inserted} docs into '{collection_name}' (persist_dir={persist_dir})")
+        print(f"✅ done. '{collection_name}': {result['embedded']} embedded, {result['metadata_only']} metadata-only, "
+              f"{result['unchanged']} unchanged, {result['deleted']} deleted, {result['resumed']} resumed "
+              f"(persist_dir={persist_dir})")
+        if result["pipeline"]:
+            stats = result["pipeline"]
+            print(f"[ingest] {stats['batches']} embedding requests, {stats['tokens']} tokens, "
+                  f"{stats['cached']} from the embedding cache, {stats['rate_limited']} rate-limited, {stats['seconds']}s")
     else:
         print(f"[dry-run] would have inserted {len(unique_docs)} unique docs into '{collection_name}'")
 
@@ -166,6 +182,9 @@ if __name__ == "__main__":
     parser.add_argument("--collection", default="partselect-docs", help="Chroma collection name")
     parser.add_argument("--persist_dir", default="chroma_store", help="Directory to persist Chroma ('' for in-memory)")
     parser.add_argument("--dry_run", action="store_true", help="Load/normalize only; do not write to Chroma")
+    parser.add_argument("--no_prune", action="store_true", help="Keep documents whose ids are no longer in the JSONs")
+    add_pipeline_args(parser)
+    add_checkpoint_args(parser, "checkpoints/ingest_docs.jsonl")
     args = parser.parse_args()
 
-    main(collection_name=args.collection, persist_dir=args.persist_dir, dry_run=args.dry_run)
\ No newline at end of file
+    main(collection_name=args.collection, persist_dir=args.persist_dir, dry_run=args.dry_run, args=args)
\ No newline at end of file
@@ -1,52 +1,70 @@
 import os
+import argparse
 import pandas as pd
 import chromadb
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from checkpoint import IngestCheckpoint, add_checkpoint_args, checkpoint_from_args
+from embedding_pipeline import EmbeddingPipeline, add_pipeline_args, pipeline_from_args
+from incremental import sync_stream
+
 # Load environment variables from .env file
 load_dotenv()
 
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-chroma = chromadb.PersistentClient(path="backend/chroma_db")
-
-def dedupe_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Drop duplicate part_ids so Chroma IDs are unique."""
-    before = len(df)
-    df = df.drop_duplicates(subset=["part_id"]).reset_index(drop=True)
-    after = len(df)
-    if before != after:
-        print(f"⚠️ Dropped {before - after} duplicate rows (based on part_id)")
-    return df
+def iter_csv_items(csv_path, chunk_rows: int = 2000):
+    """
+    Yield lists of {id, text, metadata} items, `chunk_rows` CSV rows at a time,
+    so memory doesn't grow with the catalog. Duplicate part_ids are dropped
+    downstream by the sync's seen-set (first row wins, as before).
+    """
+    for df in pd.read_csv(csv_path, chunksize=chunk_rows):
+        df = df.fillna("")
+        docs = (
+            df["title"] + " — " + df["description"] +
+            " | brand: " + df["brand"] + " | part_id: " + df["part_id"]
+        ).tolist()
+        ids = df["part_id"].tolist()
+        metas = df.to_dict(orient="records")
+        yield [{"id": i, "text": d, "metadata": m} for i, d, m in zip(ids, docs, metas)]
 
-def ingest_csv(csv_path, collection_name):
-    df = pd.read_csv(csv_path).fillna("")
-    df = dedupe_dataframe(df)  # 🧹 remove dupes before ingest
+def ingest_csv(csv_path, collection_name, chroma, pipeline: EmbeddingPipeline, prune: bool = True, checkpoint: IngestCheckpoint = None, chunk_rows: int = 2000):
+    if checkpoint is not None:
+        checkpoint.begin_source(collection_name, csv_path)
 
     col = chroma.get_or_create_collection(
         collection_name, metadata={"hnsw:space":"cosine"}
     )
 
-    docs = (
-        df["title"] + " — " + df["description"] +
-        " | brand: " + df["brand"] + " | part_id: " + df["part_id"]
-    ).tolist()
-    ids = df["part_id"].tolist()
-    metas = df.to_dict(orient="records")
-
-    for i in range(0, len(docs), 128):
-        batch = docs[i:i+128]
-        emb = client.embeddings.create(model="text-embedding-3-small", input=batch).data
-        vectors = [e.embedding for e in emb]
-        col.add(
-            ids=ids[i:i+128],
-            documents=batch,
-            metadatas=metas[i:i+128],
-            embeddings=vectors,
-        )
-
-    print(f"✅ Ingested {len(docs)} records into `{collection_name}`")
+    # the CSV is parsed a chunk at a time on a reader thread; only new/changed texts are
+    # embedded (content hash), price/stock-only changes are metadata updates, and parts
+    # gone from the CSV are deleted. Parse, embed and write overlap through bounded queues
+    result = sync_stream(col, iter_csv_items(csv_path, chunk_rows), pipeline, prune=prune, checkpoint=checkpoint)
+
+    if result["duplicates"]:
+        print(f"⚠️ Dropped {result['duplicates']} duplicate rows (based on part_id)")
+    print(f"✅ Synced `{collection_name}` "
+          f"({result['embedded']} embedded, {result['metadata_only']} metadata-only, "
+          f"{result['unchanged']} unchanged, {result['deleted']} deleted, {result['resumed']} resumed from checkpoint)")
+    if result["pipeline"]:
+        print(f"[ingest] {result['pipeline']['items']} embedded via the API, {result['pipeline']['cached']} from the embedding cache")
 
 if __name__ == "__main__":
-    ingest_csv("data/appliance_parts_dishwasher.csv", "dishwasher_parts")
-    ingest_csv("data/appliance_parts_refrigerator.csv", "refrigerator_parts")
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persist_dir", default="backend/chroma_db", help="Directory of the parts Chroma store")
+    parser.add_argument("--no_prune", action="store_true", help="Keep parts whose ids are no longer in the CSVs")
+    parser.add_argument("--chunk_rows", type=int, default=2000, help="CSV rows parsed per chunk")
+    add_pipeline_args(parser)
+    add_checkpoint_args(parser, "checkpoints/ingest_parts.jsonl")
+    args = parser.parse_args()
+
+    client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+    chroma = chromadb.PersistentClient(path=args.persist_dir)
+    pipeline = pipeline_from_args(client, args)
+    # every committed batch is journaled; rerun with --resume after a crash or preemption
+    checkpoint = checkpoint_from_args(args, "ingest_parts")
+
+    ingest_csv("data/appliance_parts_dishwasher.csv", "dishwasher_parts", chroma, pipeline, prune=not args.no_prune, checkpoint=checkpoint, chunk_rows=args.chunk_rows)
+    ingest_csv("data/appliance_parts_refrigerator.csv", "refrigerator_parts", chroma, pipeline, prune=not args.no_prune, checkpoint=checkpoint, chunk_rows=args.chunk_rows)
+    checkpoint.close()
+    pipeline.close()
@@ -0,0 +1,108 @@
+# backend/scripts/scrape/html_archive.py
+"""
+Content-addressed archive of raw scraped HTML.
+
+Every page the scrape engine loads is stored once, gzip-compressed, under
+the sha256 of its HTML:
+
+    <root>/objects/ab/ab12...ef.html.gz    one blob per distinct page body
+    <root>/index.jsonl                      append-only: url -> sha256, status, time
+
+Identical bodies (unchanged pages across crawls) share a blob, and the
+index keeps every fetch, so the latest entry per url wins. With the
+archive in place an extractor change is re-run offline (`--offline`)
+instead of re-crawling the site.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+class HtmlArchive:
+    """
+    Gzip blobs keyed by content hash, plus an append-only url index.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._latest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {"stored": 0, "deduplicated": 0, "bytes_raw": 0, "bytes_stored": 0}
+        self._load_index()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, url: str, html: str, status: Optional[int] = None) -> str:
+        """
+        Archive one fetched page.
+
+        Args:
+            url: The url that was loaded
+            html: The page's HTML (after the page rendered)
+            status: HTTP status of the navigation
+
+        Returns:
+            The blob's sha256
+        """
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if path.exists():
+                self.stats["deduplicated"] += 1
+            else:
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(f".tmp{os.getpid()}")
+                tmp.write_bytes(gzip.compress(raw, compresslevel=6))
+                # atomic: a crash never leaves a truncated blob under its final name
+                os.replace(tmp, path)
+                self.stats["stored"] += 1
+                self.stats["bytes_stored"] += path.stat().st_size
+            self.stats["bytes_raw"] += len(raw)
+
+            entry = {"url": url, "sha256": digest, "status": status, "bytes": len(raw), "fetched_at": time.time()}
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._latest[url] = entry
+        return digest
+
+    def get(self, url: str) -> Optional[str]:
+        """The latest archived HTML for `url`, or None"""
+        entry = self._latest.get(url)
+        if entry is None:
+            return None
+        try:
+            return gzip.decompress(self._blob_path(entry["sha256"]).read_bytes()).decode("utf-8")
+        except (OSError, EOFError) as e:
+            print(f"[warn] archived blob for {url} unreadable: {e}")
+            return None
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._latest
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def urls(self) -> Iterator[str]:
+        return iter(list(self._latest))
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn last line from an interrupted crawl
+                    continue
+                self._latest[entry["url"]] = entry
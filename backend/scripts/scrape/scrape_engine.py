@@ -0,0 +1,608 @@
+# backend/scripts/scrape/scrape_engine.py
+"""
+Shared async Playwright engine for the PartSelect scrapers.
+
+The scrapers used to visit pages one at a time, sleep fixed amounts
+(`wait_for_timeout(350)`, `1_500`, `time.sleep`) and open a new browser
+context per part type. Here:
+
+- one browser and a pool of N reusable contexts (one page each), recycled
+  every `recycle_after` pages to bound browser memory
+- images, media, fonts and known trackers are aborted at the network layer
+- pages wait for the selector they need instead of sleeping; an optional
+  selector (cards on a listing that may be empty) that never shows up
+  means "nothing here", not a failed page
+- an AIMD throttle sets how many pages are in flight: +1 after a window of
+  fast, clean responses, x0.5 on errors, 429/503s or slow responses, and a
+  Retry-After pauses everyone
+- failed pages retry with jittered backoff; the rest of the crawl goes on
+- with an HtmlArchive, every loaded page's HTML is archived once the
+  handler is done with it (so content it revealed, e.g. a clicked tab, is
+  in the archive); OfflineEngine later re-runs the same extractors against
+  the archive (no network, no JavaScript), spread over worker processes.
+  Runs that rewrite a CSV offline use `fresh_output`/`commit_output`
+
+Usage:
+
+    async with ScrapeEngine(max_concurrency=8) as engine:
+        async for url, doc in engine.map(urls, extract, wait_for="h1"):
+            ...
+"""
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from html_archive import HtmlArchive
+
+BASE_URL = "https://www.partselect.com"
+UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+      "AppleWebKit/537.36 (KHTML, like Gecko) "
+      "Chrome/118.0.0.0 Safari/537.36")
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "googlesyndication.com", "facebook.net", "facebook.com", "bat.bing.com", "hotjar.com",
+    "criteo.com", "criteo.net", "adnxs.com", "taboola.com", "outbrain.com", "quantserve.com",
+    "scorecardresearch.com", "newrelic.com", "nr-data.net", "clarity.ms", "youtube.com", "ytimg.com",
+)
+
+# statuses that mean "slow down", not "this page is broken"
+THROTTLE_STATUSES = {429, 503}
+
+
+class AIMDThrottle:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Every finished page is recorded. After `window` clean responses whose
+    median latency is under `target_latency_s` the limit grows by one;
+    an error, a 429/503 or a slow window halves it (at most once per
+    `cooldown_s`, so one burst of failures doesn't collapse it to 1).
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        target_latency_s: float = 4.0,
+        window: int = 10,
+        backoff: float = 0.5,
+        cooldown_s: float = 5.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.target_latency_s = target_latency_s
+        self.window = window
+        self.backoff = backoff
+        self.cooldown_s = cooldown_s
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.stats = {"increases": 0, "decreases": 0, "peak_limit": self.limit}
+        self._latencies: List[float] = []
+        self._last_decrease = float("-inf")
+        self._cond: Optional[asyncio.Condition] = None
+
+    def record(self, latency_s: float, ok: bool = True, status: Optional[int] = None, retry_after_s: Optional[float] = None):
+        """Feed one page result into the limit"""
+        now = time.monotonic()
+        if retry_after_s:
+            self.paused_until = max(self.paused_until, now + retry_after_s)
+        if not ok or status in THROTTLE_STATUSES:
+            self._decrease(now)
+            return
+
+        self._latencies.append(latency_s)
+        if len(self._latencies) < self.window:
+            return
+        median = sorted(self._latencies)[len(self._latencies) // 2]
+        self._latencies = []
+        if median > self.target_latency_s:
+            self._decrease(now)
+        elif self.limit < self.max_limit:
+            self.limit += 1
+            self.stats["increases"] += 1
+            self.stats["peak_limit"] = max(self.stats["peak_limit"], self.limit)
+
+    def _decrease(self, now: float):
+        self._latencies = []
+        if now - self._last_decrease < self.cooldown_s:
+            return
+        self._last_decrease = now
+        new_limit = max(self.min_limit, int(self.limit * self.backoff))
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.stats["decreases"] += 1
+
+    async def acquire(self):
+        """Wait for a slot under the current limit (and any Retry-After pause)"""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        while True:
+            wait = self.paused_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            async with self._cond:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                try:
+                    # re-check now and then: a pause may have been set or the limit raised
+                    await asyncio.wait_for(self._cond.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self):
+        """Free a slot; record() the result first so waiters see the new limit"""
+        self.in_flight -= 1
+        if self._cond is not None:
+            async with self._cond:
+                self._cond.notify_all()
+
+
+def is_blocked(resource_type: str, url: str, block_types=BLOCKED_RESOURCE_TYPES, block_hosts=BLOCKED_HOSTS) -> bool:
+    """Whether a request is an image/font/media load or goes to a tracker"""
+    if resource_type in block_types:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in block_hosts)
+
+
+class ContextPool:
+    """
+    Fixed set of reusable browser contexts, each with one open page.
+    A context is closed and replaced after `recycle_after` pages.
+    """
+
+    def __init__(self, browser, size: int, recycle_after: int = 200, block: bool = True, offline: bool = False, **context_kwargs):
+        self.browser = browser
+        self.size = size
+        self.recycle_after = recycle_after
+        self.block = block or offline
+        self.offline = offline
+        self.context_kwargs = context_kwargs
+        self.blocked_requests = 0
+        self._idle: "asyncio.Queue" = asyncio.Queue()
+
+    async def start(self):
+        for _ in range(self.size):
+            await self._idle.put(await self._new_slot())
+
+    async def _new_slot(self) -> Dict[str, Any]:
+        context = await self.browser.new_context(**self.context_kwargs)
+        if self.block:
+            await context.route("**/*", self._route)
+        page = await context.new_page()
+        return {"context": context, "page": page, "uses": 0}
+
+    async def _route(self, route):
+        request = route.request
+        if self.offline or is_blocked(request.resource_type, request.url):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def acquire(self) -> Dict[str, Any]:
+        return await self._idle.get()
+
+    async def release(self, slot: Dict[str, Any], broken: bool = False):
+        slot["uses"] += 1
+        if broken or slot["uses"] >= self.recycle_after:
+            try:
+                await slot["context"].close()
+            except Exception:
+                pass
+            slot = await self._new_slot()
+        await self._idle.put(slot)
+
+    async def close(self):
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            try:
+                await slot["context"].close()
+            except Exception:
+                pass
+
+
+class ScrapeEngine:
+    """
+    Async Playwright browser + context pool + AIMD throttle. Use as an async
+    context manager; `run` scrapes one page, `map` scrapes many concurrently.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        initial_concurrency: int = 2,
+        target_latency_s: float = 4.0,
+        headless: bool = True,
+        block_resources: bool = True,
+        nav_timeout_ms: int = 60_000,
+        selector_timeout_ms: int = 20_000,
+        max_retries: int = 2,
+        recycle_after: int = 200,
+        user_agent: str = UA,
+        archive: Optional[HtmlArchive] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.throttle = AIMDThrottle(
+            initial=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=self.max_concurrency,
+            target_latency_s=target_latency_s,
+        )
+        self.headless = headless
+        self.block_resources = block_resources
+        self.nav_timeout_ms = nav_timeout_ms
+        self.selector_timeout_ms = selector_timeout_ms
+        self.max_retries = max_retries
+        self.recycle_after = recycle_after
+        self.user_agent = user_agent
+        self.archive = archive
+        self.stats = {"pages": 0, "failed": 0, "retries": 0, "throttled": 0}
+        self._started = 0.0
+        self._playwright = None
+        self.browser = None
+        self.pool: Optional[ContextPool] = None
+
+    async def __aenter__(self) -> "ScrapeEngine":
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError as e:
+            raise SystemExit("playwright is not installed: pip install playwright && playwright install chromium") from e
+        self._started = time.perf_counter()
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        self.pool = ContextPool(
+            self.browser, self.max_concurrency, recycle_after=self.recycle_after,
+            block=self.block_resources, user_agent=self.user_agent,
+        )
+        await self.pool.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.pool is not None:
+            await self.pool.close()
+        if self.browser is not None:
+            await self.browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        print(f"[scrape] {self.summary()}")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            **({"archive": dict(self.archive.stats)} if self.archive is not None else {}),
+            "blocked_requests": self.pool.blocked_requests if self.pool else 0,
+            "concurrency": self.throttle.limit,
+            "peak_concurrency": self.throttle.stats["peak_limit"],
+            "seconds": round(time.perf_counter() - self._started, 1),
+        }
+
+    async def run(
+        self,
+        url: str,
+        handler: Callable[[Any, str], Awaitable[Any]],
+        wait_for: Optional[str] = None,
+        wait_optional: bool = False,
+    ) -> Any:
+        """
+        Load `url` in a pooled page and return `await handler(page, url)`.
+
+        Args:
+            url: Page to load
+            handler: Extraction coroutine; gets the loaded page and the url
+            wait_for: Selector that must be attached before the handler runs
+            wait_optional: The page may legitimately lack `wait_for`; if it never
+                appears the handler still runs (and should find nothing), and
+                the page counts as a clean, not a failed, load
+
+        Returns:
+            The handler's result, or None if the page failed after all retries
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.throttle.acquire()
+            slot = await self.pool.acquire()
+            started = time.monotonic()
+            status, broken, retry_after, error = None, False, None, None
+            latency = None
+            try:
+                response = await slot["page"].goto(url, timeout=self.nav_timeout_ms, wait_until="domcontentloaded")
+                status = response.status if response is not None else None
+                if status in THROTTLE_STATUSES:
+                    self.stats["throttled"] += 1
+                    retry_after = _retry_after(await response.all_headers())
+                    raise RuntimeError(f"HTTP {status}")
+                loaded_s = time.monotonic() - started
+                if wait_for and not await self._wait_for(slot["page"], wait_for, wait_optional):
+                    # time spent waiting for an absent optional selector says nothing about the site's speed
+                    latency = loaded_s
+                try:
+                    result = await handler(slot["page"], url)
+                finally:
+                    if self.archive is not None:
+                        # after the handler's clicks (offline has no JavaScript to repeat them),
+                        # and even if it failed, so a broken extractor can be fixed and re-run offline
+                        await asyncio.to_thread(self.archive.put, url, await slot["page"].content(), status)
+                self.throttle.record(latency if latency is not None else time.monotonic() - started, ok=True, status=status)
+            except Exception as e:
+                error = e
+                broken = status is None  # navigation itself failed; start from a fresh context
+                self.throttle.record(time.monotonic() - started, ok=False, status=status, retry_after_s=retry_after)
+            finally:
+                await self.pool.release(slot, broken=broken)
+                await self.throttle.release()
+
+            if error is None:
+                self.stats["pages"] += 1
+                return result
+            if attempt >= self.max_retries:
+                self.stats["failed"] += 1
+                print(f"  (error) {url}: {type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}")
+                return None
+            # back off without holding a context or a throttle slot
+            self.stats["retries"] += 1
+            await asyncio.sleep(min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+        return None
+
+    async def _wait_for(self, page, selector: str, optional: bool) -> bool:
+        """Wait for `selector`; False if an optional one never appeared (a required one raises)"""
+        try:
+            await page.wait_for_selector(selector, timeout=self.selector_timeout_ms, state="attached")
+            return True
+        except Exception:
+            if not optional:
+                raise
+            return False
+
+    async def map(
+        self,
+        urls: Iterable[str],
+        handler: Callable[[Any, str], Awaitable[Any]],
+        wait_for: Optional[str] = None,
+        wait_optional: bool = False,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Scrape many urls concurrently; yields (url, result) as pages finish
+        (wrap in `in_order` to get them in `urls` order). Failed pages yield
+        None. At most `max_concurrency` tasks exist at once.
+        """
+        pending = set()
+        urls = iter(urls)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.max_concurrency:
+                try:
+                    url = next(urls)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(self._run_tagged(url, handler, wait_for, wait_optional)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    async def _run_tagged(self, url, handler, wait_for, wait_optional=False):
+        return url, await self.run(url, handler, wait_for, wait_optional)
+
+
+class OfflineEngine(ScrapeEngine):
+    """
+    Same interface as ScrapeEngine, but pages come from an HtmlArchive via
+    `page.set_content` with JavaScript off and every network request
+    aborted. `map` splits its urls across `processes` worker processes,
+    each with its own browser, so re-extraction is a local CPU job.
+    Handlers given to `map` must be picklable (module-level functions or
+    functools.partial of one).
+    """
+
+    def __init__(self, archive: HtmlArchive, processes: int = 1, pages_per_process: int = 4, headless: bool = True):
+        super().__init__(max_concurrency=pages_per_process, headless=headless, archive=archive, max_retries=0)
+        self.processes = max(1, processes)
+        self.selector_timeout_ms = 2_000
+        self.stats = {"pages": 0, "failed": 0, "missing": 0}
+
+    async def __aenter__(self) -> "OfflineEngine":
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError as e:
+            raise SystemExit("playwright is not installed: pip install playwright && playwright install chromium") from e
+        self._started = time.perf_counter()
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        # archived HTML is already rendered: no scripts, nothing fetched
+        self.pool = ContextPool(self.browser, self.max_concurrency, offline=True, java_script_enabled=False)
+        await self.pool.start()
+        print(f"[offline] {len(self.archive)} archived urls in {self.archive.root}")
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "processes": self.processes,
+            "seconds": round(time.perf_counter() - self._started, 1),
+        }
+
+    async def run(self, url: str, handler: Callable[[Any, str], Awaitable[Any]], wait_for: Optional[str] = None, wait_optional: bool = False) -> Any:
+        html = self.archive.get(url)
+        if html is None:
+            self.stats["missing"] += 1
+            return None
+        slot = await self.pool.acquire()
+        try:
+            await slot["page"].set_content(html, wait_until="domcontentloaded")
+            if wait_for:
+                await self._wait_for(slot["page"], wait_for, wait_optional)
+            result = await handler(slot["page"], url)
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"  (error) {url}: {type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+            return None
+        finally:
+            await self.pool.release(slot)
+        self.stats["pages"] += 1
+        return result
+
+    async def map(self, urls, handler, wait_for=None, wait_optional=False):
+        urls = list(urls)
+        if self.processes == 1 or len(urls) < 2 * self.processes:
+            async for item in super().map(urls, handler, wait_for, wait_optional):
+                yield item
+            return
+
+        # round-robin shards, one per worker process; results stream back shard by shard
+        shards = [urls[i::self.processes] for i in range(self.processes)]
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            futures = [
+                loop.run_in_executor(pool, _offline_shard, str(self.archive.root), handler, shard, wait_for, self.max_concurrency, wait_optional)
+                for shard in shards
+            ]
+            for future in asyncio.as_completed(futures):
+                results, stats = await future
+                for key, value in stats.items():
+                    self.stats[key] += value
+                for item in results:
+                    yield item
+
+
+def _offline_shard(archive_root: str, handler, urls: List[str], wait_for: Optional[str], pages: int, wait_optional: bool = False):
+    """Worker process: extract one shard of urls with its own browser"""
+    async def extract_all():
+        async with OfflineEngine(HtmlArchive(archive_root), processes=1, pages_per_process=pages) as engine:
+            results = [item async for item in engine.map(urls, handler, wait_for, wait_optional)]
+            return results, engine.stats
+
+    return asyncio.run(extract_all())
+
+
+async def in_order(results: AsyncIterator[Tuple[str, Any]], urls: List[str]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Re-yield `map` results in `urls` order: each one as soon as every url
+    before it has finished, so rows can still be streamed to disk.
+    """
+    position = {url: i for i, url in enumerate(urls)}
+    finished: Dict[int, Tuple[str, Any]] = {}
+    next_index = 0
+    async for url, result in results:
+        finished[position[url]] = (url, result)
+        while next_index in finished:
+            yield finished.pop(next_index)
+            next_index += 1
+
+
+def fresh_output(path: Path, offline: bool) -> Path:
+    """
+    Where a scraper should append its CSV rows. Online runs append to `path`
+    as before; an --offline run re-extracts every archived page, so it writes
+    a fresh sibling file that `commit_output` moves over `path` at the end
+    (appending would add a second, ignored copy of every row).
+    """
+    path = Path(path)
+    if not offline:
+        return path
+    tmp = path.with_name(path.name + ".offline")
+    tmp.unlink(missing_ok=True)
+    return tmp
+
+
+def commit_output(written: Path, path: Path):
+    """Replace `path` with the file an --offline run wrote (no-op online)"""
+    written, path = Path(written), Path(path)
+    if written != path and written.exists():
+        os.replace(written, path)
+        print(f"[offline] replaced {path}")
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    try:
+        return float(headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def absolute(href: str) -> str:
+    return BASE_URL + href if href.startswith("/") else href
+
+
+async def _part_card_links(page, url: str) -> List[str]:
+    hrefs = await page.locator("a.nf__part__detail__title").evaluate_all("els => els.map(e => e.getAttribute('href'))")
+    return [absolute(h) for h in hrefs if h and "/PS" in h]
+
+
+async def _part_type_links(page, url: str) -> List[str]:
+    hrefs = await page.locator("#ShopByPartType + ul a").evaluate_all("els => els.map(e => e.getAttribute('href'))")
+    return [absolute(h) for h in hrefs if h]
+
+
+async def get_part_type_links(engine: ScrapeEngine, category_url: str) -> List[str]:
+    """Links to each part-type page of a category page"""
+    return await engine.run(category_url, _part_type_links, wait_for="#ShopByPartType") or []
+
+
+async def get_part_links(engine: ScrapeEngine, part_type_url: str, limit: Optional[int]) -> List[str]:
+    """Links to part detail pages listed on a part-type page (waits for the cards, no fixed sleep; none is fine)"""
+    links = await engine.run(part_type_url, _part_card_links, wait_for="a.nf__part__detail__title", wait_optional=True) or []
+    return links if limit is None else links[:limit]
+
+
+async def crawl_part_links(engine: ScrapeEngine, category_urls: Iterable[str], limit: Optional[int]) -> AsyncIterator[Tuple[str, str]]:
+    """
+    (category_url, part_url) for every part of every part type, part-type
+    pages fetched concurrently but yielded in page order. Part urls are
+    deduped across part types.
+    """
+    seen = set()
+    for category_url in category_urls:
+        type_links = await get_part_type_links(engine, category_url)
+        print(f"Found {len(type_links)} part types in {category_url}")
+        # a part type with no cards is an empty listing, not a failed page
+        pages = engine.map(type_links, _part_card_links, wait_for="a.nf__part__detail__title", wait_optional=True)
+        async for type_url, links in in_order(pages, type_links):
+            links = (links or []) if limit is None else (links or [])[:limit]
+            print(f"  • Found {len(links)} part links in: {type_url}")
+            for link in links:
+                if link not in seen:
+                    seen.add(link)
+                    yield category_url, link
+
+
+def add_engine_args(parser):
+    """Shared CLI flags for the scrapers (defaults from the environment)"""
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("SCRAPE_MAX_CONCURRENCY", "8")), help="Browser contexts in the pool (max pages in flight)")
+    parser.add_argument("--min_concurrency", type=int, default=int(os.getenv("SCRAPE_MIN_CONCURRENCY", "1")), help="Floor for the adaptive throttle")
+    parser.add_argument("--target_latency", type=float, default=float(os.getenv("SCRAPE_TARGET_LATENCY_S", "4")), help="Median page time (s) above which concurrency backs off")
+    parser.add_argument("--show", action="store_true", help="Run the browser visibly")
+    parser.add_argument("--headless", action="store_true", help="Run headless (the default; kept for old invocations)")
+    parser.add_argument("--no_block", action="store_true", help="Load images, fonts and trackers too")
+    parser.add_argument("--archive", default=os.getenv("SCRAPE_ARCHIVE_DIR", "html_archive"), help="Raw HTML archive directory ('' disables archiving)")
+    parser.add_argument("--offline", action="store_true", help="Re-run extraction against the archive instead of the site")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("SCRAPE_OFFLINE_PROCESSES", str(os.cpu_count() or 1))), help="Worker processes for --offline")
+
+
+def engine_from_args(args) -> ScrapeEngine:
+    if args.offline:
+        if not args.archive:
+            raise SystemExit("--offline needs --archive")
+        return OfflineEngine(HtmlArchive(args.archive), processes=args.processes, pages_per_process=args.concurrency, headless=not args.show)
+    return ScrapeEngine(
+        max_concurrency=args.concurrency,
+        min_concurrency=args.min_concurrency,
+        initial_concurrency=min(2, args.concurrency),
+        target_latency_s=args.target_latency,
+        headless=not args.show,
+        block_resources=not args.no_block,
+        archive=HtmlArchive(args.archive) if args.archive else None,
+    )
@@ -1,59 +1,64 @@
-import time
+import argparse
+import asyncio
 import csv
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 
-BASE_URL = "https://www.partselect.com"
+from scrape_engine import BASE_URL, add_engine_args, commit_output, engine_from_args, fresh_output
 
 
-def extract_models_on_page(page, page_num=1):
+async def extract_models_on_page(engine, page_num=1):
     model_url = f"{BASE_URL}/Refrigerator-Models.htm?start={page_num}"
-    page.goto(model_url, timeout=60000)
 
-    try:
-        page.wait_for_selector(".nf__links li a", timeout=10000)
-    except:
+    async def extract(page, url):
+        model_data = []
+        model_elements = page.locator(".nf__links li a")
+        for i in range(await model_elements.count()):
+            element = model_elements.nth(i)
+            name = (await element.text_content()).strip()
+            link = await element.get_attribute("href")
+            full_link = BASE_URL + link if link.startswith("/") else link
+            model_data.append({
+                "model_name": name,
+                "model_url": full_link
+            })
+        return model_data
+
+    models = await engine.run(model_url, extract, wait_for=".nf__links li a")
+    if models is None:
         print(f"Timeout on page {model_url} — skipping.")
-        return []
+    return models or []
+
 
-    model_elements = page.locator(".nf__links li a")
+def parse_part_ids(html: str):
+    """PartSelect numbers on a model's parts page, or None if the page has no parts"""
+    if "Page Not Found" in html or "Sorry, we couldn't find any parts that matched." in html:
+        return None
 
-    model_data = []
-    count = model_elements.count()
-    for i in range(count):
-        element = model_elements.nth(i)
-        name = element.text_content().strip()
-        link = element.get_attribute("href")
-        full_link = BASE_URL + link if link.startswith("/") else link
-        model_data.append({
-            "model_name": name,
-            "model_url": full_link
-        })
-    return model_data
+    part_ids = []
+    soup = BeautifulSoup(html, "html.parser")
+    for span in soup.find_all("span", class_="bold"):
+        if span.get_text(strip=True) == "PartSelect #:":
+            parent_div = span.find_parent("div")
+            if parent_div:
+                span.extract()
+                part_ids.append(parent_div.get_text(strip=True))
+    return part_ids
 
 
-def extract_parts_from_model(page, model):
+async def extract_parts_from_model(engine, model):
     part_ids = []
     part_page_num = 1
 
-    while True and part_page_num <= 10:  # Limit to 100 pages to avoid infinite loop
-        part_url = f"{model['model_url']}Parts/?start={part_page_num}"
-        page.goto(part_url, timeout=60000)
+    async def extract(page, url):
+        return parse_part_ids(await page.content())
 
-        if "Page Not Found" in page.content() or "Sorry, we couldn't find any parts that matched." in page.content():
+    # a model's pages are sequential (stop at the first empty one); models run concurrently
+    while part_page_num <= 10:  # Limit to 10 pages to avoid infinite loop
+        part_url = f"{model['model_url']}Parts/?start={part_page_num}"
+        page_ids = await engine.run(part_url, extract)
+        if page_ids is None:  # no more parts (or the page kept failing)
             break
-
-        soup = BeautifulSoup(page.content(), "html.parser")
-        bold_spans = soup.find_all("span", class_="bold")
-
-        for span in bold_spans:
-            if span.get_text(strip=True) == "PartSelect #:":
-                parent_div = span.find_parent("div")
-                if parent_div:
-                    span.extract()
-                    part_id = parent_div.get_text(strip=True)
-                    part_ids.append(part_id)
-
+        part_ids.extend(page_ids)
         part_page_num += 1
 
 
@@ -63,7 +68,10 @@ def extract_parts_from_model(page, model):
     }
 
 
-def save_streamed_model_part_data(row, file_path="data/model_parts_map_refrigerator.csv"):
+OUT_CSV = "data/model_parts_map_refrigerator.csv"
+
+
+def save_streamed_model_part_data(row, file_path=OUT_CSV):
     file_exists = False
     try:
         with open(file_path, mode="r", encoding="utf-8") as _:
@@ -78,26 +86,34 @@ def save_streamed_model_part_data(row, file_path="data/model_parts_map_refrigera
         writer.writerow(row)
 
 
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
+async def main(args):
+    # --offline rebuilds the CSV from the archive instead of appending to it
+    write_csv = fresh_output(OUT_CSV, args.offline)
 
-        for page_num in range(1, 2):  # Extend range for more pages
+    async with engine_from_args(args) as engine:
+        for page_num in range(1, args.model_pages + 1):  # Extend range for more pages
             print(f"\nExtracting models from page {page_num}...")
-            models = extract_models_on_page(page, page_num)
+            models = await extract_models_on_page(engine, page_num)
             print(f"Found {len(models)} models")
 
-            for i, model in enumerate(models):  # Limit to first 5 models for testing
-                print(f"\n[{i+1}/{len(models)}] Processing model: {model['model_name']}")
-                part_record = extract_parts_from_model(page, model)
-                save_streamed_model_part_data(part_record)
-                time.sleep(0.5)
+            # up to --concurrency models at once; the engine's throttle decides pages in flight
+            gate = asyncio.Semaphore(engine.max_concurrency)
+
+            async def process(model):
+                async with gate:
+                    return await extract_parts_from_model(engine, model)
 
-        context.close()
-        browser.close()
+            # models run concurrently; rows are written in listing order as each prefix completes
+            tasks = [asyncio.ensure_future(process(model)) for model in models]
+            for i, task in enumerate(tasks):
+                part_record = await task
+                print(f"[{i+1}/{len(models)}] {part_record['model_name']}: {part_record['part_ids'][:60]}")
+                save_streamed_model_part_data(part_record, write_csv)
+    commit_output(write_csv, OUT_CSV)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Map refrigerator models to their PartSelect part numbers.")
+    parser.add_argument("--model_pages", type=int, default=1, help="Model listing pages to crawl")
+    add_engine_args(parser)
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -19,20 +19,17 @@ part fixes (as shown in the “Troubleshooting” tab on the part page).
 }
 """
 
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-import pathlib, json, re, time, hashlib, sys
+import argparse, asyncio, functools, pathlib, json, re, hashlib
+
+from scrape_engine import BASE_URL as BASE, add_engine_args, crawl_part_links, engine_from_args
 
 # ---------- configuration ---------------------------------------------------
-BASE = "https://www.partselect.com"
 CATEGORY = {
     "dishwasher":   "/Dishwasher-Parts.htm",
     "refrigerator": "/Refrigerator-Parts.htm",
 }
 OUT_PATH       = pathlib.Path("data/troubleshooting.json")
 PER_TYPE_LIMIT = 8          # parts per part-type page  (raise for bigger corpus)
-UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-      "AppleWebKit/537.36 (KHTML, like Gecko) "
-      "Chrome/118.0.0.0 Safari/537.36")
 
 # ---------- helpers ---------------------------------------------------------
 CLEAN = lambda s: " ".join((s or "").split())
@@ -42,45 +39,26 @@ SYMPTAB_RE = re.compile(r"(\d{1,3})%")
 def digest(appliance: str, part: str) -> str:
     return hashlib.md5(f"{appliance}:{part}".encode()).hexdigest()[:12]
 
-def get_part_type_links(page, category_url):
-    page.goto(category_url, timeout=60_000)
-    page.wait_for_selector("#ShopByPartType", timeout=20_000)
-    links = []
-    for i in range(page.locator("#ShopByPartType + ul a").count()):
-        href = page.locator("#ShopByPartType + ul a").nth(i).get_attribute("href")
-        if href:
-            links.append(BASE + href if href.startswith("/") else href)
-    return links
-
-def get_part_links(page, part_type_url, limit):
-    page.goto(part_type_url, timeout=60_000)
-    page.wait_for_timeout(1500)
-    cards = page.locator("a.nf__part__detail__title")
-    out   = []
-    for i in range(min(cards.count(), limit)):
-        href = cards.nth(i).get_attribute("href")
-        if href and "/PS" in href:
-            out.append(BASE + href if href.startswith("/") else href)
-    return out
-
-def extract_troubleshooting(page):
-    # click the Troubleshooting tab if present
+async def extract_troubleshooting(page):
+    rows = page.locator("div[id^='troubleshooting'] div.symptoms")
+
+    # click the Troubleshooting tab if its rows aren't in the DOM yet, then wait for them (not a fixed delay)
     try:
         tab = page.locator("text=Troubleshooting").first
-        if tab.count():
-            tab.click(); page.wait_for_timeout(400)
+        if not await rows.count() and await tab.count():
+            await tab.click()
+            await page.wait_for_selector("div[id^='troubleshooting'] div.symptoms", state="attached", timeout=2_000)
     except Exception:
         pass
 
-    rows = page.locator("div[id^='troubleshooting'] div.symptoms")
     data = []
-    for i in range(rows.count()):
+    for i in range(await rows.count()):
         row = rows.nth(i)
         try:
-            symp = CLEAN(row.locator("div.symptoms__header").text_content())
-            pct_raw = row.locator("div.symptoms__percent span.bold").text_content()
+            symp = CLEAN(await row.locator("div.symptoms__header").text_content())
+            pct_raw = await row.locator("div.symptoms__percent span.bold").text_content()
             pct = int(SYMPTAB_RE.search(pct_raw).group(1)) if pct_raw else None
-            desc = CLEAN(row.locator("p.mb-4").text_content())
+            desc = CLEAN(await row.locator("p.mb-4").text_content())
             data.append({"symptom": symp,
                          "fix_percentage": pct,
                          "description": desc})
@@ -88,18 +66,12 @@ def extract_troubleshooting(page):
             continue
     return data
 
-def scrape_part(page, url, appliance):
-    try:
-        page.goto(url, timeout=60_000)
-        page.wait_for_selector("h1", timeout=20_000)
-    except PWTimeout:
-        return None
-
-    title = CLEAN(page.locator("h1").first.text_content())
+async def scrape_part(page, url, appliance):
+    title = CLEAN(await page.locator("h1").first.text_content())
     m     = PS_RE.search(url) or PS_RE.search(title)
     part  = m.group(0) if m else title[:30]
 
-    symps = extract_troubleshooting(page)
+    symps = await extract_troubleshooting(page)
     if not symps:
         return None
 
@@ -114,34 +86,41 @@ def scrape_part(page, url, appliance):
                  f"e.g. {symps[0]['symptom']} ({symps[0]['fix_percentage']} %).")
     }
 
+async def scrape_listed_part(appliance_by_link, page, url):
+    # module-level (bound with functools.partial) so --offline can ship it to worker processes
+    return await scrape_part(page, url, appliance_by_link[url])
+
 # ---------- main ------------------------------------------------------------
-def main(headless=True):
+async def main(args, per_type_limit: int = PER_TYPE_LIMIT):
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    docs, seen = [], set()
+    appliances = {BASE + cat: appliance for appliance, cat in CATEGORY.items()}
+    found = {}
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        ctx     = browser.new_context(user_agent=UA)
-        page    = ctx.new_page()
+    async with engine_from_args(args) as engine:
+        part_links = {}
+        async for category_url, link in crawl_part_links(engine, appliances, per_type_limit):
+            part_links[link] = appliances[category_url]
 
-        for appliance, cat in CATEGORY.items():
-            print(f"⇢ {appliance}")
-            part_type_links = get_part_type_links(page, BASE + cat)
+        extract = functools.partial(scrape_listed_part, part_links)
+        async for link, doc in engine.map(part_links, extract, wait_for="h1"):
+            if doc:
+                found[link] = doc
+                print("  •", doc["part_number"], "->", doc["symptoms"][0]["symptom"])
 
-            for pt_link in part_type_links:
-                part_links = get_part_links(page, pt_link, PER_TYPE_LIMIT)
-                for link in part_links:
-                    doc = scrape_part(page, link, appliance)
-                    if doc and doc["id"] not in seen:
-                        docs.append(doc); seen.add(doc["id"])
-                        print("  •", doc["part_number"], "->", doc["symptoms"][0]["symptom"])
-                    time.sleep(0.2)
-
-        browser.close()
+    # crawl order (pages finish out of order), first doc per id wins as before
+    docs, seen = [], set()
+    for link in part_links:
+        doc = found.get(link)
+        if doc and doc["id"] not in seen:
+            docs.append(doc); seen.add(doc["id"])
 
     OUT_PATH.write_text(json.dumps(docs, indent=2))
     print("\nWrote", len(docs), "docs →", OUT_PATH.resolve())
 
 if __name__ == "__main__":
-    # run visible once; flip headless=True when happy
-    main(headless=False if "--show" in sys.argv else True)
\ No newline at end of file
+    # headless by default; --show to watch the browser
+    parser = argparse.ArgumentParser(description="Scrape PartSelect troubleshooting symptoms to data/troubleshooting.json.")
+    parser.add_argument("--limit", type=int, default=PER_TYPE_LIMIT, help=f"Max parts per part-type page (default: {PER_TYPE_LIMIT})")
+    add_engine_args(parser)
+    args = parser.parse_args()
+    asyncio.run(main(args, per_type_limit=args.limit))
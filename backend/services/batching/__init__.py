@@ -0,0 +1,9 @@
+"""
+Batching Package
+
+Provides the micro-batching primitive used to coalesce concurrent upstream calls.
+"""
+
+from .micro_batcher import MicroBatcher
+
+__all__ = ["MicroBatcher"]
@@ -0,0 +1,221 @@
+"""
+Micro Batcher - Coalesces concurrent single-item calls into batched calls
+
+Callers submit one item at a time and get a Future back. A background worker
+collects items for up to `max_wait_ms` (or until `max_batch_size` items are
+waiting) and hands the whole batch to a small executor, which calls the
+handler and fans the results back out to the waiting futures. Up to
+`max_in_flight` batches run at once, so one slow upstream call doesn't stall
+everything queued behind it; when all slots are busy, waiting items pile up
+into the next (larger) batch.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from services.profiling_service import current_profile, sampled_thread
+
+
+class MicroBatcher:
+    """
+    Generic thread-based micro-batcher.
+
+    The handler receives a list of items and must return a list of results of
+    the same length and order. If the handler raises, every future in that
+    batch gets the exception.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+        stats_window: int = 1024,
+        max_in_flight: int = 4,
+    ):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.name = name
+
+        # handler calls run here, at most max_in_flight at a time
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix=name)
+        self._in_flight = 0
+
+        # (item, future, enqueued_at, submitter's profiler or None)
+        self._queue: "queue.Queue[Tuple[Any, Future, float, Any]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Deque[int] = deque(maxlen=stats_window)
+        self._queue_waits_ms: Deque[float] = deque(maxlen=stats_window)
+        self._total_batches = 0
+        self._total_items = 0
+        self._total_errors = 0
+
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._stopped = False
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue a single item for the next batch.
+
+        Args:
+            item: The item to hand to the batch handler
+
+        Returns:
+            Future resolved with this item's result
+        """
+        if self._stopped:
+            raise RuntimeError(f"{self.name} has been shut down")
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter(), current_profile()))
+        return future
+
+    def submit_many(self, items: List[Any]) -> List[Future]:
+        """Queue several items; they may be spread across batches"""
+        return [self.submit(item) for item in items]
+
+    def queue_depth(self) -> int:
+        """Number of items waiting for a batch"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batch-size and queue-wait statistics over the recent window.
+
+        Returns:
+            Dict containing totals plus batch size and queue wait summaries
+        """
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._queue_waits_ms)
+            total_batches = self._total_batches
+            total_items = self._total_items
+            total_errors = self._total_errors
+            in_flight = self._in_flight
+
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": in_flight,
+            "queue_depth": self.queue_depth(),
+            "total_batches": total_batches,
+            "total_items": total_items,
+            "total_errors": total_errors,
+            "batch_size": {
+                "avg": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "max": max(sizes) if sizes else 0,
+            },
+            "queue_wait_ms": {
+                "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50": _percentile(waits, 0.50),
+                "p95": _percentile(waits, 0.95),
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+        }
+
+    def shutdown(self, timeout: float = 1.0):
+        """Stop the worker thread once the queue drains"""
+        self._stopped = True
+        worker = self._worker
+        if worker and worker.is_alive():
+            self._queue.put(None)  # wake-up sentinel
+            worker.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    def _ensure_worker(self):
+        """Start the worker thread lazily on first submit"""
+        if self._worker and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            # wait for a free slot first, so items queue up into the next batch meanwhile
+            self._slots.acquire()
+            first = self._queue.get()
+            if first is None:
+                self._slots.release()
+                if self._stopped:
+                    return
+                continue
+
+            batch = [first]
+            deadline = first[2] + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    continue
+                batch.append(entry)
+
+            with self._stats_lock:
+                self._in_flight += 1
+            try:
+                self._executor.submit(self._dispatch_and_release, batch)
+            except RuntimeError:
+                # executor shut down under us: run inline so no caller is left waiting
+                self._dispatch_and_release(batch)
+
+    def _dispatch_and_release(self, batch: List[Tuple[Any, Future, float, Any]]):
+        try:
+            self._dispatch(batch)
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _dispatch(self, batch: List[Tuple[Any, Future, float, Any]]):
+        dispatched_at = time.perf_counter()
+        items = [entry[0] for entry in batch]
+
+        with self._stats_lock:
+            self._total_batches += 1
+            self._total_items += len(batch)
+            self._batch_sizes.append(len(batch))
+            for _, _, enqueued_at, _ in batch:
+                self._queue_waits_ms.append((dispatched_at - enqueued_at) * 1000.0)
+
+        # the batch is work for every profiled request in it
+        profiles = {entry[3] for entry in batch if entry[3] is not None}
+        try:
+            with sampled_thread(*profiles):
+                results = self.handler(items)
+            if len(results) != len(items):
+                raise ValueError(f"{self.name} handler returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            with self._stats_lock:
+                self._total_errors += 1
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
@@ -0,0 +1,10 @@
+"""
+Context Service Package
+
+Provides token-budgeted prompt context building for the PartSelect Assistant API.
+"""
+
+from .context_service import ContextService
+from .tokenizer import count_tokens
+
+__all__ = ["ContextService", "count_tokens"]
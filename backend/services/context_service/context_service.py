@@ -0,0 +1,304 @@
+"""
+Context Service - Builds the retrieved-evidence section of the LLM prompt under a token budget
+
+Evidence is packed in priority order: extracted identifiers, then direct
+lookup results (cross-checks first, then manuals, then mapping lists), then
+semantic search supplements. Long lists and long texts are trimmed to what
+fits instead of being pasted whole, and fields that repeat information
+already in the context are left out.
+"""
+from typing import Dict, Any, List, Optional
+
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_LIST_ITEMS
+from .tokenizer import count_tokens, tokenizer_name
+
+# lower number = packed first
+DIRECT_MATCH_PRIORITY = {
+    "cross_check": 0,
+    "installation_manual": 1,
+    "part_to_models": 2,
+    "model_to_parts": 2,
+}
+
+# below this many tokens a trimmed text isn't worth including
+MIN_TRUNCATED_TOKENS = 20
+
+
+class ContextPacker:
+    """
+    Accumulates context sections while tracking the remaining token budget.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        self.parts: List[str] = []
+        self.included: List[str] = []
+        self.dropped: List[str] = []
+        self.truncated = False
+
+    def remaining(self) -> int:
+        return self.budget - self.used
+
+    def add(self, name: str, text: str) -> bool:
+        """Add a section whole, or drop it if it doesn't fit"""
+        tokens = count_tokens(text)
+        if tokens > self.remaining():
+            self.dropped.append(name)
+            return False
+        self._append(name, text, tokens)
+        return True
+
+    def add_list(self, name: str, prefix: str, items: List[str], max_items: int, suffix: str = "\n") -> bool:
+        """Add a comma-separated list, keeping as many items as fit"""
+        if not items:
+            return self.add(name, f"{prefix}none{suffix}")
+
+        fixed = count_tokens(f"{prefix} (+{len(items)} more){suffix}")
+        available = self.remaining() - fixed
+        kept: List[str] = []
+        for item in items[:max_items]:
+            cost = count_tokens(item) + 1  # separator
+            if cost > available:
+                break
+            kept.append(item)
+            available -= cost
+
+        if not kept:
+            self.dropped.append(name)
+            return False
+
+        omitted = len(items) - len(kept)
+        if omitted:
+            self.truncated = True
+        text = f"{prefix}{', '.join(kept)}{f' (+{omitted} more)' if omitted else ''}{suffix}"
+        self._append(name, text, count_tokens(text))
+        return True
+
+    def add_truncated(self, name: str, prefix: str, body: str, suffix: str = "\n") -> bool:
+        """Add a text section, trimming the body to fit the remaining budget"""
+        text = f"{prefix}{body}{suffix}"
+        tokens = count_tokens(text)
+        if tokens <= self.remaining():
+            self._append(name, text, tokens)
+            return True
+
+        available = self.remaining() - count_tokens(f"{prefix}...{suffix}")
+        if available < MIN_TRUNCATED_TOKENS:
+            self.dropped.append(name)
+            return False
+
+        # binary search for the longest prefix of body that fits
+        lo, hi = 0, len(body)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if count_tokens(body[:mid]) <= available:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        self.truncated = True
+        text = f"{prefix}{body[:lo].rstrip()}...{suffix}"
+        self._append(name, text, count_tokens(text))
+        return True
+
+    def _append(self, name: str, text: str, tokens: int):
+        self.parts.append(text)
+        self.used += tokens
+        self.included.append(name)
+
+    def result(self) -> Dict[str, Any]:
+        text = "".join(self.parts)
+        return {
+            "text": text,
+            "tokens": count_tokens(text),
+            "budget": self.budget,
+            "tokenizer": tokenizer_name(),
+            "sections": self.included,
+            "dropped_sections": self.dropped,
+            "truncated": self.truncated or bool(self.dropped),
+        }
+
+
+class ContextService:
+    """
+    Service for turning retriever output into a token-budgeted prompt context.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, max_list_items: int = CONTEXT_MAX_LIST_ITEMS):
+        self.token_budget = token_budget
+        self.max_list_items = max_list_items
+
+    def build_context(self, intent: str, retrieved_data: Any, token_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build the evidence section of the prompt.
+
+        Args:
+            intent: The classified intent
+            retrieved_data: Data returned by the intent's retriever
+            token_budget: Override for the configured budget
+
+        Returns:
+            Dict containing the context text, its token count, the budget, and
+            which sections were included, dropped or trimmed
+        """
+        packer = ContextPacker(self.token_budget if token_budget is None else token_budget)
+
+        if retrieved_data and isinstance(retrieved_data, dict):
+            if "direct_lookup" in retrieved_data and "semantic_search" in retrieved_data:
+                # enhanced retriever format (compatibility or installation)
+                self._pack_enhanced(packer, intent, retrieved_data)
+            elif "documents" in retrieved_data:
+                # standard retriever format (QnA, troubleshooting, etc.)
+                self._pack_documents(packer, retrieved_data)
+
+        return packer.result()
+
+    def _pack_enhanced(self, packer: ContextPacker, intent: str, retrieved_data: Dict[str, Any]):
+        if intent == "compatibility":
+            packer.add("heading", "COMPATIBILITY DATA RETRIEVED:\n\n")
+        elif intent == "installation":
+            packer.add("heading", "INSTALLATION DATA RETRIEVED:\n\n")
+        else:
+            packer.add("heading", "ENHANCED DATA RETRIEVED:\n\n")
+
+        # extracted identifiers
+        extracted = retrieved_data.get("extracted_identifiers", {})
+        if extracted.get("part_numbers") or extracted.get("model_numbers"):
+            packer.add(
+                "extracted_identifiers",
+                "EXTRACTED FROM QUERY:\n"
+                f"- Part Numbers: {extracted.get('part_numbers', [])}\n"
+                f"- Model Numbers: {extracted.get('model_numbers', [])}\n\n",
+            )
+
+        # direct lookup results (PRIORITY)
+        direct = retrieved_data.get("direct_lookup", {})
+        covered_parts = set()
+        matches = sorted(
+            direct.get("direct_matches", []),
+            key=lambda m: DIRECT_MATCH_PRIORITY.get(m.get("type"), len(DIRECT_MATCH_PRIORITY)),
+        )
+        if matches:
+            packer.add("direct_lookup", f"DIRECT LOOKUP RESULTS (Confidence: {direct.get('confidence', 'HIGH')}):\n")
+            for match in matches:
+                self._pack_direct_match(packer, match)
+                if match.get("part_number"):
+                    covered_parts.add(match["part_number"])
+                covered_parts.update(c["part_number"] for c in match.get("cross_check_results", []))
+            packer.add("direct_lookup_end", "\n")
+
+        # semantic search as supplementary, skipping parts direct lookup already covered
+        semantic = retrieved_data.get("semantic_search", {})
+        if semantic.get("documents") and semantic["documents"][0]:
+            supplements = [
+                (doc, meta)
+                for doc, meta in zip(semantic["documents"][0], semantic["metadatas"][0])
+                if meta.get("part_number") not in covered_parts
+            ][:2]
+            if supplements and packer.add("semantic_search", "SEMANTIC SEARCH SUPPLEMENTS:\n"):
+                for doc, meta in supplements:
+                    # installation passages are already step-sized; whole docs get a preview
+                    packer.add_truncated(
+                        f"semantic:{meta.get('part_number', 'N/A')}",
+                        f"- Part {meta.get('part_number', 'N/A')}: {meta.get('title', 'N/A')}\n  "
+                        f"{'Passage' if 'kind' in meta else 'Preview'}: ",
+                        _strip_title(doc, meta.get("title", "")) if "kind" in meta else doc[:100],
+                    )
+                packer.add("semantic_search_end", "\n")
+
+    def _pack_direct_match(self, packer: ContextPacker, match: Dict[str, Any]):
+        match_type = match.get("type")
+
+        if match_type == "cross_check":
+            lines = "- CROSS-CHECK RESULTS:\n"
+            for check in match["cross_check_results"]:
+                status = "COMPATIBLE" if check["is_compatible"] else "NOT COMPATIBLE"
+                lines += f"  {check['part_number']} + {check['model_number']}: {status} (Confidence: {check['confidence']})\n"
+            packer.add("cross_check", lines)
+
+        elif match_type == "part_to_models":
+            packer.add_list(
+                f"part_to_models:{match['part_number']}",
+                f"- Part {match['part_number']} is compatible with {match['count']} models:\n  Models: ",
+                match["compatible_models"],
+                self.max_list_items,
+            )
+
+        elif match_type == "model_to_parts":
+            packer.add_list(
+                f"model_to_parts:{match['model_number']}",
+                f"- Model {match['model_number']} is compatible with {match['count']} parts:\n  Parts: ",
+                match["compatible_parts"],
+                self.max_list_items,
+            )
+
+        elif match_type == "installation_manual":
+            header = (
+                f"- INSTALLATION MANUAL for {match['part_number']} (Confidence: {match['confidence']}):\n"
+                f"  Title: {match['title']}\n"
+                f"  URL: {match['url']}\n"
+            )
+            if not packer.add(f"installation_manual:{match['part_number']}", header):
+                return
+            if match.get("passages"):
+                # only the steps relevant to the question, not the whole manual
+                packer.add("installation_passages", "  Relevant steps:\n")
+                for passage in match["passages"]:
+                    packer.add_truncated(
+                        f"installation_passage:{match['part_number']}:{passage['step']}",
+                        f"  - [{passage['kind']}] ",
+                        passage["text"],
+                    )
+            else:
+                packer.add_truncated(
+                    f"installation_text:{match['part_number']}",
+                    "  Instructions: ",
+                    match["installation_text"],
+                )
+
+    def _pack_documents(self, packer: ContextPacker, retrieved_data: Dict[str, Any]):
+        documents = retrieved_data["documents"][0] if retrieved_data["documents"] else []
+        metadatas = retrieved_data["metadatas"][0] if retrieved_data.get("metadatas") else []
+
+        packer.add("heading", "Here are relevant appliance parts and information:\n\n")
+        seen = set()
+        for i, (doc, meta) in enumerate(zip(documents, metadatas), 1):
+            part_id = meta.get("part_id", meta.get("part_number", "Unknown"))
+            key = (part_id, meta.get("title"))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            brand = meta.get("brand", "Unknown")
+            title = meta.get("title", "Unknown Part")
+            price = meta.get("price", "N/A")
+
+            header = f"Part {i}: {title} ({brand})\nPart ID: {part_id} | Price: ${price}\n"
+            if packer.add(f"document:{part_id}", header):
+                packer.add_truncated(
+                    f"description:{part_id}",
+                    "Description: ",
+                    _strip_redundant_fields(doc, title, brand, part_id),
+                    suffix="\n\n",
+                )
+
+
+def _strip_title(doc: str, title: str) -> str:
+    """Installation passages are embedded as "title: passage"; the title is in the header"""
+    prefix = f"{title}: "
+    return doc[len(prefix):] if title and doc.startswith(prefix) else doc
+
+
+def _strip_redundant_fields(doc: str, title: str, brand: str, part_id: str) -> str:
+    """
+    Parts documents are embedded as "title — description | brand: X | part_id: Y".
+    Title, brand and part id are already in the part header, so drop them here.
+    """
+    suffix = f" | brand: {brand} | part_id: {part_id}"
+    if doc.endswith(suffix):
+        doc = doc[:-len(suffix)]
+    prefix = f"{title} — "
+    if doc.startswith(prefix):
+        doc = doc[len(prefix):]
+    return doc
@@ -0,0 +1,57 @@
+"""
+Tokenizer - Local token counting for prompt budgeting
+
+Uses tiktoken when it is installed and its encoding can be loaded. DeepSeek's
+own tokenizer isn't published for tiktoken, so cl100k_base is an
+approximation; that is close enough for budgeting. Without tiktoken we fall
+back to a ~4 characters per token estimate.
+"""
+import math
+import threading
+from config import TOKENIZER_ENCODING
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    """Load the tiktoken encoding once; remember a failure so we don't retry per call"""
+    global _encoder, _encoder_loaded
+    if _encoder_loaded:
+        return _encoder
+
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+                _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"Warning: tiktoken unavailable ({e}), using character-based token estimates")
+                _encoder = None
+            _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in a piece of text.
+
+    Args:
+        text: The text to count
+
+    Returns:
+        Token count (exact with tiktoken, estimated otherwise)
+    """
+    if not text:
+        return 0
+
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def tokenizer_name() -> str:
+    """Which tokenizer count_tokens is using"""
+    return TOKENIZER_ENCODING if _get_encoder() is not None else "char-estimate"
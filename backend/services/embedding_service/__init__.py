@@ -0,0 +1,19 @@
+"""
+Embedding Service Package
+
+Provides batched, coalesced embedding calls for the PartSelect Assistant API.
+"""
+
+from .embedding_service import (
+    EmbeddingDispatcher,
+    CoalescingOpenAIEmbeddingFunction,
+    get_embedding_dispatcher,
+    get_all_embedding_stats,
+)
+
+__all__ = [
+    "EmbeddingDispatcher",
+    "CoalescingOpenAIEmbeddingFunction",
+    "get_embedding_dispatcher",
+    "get_all_embedding_stats",
+]
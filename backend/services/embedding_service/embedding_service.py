@@ -0,0 +1,154 @@
+"""
+Embedding Service - Coalesces concurrent embedding requests into batched API calls
+
+Every retriever used to make its own single-input `embeddings.create` call per
+query. Under load that is one provider request per user request. The
+dispatcher here gathers concurrent texts for a few milliseconds (or up to a
+batch size), sends them as one batched call, and fans the vectors back out.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from openai import OpenAI
+
+from config import OPENAI_API_KEY, OPENAI_BASE_URL, EMBED_MODEL, EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_WAIT_MS, EMBED_BATCH_MAX_IN_FLIGHT, EMBED_REQUEST_TIMEOUT_S
+from services.batching import MicroBatcher
+from services.resilience import get_circuit_breaker
+from services.metrics_service import record_upstream_error
+
+
+class EmbeddingDispatcher:
+    """
+    Batches concurrent embedding requests for a single embedding model.
+    """
+
+    def __init__(
+        self,
+        model: str = EMBED_MODEL,
+        max_batch_size: int = EMBED_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_BATCH_MAX_WAIT_MS,
+        client: Optional[OpenAI] = None,
+        max_in_flight: int = EMBED_BATCH_MAX_IN_FLIGHT,
+    ):
+        self.model = model
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.breaker = get_circuit_breaker(f"embeddings:{model}")
+        self.batcher = MicroBatcher(
+            handler=self._embed_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name=f"embed-{model}",
+            max_in_flight=max_in_flight,
+        )
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        Embed a single text, sharing the API call with concurrent callers.
+
+        Args:
+            text: The text to embed
+            timeout: Seconds to wait for the vector (None waits for the batch call)
+
+        Returns:
+            The embedding vector
+
+        Raises:
+            TimeoutError: If the vector isn't ready within `timeout`
+        """
+        self.breaker.check()
+        return self.batcher.submit(text).result(timeout=timeout)
+
+    def embed_many(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """
+        Embed several texts. They are queued individually so they can share
+        batches with other callers.
+
+        Args:
+            texts: The texts to embed
+            timeout: Seconds to wait for all vectors (None waits for the batch calls)
+
+        Returns:
+            Embedding vectors in the same order as `texts`
+        """
+        self.breaker.check()
+        futures = self.batcher.submit_many(list(texts))
+        return [f.result(timeout=timeout) for f in futures]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait metrics for this dispatcher"""
+        return {"model": self.model, **self.batcher.get_stats()}
+
+    def _get_client(self) -> OpenAI:
+        # created lazily so importing a retriever doesn't require the key
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    if not OPENAI_API_KEY:
+                        raise ValueError("OPENAI_API_KEY not set")
+                    # bounded timeout and a single retry: the circuit breaker, not
+                    # client-side retries, handles a failing provider
+                    self._client = OpenAI(
+                        api_key=OPENAI_API_KEY,
+                        base_url=OPENAI_BASE_URL or None,
+                        timeout=EMBED_REQUEST_TIMEOUT_S,
+                        max_retries=1,
+                    )
+        return self._client
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Single batched API call; the response is re-ordered by index"""
+        try:
+            response = self._get_client().embeddings.create(model=self.model, input=texts)
+        except Exception:
+            self.breaker.record_failure()
+            record_upstream_error(f"embeddings:{self.model}")
+            raise
+        self.breaker.record_success()
+        ordered = sorted(response.data, key=lambda d: d.index)
+        return [d.embedding for d in ordered]
+
+
+class CoalescingOpenAIEmbeddingFunction(OpenAIEmbeddingFunction):
+    """
+    Drop-in replacement for Chroma's OpenAIEmbeddingFunction that routes
+    through the shared EmbeddingDispatcher instead of calling the API directly.
+
+    It keeps the parent's name and config so existing collections still
+    validate against it.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = EMBED_MODEL, **kwargs):
+        super().__init__(api_key=api_key, model_name=model_name, **kwargs)
+        self.dispatcher = get_embedding_dispatcher(model_name)
+
+    def __call__(self, input):
+        if isinstance(input, str):
+            input = [input]
+        return self.dispatcher.embed_many(list(input))
+
+
+# one dispatcher per embedding model, shared by every retriever
+_dispatchers: Dict[str, EmbeddingDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+def get_embedding_dispatcher(model: str = EMBED_MODEL) -> EmbeddingDispatcher:
+    """
+    Get the process-wide dispatcher for an embedding model.
+
+    Args:
+        model: Embedding model name (default from EMBED_MODEL)
+
+    Returns:
+        The shared EmbeddingDispatcher for that model
+    """
+    if model not in _dispatchers:
+        with _dispatchers_lock:
+            if model not in _dispatchers:
+                _dispatchers[model] = EmbeddingDispatcher(model=model)
+    return _dispatchers[model]
+
+def get_all_embedding_stats() -> List[Dict[str, Any]]:
+    """Stats for every dispatcher created so far"""
+    return [d.get_stats() for d in list(_dispatchers.values())]
@@ -1,103 +1,323 @@
+import contextvars
+import threading
+import time
 import requests
-from config import DEEPSEEK_API_KEY
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from config import (
+    DEEPSEEK_API_KEY,
+    DEEPSEEK_BASE_URL,
+    LLM_SECONDARY_BASE_URL,
+    LLM_SECONDARY_API_KEY,
+    LLM_SECONDARY_MODEL,
+    LLM_REQUEST_TIMEOUT_S,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_DELAY_MS,
+    LLM_HEDGE_DEFAULT_DELAY_MS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_POOL_SIZE,
+)
+from services.external_api.latency_histogram import LatencyHistogram
+from services.resilience import get_circuit_breaker
+from services.metrics_service import record_token_usage, record_upstream_error
+from services.tracing_service import span, set_span_attribute
+from services.profiling_service import current_profile, sampled_thread
+from typing import Optional, Dict, Any, List, Tuple
+
+# token usage reported by the API, summed across every client instance.
+# prompt_cache_hit_tokens / prompt_cache_miss_tokens come from DeepSeek's
+# context caching: hit tokens matched a cached prompt prefix
+USAGE_FIELDS = ["prompt_tokens", "completion_tokens", "prompt_cache_hit_tokens", "prompt_cache_miss_tokens"]
+
+_usage_lock = threading.Lock()
+_usage_totals: Dict[str, int] = {"requests": 0, **{field: 0 for field in USAGE_FIELDS}}
+
+
+def _record_usage(usage: Dict[str, Any]):
+    with _usage_lock:
+        _usage_totals["requests"] += 1
+        for field in USAGE_FIELDS:
+            _usage_totals[field] += int(usage.get(field) or 0)
+    record_token_usage(usage)
+
+
+def get_usage_stats() -> Dict[str, Any]:
+    """
+    Get cumulative token usage, including provider prompt-cache hits.
+
+    Returns:
+        Dict of token totals plus the prompt cache hit ratio
+    """
+    with _usage_lock:
+        stats = dict(_usage_totals)
+    cached = stats["prompt_cache_hit_tokens"] + stats["prompt_cache_miss_tokens"]
+    stats["prompt_cache_hit_ratio"] = round(stats["prompt_cache_hit_tokens"] / cached, 4) if cached else 0.0
+    return stats
+
+
+class LLMProvider:
+    """
+    An OpenAI-compatible chat-completions endpoint.
+    """
+
+    def __init__(self, name: str, base_url: str, api_key: str, model_override: str = ""):
+        self.name = name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        # secondary providers usually serve DeepSeek under another model name
+        self.model_override = model_override
+
+    def model_for(self, model: str) -> str:
+        return self.model_override or model
+
+
+class LLMRequestError(Exception):
+    """An upstream call failed; `status` is the HTTP status when the upstream answered"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+# latency per (provider, model, call class), shared across client instances; drives
+# the hedge delay. Intent calls (max_tokens=10) and full answers differ by an order
+# of magnitude, so each max_tokens bucket gets its own histogram
+_histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+MAX_TOKENS_BUCKETS = (32, 256, 1024)
+
+# calls run here so the caller can stop waiting on a straggler and hedge
+_hedge_executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_POOL_SIZE, thread_name_prefix="llm-call")
+
+
+def call_class(max_tokens: Optional[int]) -> str:
+    """Latency bucket for a call: the smallest MAX_TOKENS_BUCKETS bound it fits under"""
+    for bound in MAX_TOKENS_BUCKETS:
+        if (max_tokens or 0) <= bound:
+            return f"max_tokens<={bound}"
+    return f"max_tokens>{MAX_TOKENS_BUCKETS[-1]}"
+
+
+def get_latency_histogram(provider: str, model: str, max_tokens: Optional[int] = None) -> LatencyHistogram:
+    key = (provider, model, call_class(max_tokens))
+    if key not in _histograms:
+        with _histograms_lock:
+            if key not in _histograms:
+                _histograms[key] = LatencyHistogram()
+    return _histograms[key]
+
+
+def get_latency_stats() -> Dict[str, Any]:
+    """Latency histograms for every provider/model/call class seen so far"""
+    return {f"{provider}/{model}/{cls}": h.snapshot() for (provider, model, cls), h in list(_histograms.items())}
+
 
 class DeepSeekClient:
     """
     Simple DeepSeek API client - send prompts, get responses.
+
+    Calls are hedged: if the first attempt hasn't answered by the provider's
+    recent p95 (LLM_HEDGE_PERCENTILE) for calls of its size, a duplicate goes to
+    the secondary provider (or DeepSeek again if none is configured) and the
+    first answer wins. An HTTP error (429, 5xx) is never re-sent to the same provider.
     """
-    
+
     def __init__(self):
         self.api_key = DEEPSEEK_API_KEY
-        self.base_url = "https://api.deepseek.com/v1/chat/completions"
-        
+        self.base_url = DEEPSEEK_BASE_URL.rstrip("/") + "/chat/completions"
+
         if not self.api_key:
             print("Warning: DEEPSEEK_API_KEY not found. Client will not work properly.")
-    
-    def chat(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7) -> str:
+
+        self.hedge_enabled = LLM_HEDGE_ENABLED
+        self.primary = LLMProvider("deepseek", DEEPSEEK_BASE_URL, self.api_key)
+        self.secondary = None
+        if LLM_SECONDARY_BASE_URL:
+            self.secondary = LLMProvider("secondary", LLM_SECONDARY_BASE_URL, LLM_SECONDARY_API_KEY, LLM_SECONDARY_MODEL)
+
+    def chat(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7, timeout: Optional[float] = None) -> str:
         """
         Send a prompt to DeepSeek and get a response.
-        
+
         Args:
             prompt: The prompt to send
             max_tokens: Maximum tokens in response (default: 1000)
             temperature: Response creativity 0.0-1.0 (default: 0.7)
-            
+            timeout: Overall time limit in seconds (default: LLM_REQUEST_TIMEOUT_S)
+
         Returns:
             The response text from DeepSeek
-            
+
         Raises:
             Exception: If API call fails
         """
-        if not self.api_key:
-            raise Exception("DEEPSEEK_API_KEY not configured")
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "deepseek-chat",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-        
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"DeepSeek API request failed: {e}")
-        except (KeyError, IndexError) as e:
-            raise Exception(f"Unexpected DeepSeek API response format: {e}")
-    
-    def chat_with_system(self, system_prompt: str, user_prompt: str, model: str = "deepseek-chat", max_tokens: int = 1000, temperature: float = 0.7) -> str:
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+        return self._complete("deepseek-chat", messages, max_tokens, temperature, timeout)["content"]
+
+    def chat_with_system(self, system_prompt: str, user_prompt: str, model: str = "deepseek-chat", max_tokens: int = 1000, temperature: float = 0.7, timeout: Optional[float] = None) -> str:
         """
         Send a prompt with system message to DeepSeek.
-        
+
         Args:
             system_prompt: System/instruction prompt
             user_prompt: User's actual prompt
             model: The model to use (deepseek-chat or deepseek-reasoning)
             max_tokens: Maximum tokens in response
             temperature: Response creativity 0.0-1.0
-            
+            timeout: Overall time limit in seconds (default: LLM_REQUEST_TIMEOUT_S)
+
         Returns:
             The response text from DeepSeek
         """
+        return self.chat_completion(system_prompt, user_prompt, model, max_tokens, temperature, timeout)["content"]
+
+    def chat_completion(self, system_prompt: str, user_prompt: str, model: str = "deepseek-chat", max_tokens: int = 1000, temperature: float = 0.7, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Same as chat_with_system, but also returns the API's token usage.
+
+        Args:
+            system_prompt: System/instruction prompt
+            user_prompt: User's actual prompt
+            model: The model to use (deepseek-chat or deepseek-reasoning)
+            max_tokens: Maximum tokens in response
+            temperature: Response creativity 0.0-1.0
+            timeout: Overall time limit in seconds, hedges included (default: LLM_REQUEST_TIMEOUT_S)
+
+        Returns:
+            Dict containing the response "content" and the "usage" block
+            (prompt, completion and prompt-cache hit/miss token counts)
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return self._complete(model, messages, max_tokens, temperature, timeout)
+
+    def _complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float, timeout: Optional[float] = None) -> Dict[str, Any]:
         if not self.api_key:
             raise Exception("DEEPSEEK_API_KEY not configured")
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
+
         data = {
             "model": model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            "messages": messages,
             "max_tokens": max_tokens,
             "temperature": temperature
         }
-        
+
+        timeout = LLM_REQUEST_TIMEOUT_S if timeout is None else min(timeout, LLM_REQUEST_TIMEOUT_S)
+
+        with span("llm_completion", model=model, max_tokens=max_tokens):
+            if self.hedge_enabled:
+                result, provider, hedged = self._hedged_post(data, timeout)
+            else:
+                result, provider, hedged = self._post(self.primary, data, timeout), self.primary.name, False
+            set_span_attribute("provider", provider)
+            set_span_attribute("hedged", hedged)
+
         try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"DeepSeek API request failed: {e}")
+            content = result["choices"][0]["message"]["content"].strip()
         except (KeyError, IndexError) as e:
-            raise Exception(f"Unexpected DeepSeek API response format: {e}")
\ No newline at end of file
+            raise Exception(f"Unexpected DeepSeek API response format: {e}")
+
+        usage = {field: int((result.get("usage") or {}).get(field) or 0) for field in USAGE_FIELDS}
+        _record_usage(usage)
+
+        return {"content": content, "usage": usage, "provider": provider, "hedged": hedged}
+
+    def _hedge_delay_ms(self, provider: LLMProvider, model: str, max_tokens: Optional[int] = None) -> float:
+        """Percentile of the provider's recent latency for calls this size, or a default while the histogram is cold"""
+        histogram = get_latency_histogram(provider.name, provider.model_for(model), max_tokens)
+        if histogram.sample_count() < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY_MS
+        return max(LLM_HEDGE_MIN_DELAY_MS, histogram.percentile(LLM_HEDGE_PERCENTILE) or LLM_HEDGE_DEFAULT_DELAY_MS)
+
+    def _hedged_post(self, data: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], str, bool]:
+        """
+        Send to the primary; if it is slower than the hedge delay (or fails),
+        send a duplicate to the hedge provider and return whichever answers first.
+        Nothing waits past `timeout`. A primary whose circuit is open is skipped.
+
+        A request that is already on the wire can't be aborted with `requests`,
+        so the loser is cancelled if it hasn't started and otherwise left to
+        finish in the background with its result discarded.
+        """
+        expires_at = time.monotonic() + timeout
+        hedge_provider = self.secondary or self.primary
+        attempts: Dict[Future, LLMProvider] = {}
+
+        first_provider = self.primary
+        if get_circuit_breaker(f"llm:{self.primary.name}").state == "open" and self.secondary:
+            first_provider = self.secondary
+
+        # attempts run in pool threads; copy the context so their spans join this request's trace
+        first = _hedge_executor.submit(contextvars.copy_context().run, self._post, first_provider, data, timeout)
+        attempts[first] = first_provider
+        hedge_delay = self._hedge_delay_ms(first_provider, data["model"], data.get("max_tokens")) / 1000.0
+        wait([first], timeout=min(hedge_delay, timeout))
+
+        # slow or failed: fire the hedge if there's still time, but an upstream that
+        # answered with an error (429, 5xx) doesn't get the same request again
+        remaining = expires_at - time.monotonic()
+        failed = first.done() and first.exception() is not None
+        rejected = failed and getattr(first.exception(), "status", None) is not None and hedge_provider is first_provider
+        if remaining > 0 and (not first.done() or failed) and not rejected:
+            attempts[_hedge_executor.submit(contextvars.copy_context().run, self._post, hedge_provider, data, remaining)] = hedge_provider
+
+        pending = set(attempts)
+        last_error: Optional[BaseException] = None
+        while pending:
+            remaining = expires_at - time.monotonic()
+            done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                for loser in pending:
+                    loser.cancel()
+                raise Exception(f"LLM request timed out after {timeout:.1f}s")
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result(), attempts[future].name, len(attempts) > 1
+                last_error = future.exception()
+
+        raise last_error
+
+    def _post(self, provider: LLMProvider, data: Dict[str, Any], timeout: float = LLM_REQUEST_TIMEOUT_S) -> Dict[str, Any]:
+        """One HTTP attempt against one provider; records its latency and circuit state"""
+        breaker = get_circuit_breaker(f"llm:{provider.name}")
+        breaker.check()
+
+        headers = {
+            "Authorization": f"Bearer {provider.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {**data, "model": provider.model_for(data["model"])}
+        histogram = get_latency_histogram(provider.name, payload["model"], data.get("max_tokens"))
+
+        started = time.perf_counter()
+        try:
+            # runs on a hedge executor thread; a profiled request samples it there
+            with sampled_thread(current_profile()), span("llm_http", provider=provider.name, model=payload["model"]):
+                response = requests.post(provider.url, headers=headers, json=payload, timeout=timeout)
+                set_span_attribute("http.status_code", response.status_code)
+                response.raise_for_status()
+                result = response.json()
+        except requests.exceptions.RequestException as e:
+            histogram.observe_error()
+            record_upstream_error(f"llm:{provider.name}")
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and status < 500 and status != 429:
+                breaker.record_success()  # our request was bad, the upstream is fine
+            else:
+                breaker.record_failure()
+            raise LLMRequestError(f"{provider.name} API request failed: {e}", status)
+        except ValueError as e:
+            histogram.observe_error()
+            record_upstream_error(f"llm:{provider.name}")
+            breaker.record_failure()
+            raise LLMRequestError(f"Unexpected {provider.name} API response format: {e}")
+
+        breaker.record_success()
+        histogram.observe((time.perf_counter() - started) * 1000.0)
+        return result
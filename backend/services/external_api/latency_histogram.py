@@ -0,0 +1,90 @@
+"""
+Latency Histogram - Sliding-window latency histogram per upstream
+
+Samples go into fixed log-spaced buckets. Only the most recent `window`
+samples are counted, so percentiles follow the upstream's current behaviour
+instead of its whole history.
+"""
+import bisect
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# bucket upper bounds in milliseconds (last bucket is open-ended)
+DEFAULT_BUCKETS_MS = [
+    50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+    6000, 8000, 10000, 12500, 15000, 20000, 25000, 30000, 45000, 60000,
+]
+
+
+class LatencyHistogram:
+    """
+    Thread-safe sliding-window latency histogram.
+    """
+
+    def __init__(self, window: int = 500, buckets_ms: Optional[List[float]] = None):
+        self.buckets_ms = list(buckets_ms or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self._samples: Deque[int] = deque()  # bucket index of each sample in the window
+        self._window = window
+        self._lock = threading.Lock()
+        self.total_count = 0
+        self.error_count = 0
+
+    def observe(self, latency_ms: float):
+        """Record one successful call's latency"""
+        index = bisect.bisect_left(self.buckets_ms, latency_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self._samples.append(index)
+            if len(self._samples) > self._window:
+                self.counts[self._samples.popleft()] -= 1
+            self.total_count += 1
+
+    def observe_error(self):
+        """Record a failed call (not counted in the latency buckets)"""
+        with self._lock:
+            self.error_count += 1
+
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Upper bound of the bucket that contains the given percentile.
+
+        Args:
+            pct: Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            Latency in ms, or None if there are no samples yet
+        """
+        with self._lock:
+            n = len(self._samples)
+            if n == 0:
+                return None
+            rank = max(1, int(round(pct * n)))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    if index < len(self.buckets_ms):
+                        return float(self.buckets_ms[index])
+                    return float(self.buckets_ms[-1]) * 2
+        return None
+
+    def snapshot(self) -> Dict[str, object]:
+        """Bucket counts and headline percentiles for stats endpoints"""
+        with self._lock:
+            counts = list(self.counts)
+            total, errors = self.total_count, self.error_count
+        return {
+            "window_samples": self.sample_count(),
+            "total_count": total,
+            "error_count": errors,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets_ms": self.buckets_ms,
+            "counts": counts,
+        }
@@ -0,0 +1,9 @@
+"""
+Fast Answer Service Package
+
+Provides LLM-free templated answers for conclusive direct lookups in the PartSelect Assistant API.
+"""
+
+from .fast_answer_service import FastAnswerService
+
+__all__ = ["FastAnswerService"]
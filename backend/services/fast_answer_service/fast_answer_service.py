@@ -0,0 +1,157 @@
+"""
+Fast Answer Service - Templated answers for conclusive direct-lookup hits
+
+A compatibility cross-check ("does part X fit model Y") or an exact
+installation manual entry already determines the answer, so generating it
+with the LLM only rephrases known facts. These hits are formatted here
+straight from the lookup result.
+
+Optionally, each templated answer is also sent to the LLM in the background
+for a friendlier rewrite. The rewrite is cached by the facts it was built
+from, so the next request for the same facts gets the polished text without
+waiting on the LLM.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config import FAST_ANSWER_INTENTS, FAST_ANSWER_POLISH_ENABLED, FAST_ANSWER_POLISH_CACHE_SIZE
+from services.external_api.deepseek_client import DeepSeekClient
+from services.model_router import is_conclusive_lookup
+from services.metrics_service import record_cache_event
+
+POLISH_SYSTEM_PROMPT = """You are a PartSelect customer service assistant. Rewrite the answer you are given so it reads naturally and helpfully. Keep every fact, part number, model number and URL exactly as given, do not add new facts, and keep it short."""
+
+
+class FastAnswerService:
+    """
+    Formats conclusive direct-lookup results without an LLM call.
+    """
+
+    def __init__(self, intents: Optional[List[str]] = None, polish: Optional[bool] = None, llm_client: Any = None, cache_size: int = FAST_ANSWER_POLISH_CACHE_SIZE):
+        self.intents = set(FAST_ANSWER_INTENTS if intents is None else intents)
+        self.polish_enabled = FAST_ANSWER_POLISH_ENABLED if polish is None else polish
+        self.llm_client = llm_client
+        self.cache_size = cache_size
+
+        self._polished: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        if self.polish_enabled:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fast-answer-polish")
+
+        self.stats = {"template": 0, "polished": 0, "polish_requests": 0, "polish_errors": 0}
+
+    def answer(self, intent: str, retrieved_data: Any) -> Optional[Dict[str, Any]]:
+        """
+        Answer from the lookup result if fast answers are enabled for the
+        intent and the lookup is conclusive.
+
+        Args:
+            intent: The classified intent
+            retrieved_data: Data returned by the intent's retriever
+
+        Returns:
+            Dict with "response", "answer_mode" ("template" or "polished") and
+            "answer_source", or None if the LLM should answer instead
+        """
+        if intent not in self.intents or not is_conclusive_lookup(intent, retrieved_data):
+            return None
+
+        matches = retrieved_data["direct_lookup"]["direct_matches"]
+        if intent == "compatibility":
+            text = self._format_compatibility(matches)
+        elif intent == "installation":
+            text = self._format_installation(matches)
+        else:
+            return None
+
+        key = hashlib.sha1(f"{intent}\n{text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            polished = self._polished.get(key)
+            if self.polish_enabled:
+                record_cache_event("fast_answer_polish", polished is not None)
+            if polished is not None:
+                self._polished.move_to_end(key)
+                self.stats["polished"] += 1
+                return {"response": polished, "answer_mode": "polished", "answer_source": "direct_lookup"}
+            self.stats["template"] += 1
+
+        if self._executor is not None:
+            self._schedule_polish(key, text)
+
+        return {"response": text, "answer_mode": "template", "answer_source": "direct_lookup"}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "cached_polishes": len(self._polished), "intents": sorted(self.intents)}
+
+    def _format_compatibility(self, matches: List[Dict[str, Any]]) -> str:
+        checks = [c for m in matches if m.get("type") == "cross_check" for c in m["cross_check_results"]]
+
+        lines = []
+        for check in checks:
+            if check["is_compatible"]:
+                lines.append(f"Yes, part {check['part_number']} is compatible with model {check['model_number']}.")
+            else:
+                lines.append(f"No, part {check['part_number']} is not listed as compatible with model {check['model_number']}.")
+
+        if len(lines) == 1:
+            text = lines[0]
+        else:
+            text = "Here is what I found:\n" + "\n".join(f"- {line}" for line in lines)
+
+        if not all(c["is_compatible"] for c in checks):
+            text += "\n\nPlease double-check your model number on the appliance's rating plate, or search PartSelect for parts that fit your model."
+        return text
+
+    def _format_installation(self, matches: List[Dict[str, Any]]) -> str:
+        sections = []
+        for match in matches:
+            if match.get("type") != "installation_manual":
+                continue
+            if match.get("passages"):
+                # the steps that answer the question; the URL has the rest of the manual
+                body = "\n".join(f"- {passage['text']}" for passage in match["passages"])
+            else:
+                body = match["installation_text"]
+            sections.append(
+                f"**{match['title']}** ({match['part_number']})\n\n"
+                f"{body}\n\n"
+                f"Full details: {match['url']}"
+            )
+        return "\n\n".join(sections)
+
+    def _schedule_polish(self, key: str, text: str):
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+            self.stats["polish_requests"] += 1
+        self._executor.submit(self._polish, key, text)
+
+    def _polish(self, key: str, text: str):
+        """Background LLM rewrite of a templated answer; the result goes to the cache"""
+        try:
+            if self.llm_client is None:
+                self.llm_client = DeepSeekClient()
+            polished = self.llm_client.chat_with_system(
+                system_prompt=POLISH_SYSTEM_PROMPT,
+                user_prompt=text,
+                max_tokens=400,
+                temperature=0.3
+            )
+            with self._lock:
+                self._polished[key] = polished
+                while len(self._polished) > self.cache_size:
+                    self._polished.popitem(last=False)
+        except Exception as e:
+            print(f"Warning: fast answer polish failed: {e}")
+            with self._lock:
+                self.stats["polish_errors"] += 1
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
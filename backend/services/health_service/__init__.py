@@ -5,5 +5,6 @@ Provides health check functionality for the PartSelect Assistant API.
 """
 
 from .health_service import HealthService
+from .health_prober import HealthCheck, HealthProber, get_health_prober
 
-__all__ = ["HealthService"]
+__all__ = ["HealthService", "HealthCheck", "HealthProber", "get_health_prober"]
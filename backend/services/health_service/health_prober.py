@@ -0,0 +1,279 @@
+"""
+Health Prober - Background dependency checks with cached results
+
+Readiness used to be a constant "ok", so workers whose Chroma store failed to
+open or whose DeepSeek key was missing kept receiving traffic. The prober runs
+each dependency check on its own interval in a background thread and keeps
+the latest result. /health/ready only reads that cache, so a probe costs
+microseconds and never calls a paid API inline. Upstream reachability uses
+the free `GET /models` endpoints, never completions or embeddings.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    DEEPSEEK_API_KEY,
+    DEEPSEEK_BASE_URL,
+    EMBED_MODEL,
+    HEALTH_PROBE_INTERVAL_S,
+    HEALTH_UPSTREAM_PROBE_INTERVAL_S,
+    HEALTH_UPSTREAM_PROBE_ENABLED,
+    HEALTH_UPSTREAM_TIMEOUT_S,
+)
+from services.resilience import get_circuit_breaker, get_circuit_states
+
+OK = "ok"
+DEGRADED = "degraded"
+DOWN = "down"
+
+
+class HealthCheck:
+    """
+    One dependency check. `fn` returns a dict with at least a "status" key
+    (ok, degraded or down); a raised exception counts as down.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], Dict[str, Any]], interval_s: float, critical: bool = True):
+        self.name = name
+        self.fn = fn
+        self.interval_s = interval_s
+        self.critical = critical
+        self.next_run = 0.0
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = dict(self.fn())
+        except Exception as e:
+            result = {"status": DOWN, "error": str(e)}
+        result.setdefault("status", OK)
+        result["check_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+        result["checked_at"] = time.time()
+        return result
+
+
+class HealthProber:
+    """
+    Runs health checks in a daemon thread and caches the latest results.
+    """
+
+    def __init__(self, checks: Optional[List[HealthCheck]] = None, stale_after_s: Optional[float] = None):
+        self.checks = list(checks) if checks is not None else default_checks()
+        # a prober that stopped updating is itself a readiness failure
+        if stale_after_s is None:
+            stale_after_s = 3 * max((c.interval_s for c in self.checks), default=20.0)
+        self.stale_after_s = stale_after_s
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_cycle_at = 0.0
+
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="health-prober", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def run_once(self, force: bool = False):
+        """Run every check that is due (or all of them with force=True)"""
+        now = time.monotonic()
+        for check in self.checks:
+            if force or now >= check.next_run:
+                result = check.run()
+                check.next_run = time.monotonic() + check.interval_s
+                with self._lock:
+                    self._results[check.name] = result
+        self.last_cycle_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Cached readiness report; reads memory only.
+
+        Returns:
+            Dict with overall "status" (ready, degraded or not_ready), "ready",
+            per-component results, "degraded" reasons and the live circuit states
+        """
+        with self._lock:
+            components = {name: dict(result) for name, result in self._results.items()}
+
+        reasons = []
+        ready = True
+        for check in self.checks:
+            result = components.get(check.name)
+            if result is None:
+                reasons.append(f"{check.name}:not_checked")
+                ready = ready and not check.critical
+            elif result["status"] != OK:
+                reasons.append(f"{check.name}:{result.get('reason', result['status'])}")
+                if result["status"] == DOWN and check.critical:
+                    ready = False
+
+        age_s = time.time() - self.last_cycle_at if self.last_cycle_at else None
+        if age_s is None or age_s > self.stale_after_s:
+            reasons.append("prober:stale")
+            ready = False
+
+        if not ready:
+            status = "not_ready"
+        elif reasons:
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "ready": ready,
+            "age_s": round(age_s, 2) if age_s is not None else None,
+            "components": components,
+            "degraded": reasons,
+            "circuits": get_circuit_states(),
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Warning: health probe cycle failed: {e}")
+            now = time.monotonic()
+            wait = min((c.next_run for c in self.checks), default=now + 5.0) - now
+            self._stop.wait(max(0.1, wait))
+
+
+def check_docs_store() -> Dict[str, Any]:
+    """partselect-docs opened by the retrievers, plus the JSON maps they loaded"""
+    from services.retrievers.compatibility_retriever.compatibility_retriever import get_compatibility_retriever
+    from services.retrievers.installation_retriever.installation_retriever import get_installation_retriever
+
+    compatibility = get_compatibility_retriever()
+    installation = get_installation_retriever()
+    maps = {
+        "parts_to_models": len(compatibility.parts_to_models),
+        "model_to_parts": len(compatibility.model_to_parts),
+        "installation_manual": len(installation.installation_manual),
+    }
+    result = {"maps": maps}
+    if compatibility.collection is None or installation.collection is None:
+        result.update(status=DOWN, reason="collection_unavailable")
+        return result
+    result["partselect-docs"] = compatibility.collection.count()
+    empty_maps = [name for name, size in maps.items() if size == 0]
+    if empty_maps:
+        # direct lookups are gone but semantic search still answers
+        result.update(status=DEGRADED, reason="empty_maps", empty_maps=empty_maps)
+    elif result["partselect-docs"] == 0:
+        result.update(status=DEGRADED, reason="empty_collection")
+    else:
+        result["status"] = OK
+    return result
+
+
+def check_parts_store() -> Dict[str, Any]:
+    """The per-appliance parts collections queried by qna"""
+    from services.retrievers.qan_retriever.qan_retriever import chroma
+
+    counts = {}
+    missing = []
+    for name in ("dishwasher_parts", "refrigerator_parts"):
+        try:
+            counts[name] = chroma.get_collection(name).count()
+        except Exception:
+            missing.append(name)
+    result = {"collections": counts}
+    if missing:
+        result.update(status=DOWN, reason="collection_unavailable", missing=missing)
+    elif not all(counts.values()):
+        result.update(status=DEGRADED, reason="empty_collection")
+    else:
+        result["status"] = OK
+    return result
+
+
+def probe_upstream(breaker_name: str, base_url: str, api_key: Optional[str], probe: bool = True) -> Dict[str, Any]:
+    """
+    Key present, circuit state and (optionally) a free `GET {base_url}/models`.
+
+    Args:
+        breaker_name: Circuit breaker guarding calls to this upstream
+        base_url: OpenAI-compatible API base URL
+        api_key: The configured key (missing means the upstream can't be used)
+        probe: Whether to make the reachability request
+
+    Returns:
+        Component result; a missing or rejected key is "down", an unreachable
+        upstream or open circuit is "degraded"
+    """
+    circuit = get_circuit_breaker(breaker_name).state
+    result: Dict[str, Any] = {"configured": bool(api_key), "circuit": circuit}
+    if not api_key:
+        result.update(status=DOWN, reason="api_key_missing")
+        return result
+
+    if probe:
+        started = time.perf_counter()
+        try:
+            response = requests.get(
+                base_url.rstrip("/") + "/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=HEALTH_UPSTREAM_TIMEOUT_S,
+            )
+            result["reachable"] = True
+            result["http_status"] = response.status_code
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+            if response.status_code in (401, 403):
+                result.update(status=DOWN, reason="api_key_rejected")
+                return result
+        except requests.RequestException as e:
+            result.update(status=DEGRADED, reason="unreachable", reachable=False, error=type(e).__name__)
+            return result
+
+    if circuit != "closed":
+        result.update(status=DEGRADED, reason=f"circuit_{circuit}")
+    else:
+        result["status"] = OK
+    return result
+
+
+def check_deepseek() -> Dict[str, Any]:
+    return probe_upstream("llm:deepseek", DEEPSEEK_BASE_URL, DEEPSEEK_API_KEY, HEALTH_UPSTREAM_PROBE_ENABLED)
+
+
+def check_embeddings() -> Dict[str, Any]:
+    base_url = OPENAI_BASE_URL or "https://api.openai.com/v1"
+    return probe_upstream(f"embeddings:{EMBED_MODEL}", base_url, OPENAI_API_KEY, HEALTH_UPSTREAM_PROBE_ENABLED)
+
+
+def default_checks() -> List[HealthCheck]:
+    """Local stores every HEALTH_PROBE_INTERVAL_S, upstreams every HEALTH_UPSTREAM_PROBE_INTERVAL_S"""
+    return [
+        HealthCheck("docs_store", check_docs_store, HEALTH_PROBE_INTERVAL_S),
+        HealthCheck("parts_store", check_parts_store, HEALTH_PROBE_INTERVAL_S),
+        HealthCheck("deepseek", check_deepseek, HEALTH_UPSTREAM_PROBE_INTERVAL_S),
+        HealthCheck("embeddings", check_embeddings, HEALTH_UPSTREAM_PROBE_INTERVAL_S),
+    ]
+
+
+_prober: Optional[HealthProber] = None
+_prober_lock = threading.Lock()
+
+
+def get_health_prober() -> HealthProber:
+    """The process-wide prober (created on first use, started by the app)"""
+    global _prober
+    if _prober is None:
+        with _prober_lock:
+            if _prober is None:
+                _prober = HealthProber()
+    return _prober
@@ -2,11 +2,14 @@
 Health Service - Handles application health checks and system status
 """
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from .health_prober import HealthProber, get_health_prober
 
 class HealthService:
-    def __init__(self, start_time: float):
+    def __init__(self, start_time: float, prober: Optional[HealthProber] = None):
         self.start_time = start_time
+        self.prober = prober or get_health_prober()
     
     def get_health_status(self) -> Dict[str, Any]:
         """
@@ -23,22 +26,34 @@ class HealthService:
             "version": "1.0.0"
         }
     
-    def get_detailed_health_status(self) -> Dict[str, Any]:
+    def get_liveness_status(self) -> Dict[str, Any]:
         """
-        Get detailed health status including system information.
-        This can be extended later with database checks, external service checks, etc.
+        Liveness: the process is up and serving. No dependency checks, so a
+        failing upstream never gets a worker restarted.
         
         Returns:
-            Dict containing detailed health information
+            Dict containing status and uptime
         """
-        basic_health = self.get_health_status()
+        return self.get_health_status()
+    
+    def get_readiness_status(self) -> Dict[str, Any]:
+        """
+        Readiness from the background prober's cached results (no I/O).
         
-        detailed_status = {
-            **basic_health,
-            "components": {
-                "api": "healthy",
-                "services": "healthy"
-            }
+        Returns:
+            Dict containing "ready", overall status (ready, degraded or
+            not_ready), per-component results, degraded reasons and circuit states
+        """
+        return {
+            **self.get_health_status(),
+            **self.prober.snapshot(),
         }
+    
+    def get_detailed_health_status(self) -> Dict[str, Any]:
+        """
+        Get detailed health status including system information.
         
-        return detailed_status
\ No newline at end of file
+        Returns:
+            Dict containing detailed health information
+        """
+        return self.get_readiness_status()
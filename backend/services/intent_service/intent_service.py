@@ -1,61 +1,192 @@
 """
 Intent Service - Handles intent classification for user queries
 """
+import json
 from services.external_api.deepseek_client import DeepSeekClient
-from typing import Dict, Any
+from services.batching import MicroBatcher
+from services.resilience import Deadline
+from config import INTENT_BATCHING_ENABLED, INTENT_BATCH_MAX_SIZE, INTENT_BATCH_MAX_WAIT_MS, INTENT_BATCH_MAX_IN_FLIGHT, INTENT_BUDGET_FRACTION, INTENT_FALLBACK
+from typing import Dict, Any, List, Optional
+
+# shared by the single-query and batch prompts so the two can't drift apart
+INTENT_ROLE = "You are an intent classifier for an appliance parts assistant called partselect.com."
+INTENT_CATEGORIES = """1. compatibility - Questions about whether parts work together, fit specific models, or are compatible
+2. installation - Questions about how to install, replace, or physically work with parts
+3. qna - General product questions, features, specifications, how things work
+4. troubleshoot - Problems, issues, things not working, error diagnosis
+5. out_of_scope - Non-appliance related questions or requests outside the system's domain
+
+Examples:
+- "Will this pump work with my Whirlpool WDF520PADM?" → compatibility
+- "How do I replace the water inlet valve?" → installation
+- "What does the drain pump do?" → qna
+- "My dishwasher is not draining properly" → troubleshoot
+- "What's the weather like?" → out_of_scope"""
+INTENT_SCOPE = "No explanations. You must follow the fact that you are made specifically for answering questions about refrigerators and dishwashers."
+
+INTENT_SYSTEM_PROMPT = f"""{INTENT_ROLE} Classify the user query into exactly one of these 5 categories:
+
+{INTENT_CATEGORIES}
+
+Respond with ONLY the intent category name. {INTENT_SCOPE}"""
+
+BATCH_INTENT_SYSTEM_PROMPT = f"""{INTENT_ROLE} You will receive a numbered list of user queries. Classify EACH query into exactly one of these 5 categories:
+
+{INTENT_CATEGORIES}
+
+Respond with ONLY a JSON array of intent category names, one per query, in the same order as the queries. Example for 3 queries: ["qna", "troubleshoot", "out_of_scope"]. {INTENT_SCOPE}"""
+
 
 class IntentService:
     """
     Service for classifying user queries into intent categories.
+
+    With batching enabled, concurrent classify_intent calls are gathered for a
+    short window and classified together in one LLM call.
     """
-    
-    def __init__(self):
+
+    def __init__(self, batching: Optional[bool] = None):
         self.deepseek_client = DeepSeekClient()
         self.valid_intents = ["compatibility", "installation", "qna", "troubleshoot", "out_of_scope"]
-    
-    def classify_intent(self, query: str) -> str:
+        self.batch_size = INTENT_BATCH_MAX_SIZE
+
+        self.batching = INTENT_BATCHING_ENABLED if batching is None else batching
+        self.batcher = None
+        if self.batching:
+            self.batcher = MicroBatcher(
+                handler=self.classify_intents,
+                max_batch_size=self.batch_size,
+                max_wait_ms=INTENT_BATCH_MAX_WAIT_MS,
+                name="intent-batcher",
+                max_in_flight=INTENT_BATCH_MAX_IN_FLIGHT,
+            )
+
+    def classify_intent(self, query: str, deadline: Optional[Deadline] = None) -> str:
         """
         Classify a user query into one of the 5 intent categories.
-        
+
         Args:
             query: The user's query string
-            
+            deadline: Optional request deadline; classification gets
+                      INTENT_BUDGET_FRACTION of the remaining time
+
         Returns:
-            str: The classified intent (compatibility, installation, qna, troubleshoot, out_of_scope)
+            str: The classified intent (compatibility, installation, qna, troubleshoot, out_of_scope),
+            or INTENT_FALLBACK if the classifier was unavailable (see classify)
         """
-        system_prompt = """You are an intent classifier for an appliance parts assistant called partselect.com. Classify the user query into exactly one of these 5 categories:
+        return self.classify(query, deadline)["intent"]
 
-1. compatibility - Questions about whether parts work together, fit specific models, or are compatible
-2. installation - Questions about how to install, replace, or physically work with parts  
-3. qna - General product questions, features, specifications, how things work
-4. troubleshoot - Problems, issues, things not working, error diagnosis
-5. out_of_scope - Non-appliance related questions or requests outside the system's domain
+    def classify(self, query: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Classify a query, saying whether the classifier actually answered.
 
-Examples:
-- "Will this pump work with my Whirlpool WDF520PADM?" → compatibility
-- "How do I replace the water inlet valve?" → installation  
-- "What does the drain pump do?" → qna
-- "My dishwasher is not draining properly" → troubleshoot
-- "What's the weather like?" → out_of_scope
+        A timeout, open circuit or upstream error is not an out-of-scope
+        question: the query gets INTENT_FALLBACK (a general answer) and
+        "intent_unavailable" in "degraded" instead of the out-of-scope refusal.
 
-Respond with ONLY the intent category name. No explanations. You must follow the fact that you are made specifically for answering questions about refridegrators and dishwashwers."""
+        Args:
+            query: The user's query string
+            deadline: Optional request deadline
+
+        Returns:
+            Dict containing "intent" and "degraded" (empty when classified)
+        """
+        timeout = deadline.budget(INTENT_BUDGET_FRACTION) if deadline is not None else None
 
         try:
-            response = self.deepseek_client.chat_with_system(
-                system_prompt=system_prompt,
-                user_prompt=query,
-                model="deepseek-chat",
-                max_tokens=10,
-                temperature=0.1
-            )
-            
-            intent = response.lower().strip()
-            
-            if intent in self.valid_intents:
-                return intent
+            if self.batcher is not None:
+                intent = self.batcher.submit(query).result(timeout=timeout)
             else:
-                return "out_of_scope"
-                
+                intent = self._request_single(query, timeout)
         except Exception as e:
-            print(f"Error in intent classification: {e}")
-            return "out_of_scope"
\ No newline at end of file
+            print(f"Warning: intent classification unavailable, falling back to '{INTENT_FALLBACK}': {e!r}")
+            return {"intent": INTENT_FALLBACK, "degraded": ["intent_unavailable"]}
+
+        return {"intent": intent, "degraded": []}
+
+    def classify_intents(self, queries: List[str]) -> List[str]:
+        """
+        Classify several queries, up to `batch_size` per LLM call.
+        Falls back to per-query calls for any chunk whose response can't be parsed.
+
+        Args:
+            queries: The user queries to classify
+
+        Returns:
+            List of intents in the same order as `queries`
+
+        Raises:
+            Exception: The LLM call failed (timeout, 429, 5xx, open circuit). The
+                whole batch fails rather than retrying each query against the
+                same struggling provider
+        """
+        intents: List[str] = []
+        for start in range(0, len(queries), self.batch_size):
+            chunk = queries[start:start + self.batch_size]
+            labels = self._classify_batch(chunk) if len(chunk) > 1 else None
+            if labels is None:
+                labels = [self._request_single(q) for q in chunk]
+            intents.extend(labels)
+        return intents
+
+    def _request_single(self, query: str, timeout: Optional[float] = None) -> str:
+        """One LLM call for one query; transport errors propagate"""
+        response = self.deepseek_client.chat_with_system(
+            system_prompt=INTENT_SYSTEM_PROMPT,
+            user_prompt=query,
+            model="deepseek-chat",
+            max_tokens=10,
+            temperature=0.1,
+            timeout=timeout
+        )
+        return self._normalize_intent(response)
+
+    def _classify_batch(self, queries: List[str]) -> Optional[List[str]]:
+        """
+        One LLM call for several queries.
+
+        Returns:
+            List of intents, or None if the response wasn't a JSON array with
+            one label per query (the call itself failing raises)
+        """
+        user_prompt = "\n".join(f"{i}. {q}" for i, q in enumerate(queries, 1))
+
+        response = self.deepseek_client.chat_with_system(
+            system_prompt=BATCH_INTENT_SYSTEM_PROMPT,
+            user_prompt=user_prompt,
+            model="deepseek-chat",
+            max_tokens=10 * len(queries) + 10,
+            temperature=0.1
+        )
+
+        labels = self._parse_label_array(response, len(queries))
+        if labels is None:
+            print("Warning: could not parse batch intent response, falling back to per-query calls")
+            return None
+        return labels
+
+    def _parse_label_array(self, response: str, expected: int) -> Optional[List[str]]:
+        """Pull a JSON array of labels out of the LLM response"""
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end <= start:
+            return None
+
+        try:
+            labels = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(labels, list) or len(labels) != expected:
+            return None
+        if not all(isinstance(label, str) for label in labels):
+            return None
+
+        return [self._normalize_intent(label) for label in labels]
+
+    def _normalize_intent(self, label: str) -> str:
+        intent = label.lower().strip()
+
+        if intent in self.valid_intents:
+            return intent
+        else:
+            return "out_of_scope"
@@ -0,0 +1,25 @@
+"""
+Metrics Service Package
+
+Provides Prometheus metrics and per-stage latency timing for the PartSelect Assistant API.
+"""
+
+from .metrics import (
+    stage_timer,
+    record_intent,
+    record_answer,
+    record_cache_event,
+    record_token_usage,
+    record_upstream_error,
+    render_metrics,
+)
+
+__all__ = [
+    "stage_timer",
+    "record_intent",
+    "record_answer",
+    "record_cache_event",
+    "record_token_usage",
+    "record_upstream_error",
+    "render_metrics",
+]
@@ -0,0 +1,116 @@
+"""
+Metrics - Prometheus metrics for the chat pipeline
+
+Every stage of a /chat request (intent classification, each retriever's
+direct lookup / embedding / vector query, prompt building, LLM generation)
+is wrapped in `stage_timer`, which feeds a latency histogram, an in-flight
+gauge and an error counter labelled by stage, and is recorded as a trace span
+when the request is traced. Counters cover intents, answer modes, cache hits,
+token usage and upstream errors.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from services.tracing_service import span
+
+# covers a ~1ms dict lookup up to a slow reasoning-model answer
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+STAGE_LATENCY = Histogram(
+    "partselect_stage_duration_seconds",
+    "Time spent in each stage of a chat request",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_IN_FLIGHT = Gauge(
+    "partselect_stage_in_flight",
+    "Requests currently inside each stage",
+    ["stage"],
+)
+STAGE_ERRORS = Counter(
+    "partselect_stage_errors_total",
+    "Stages that raised an exception",
+    ["stage"],
+)
+INTENTS = Counter(
+    "partselect_intents_total",
+    "Classified intents",
+    ["intent"],
+)
+ANSWERS = Counter(
+    "partselect_answers_total",
+    "Answers by intent and how they were produced (llm, template, polished; skipped or error when generation did not run or failed)",
+    ["intent", "answer_mode"],
+)
+CACHE_EVENTS = Counter(
+    "partselect_cache_events_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+LLM_TOKENS = Counter(
+    "partselect_llm_tokens_total",
+    "LLM tokens reported by the provider, by type (prompt, completion, prompt cache hit/miss)",
+    ["type"],
+)
+UPSTREAM_ERRORS = Counter(
+    "partselect_upstream_errors_total",
+    "Failed calls to upstream services",
+    ["upstream"],
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Time a block as one pipeline stage (also a trace span on traced requests).
+
+    Args:
+        stage: Stage label, e.g. "intent_classification" or "compatibility_vector_query"
+    """
+    in_flight = STAGE_IN_FLIGHT.labels(stage)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    except BaseException:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+        in_flight.dec()
+
+
+def record_intent(intent: str):
+    INTENTS.labels(intent).inc()
+
+
+def record_answer(intent: str, answer_mode: str):
+    ANSWERS.labels(intent, answer_mode).inc()
+
+
+def record_cache_event(cache: str, hit: bool):
+    CACHE_EVENTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_token_usage(usage: Dict[str, int]):
+    for token_type, count in usage.items():
+        if count:
+            LLM_TOKENS.labels(token_type).inc(count)
+
+
+def record_upstream_error(upstream: str):
+    UPSTREAM_ERRORS.labels(upstream).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format.
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
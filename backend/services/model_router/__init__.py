@@ -0,0 +1,9 @@
+"""
+Model Router Package
+
+Provides server-side LLM model and generation-limit routing for the PartSelect Assistant API.
+"""
+
+from .model_router import ModelRouter, is_conclusive_lookup
+
+__all__ = ["ModelRouter", "is_conclusive_lookup"]
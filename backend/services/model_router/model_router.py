@@ -0,0 +1,178 @@
+"""
+Model Router - Chooses the LLM model and generation limits for each answer
+
+Clients can ask for a model, but the server decides. The reasoning model is
+only used for intents that benefit from it, when the request's latency
+target leaves room for it, and when the evidence isn't already conclusive.
+Generation limits come from a per-intent profile and are shrunk further
+when the estimated generation time would overrun the latency target.
+"""
+from typing import Dict, Any, Optional
+
+from config import (
+    LLM_DEFAULT_MODEL,
+    LLM_REASONING_MODEL,
+    LLM_REASONING_ENABLED,
+    LLM_REASONING_INTENTS,
+    LLM_REASONING_MIN_LATENCY_MS,
+    LLM_DEFAULT_LATENCY_TARGET_MS,
+)
+
+# names clients may send -> provider model names
+MODEL_ALIASES = {
+    "deepseek-chat": LLM_DEFAULT_MODEL,
+    "deepseek-reasoning": LLM_REASONING_MODEL,  # what the frontend sends
+    "deepseek-reasoner": LLM_REASONING_MODEL,
+}
+
+# per-intent generation limits
+INTENT_PROFILES = {
+    "compatibility": {"max_tokens": 300, "temperature": 0.2},
+    "installation": {"max_tokens": 600, "temperature": 0.3},
+    "troubleshoot": {"max_tokens": 500, "temperature": 0.5},
+    "qna": {"max_tokens": 450, "temperature": 0.5},
+}
+DEFAULT_PROFILE = {"max_tokens": 500, "temperature": 0.7}
+
+# a conclusive direct lookup (e.g. a YES/NO cross-check) only needs a short answer
+CONCLUSIVE_MAX_TOKENS = 150
+
+# the reasoning model spends tokens thinking before it answers
+REASONING_MAX_TOKENS = 2000
+
+# rough throughput figures used to estimate generation time
+MODEL_SPEEDS = {
+    LLM_DEFAULT_MODEL: {"prefill_tps": 2000.0, "decode_tps": 50.0, "overhead_ms": 400.0},
+    LLM_REASONING_MODEL: {"prefill_tps": 2000.0, "decode_tps": 30.0, "overhead_ms": 1500.0},
+}
+
+# never shrink a completion below this, an answer has to fit
+MIN_MAX_TOKENS = 64
+
+
+def is_conclusive_lookup(intent: str, retrieved_data: Any) -> bool:
+    """
+    Whether direct lookup already fully determines the answer: a cross-check
+    for compatibility, or an exact installation manual entry.
+
+    Args:
+        intent: The classified intent
+        retrieved_data: Data returned by the intent's retriever
+
+    Returns:
+        True if the answer is fully determined by direct lookup
+    """
+    if not isinstance(retrieved_data, dict):
+        return False
+
+    matches = retrieved_data.get("direct_lookup", {}).get("direct_matches", [])
+    if intent == "compatibility":
+        return any(m.get("type") == "cross_check" for m in matches)
+    if intent == "installation":
+        return any(m.get("type") == "installation_manual" for m in matches)
+    return False
+
+
+class ModelRouter:
+    """
+    Server-side routing policy for answer generation.
+    """
+
+    def __init__(
+        self,
+        reasoning_enabled: bool = LLM_REASONING_ENABLED,
+        reasoning_intents: Optional[list] = None,
+        reasoning_min_latency_ms: int = LLM_REASONING_MIN_LATENCY_MS,
+        default_latency_target_ms: int = LLM_DEFAULT_LATENCY_TARGET_MS,
+    ):
+        self.reasoning_enabled = reasoning_enabled
+        self.reasoning_intents = set(LLM_REASONING_INTENTS if reasoning_intents is None else reasoning_intents)
+        self.reasoning_min_latency_ms = reasoning_min_latency_ms
+        self.default_latency_target_ms = default_latency_target_ms
+
+    def route(
+        self,
+        intent: str,
+        requested_model: Optional[str] = None,
+        context_tokens: int = 0,
+        conclusive: bool = False,
+        latency_target_ms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Decide model, max_tokens and temperature for one answer.
+
+        Args:
+            intent: The classified intent
+            requested_model: Model the client asked for (a request, not a command)
+            context_tokens: Size of the evidence going into the prompt
+            conclusive: Whether direct lookup already determines the answer
+            latency_target_ms: The client's latency target (default from config)
+
+        Returns:
+            Dict containing model, max_tokens, temperature, the estimate in ms,
+            and the reasons behind the decision
+        """
+        target_ms = latency_target_ms or self.default_latency_target_ms
+        reasons = []
+
+        model = MODEL_ALIASES.get(requested_model or "", LLM_DEFAULT_MODEL)
+        if requested_model and requested_model not in MODEL_ALIASES:
+            reasons.append(f"unknown model '{requested_model}'")
+
+        if model == LLM_REASONING_MODEL:
+            denied = self._reasoning_denied(intent, conclusive, target_ms)
+            if denied:
+                model = LLM_DEFAULT_MODEL
+                reasons.append(f"reasoning model denied: {denied}")
+
+        profile = INTENT_PROFILES.get(intent, DEFAULT_PROFILE)
+        max_tokens = profile["max_tokens"]
+        temperature = profile["temperature"]
+
+        if model == LLM_REASONING_MODEL:
+            max_tokens = REASONING_MAX_TOKENS
+        elif conclusive:
+            max_tokens = min(max_tokens, CONCLUSIVE_MAX_TOKENS)
+            reasons.append("conclusive direct lookup")
+
+        # shrink the completion budget until the estimate fits the target
+        fitted = self._fit_max_tokens(model, context_tokens, target_ms)
+        if fitted < max_tokens:
+            max_tokens = max(MIN_MAX_TOKENS, fitted)
+            reasons.append(f"max_tokens capped for {target_ms}ms target")
+
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "requested_model": requested_model,
+            "latency_target_ms": target_ms,
+            "estimated_ms": round(self.estimate_ms(model, context_tokens, max_tokens)),
+            "reasons": reasons,
+        }
+
+    def estimate_ms(self, model: str, prompt_tokens: int, max_tokens: int) -> float:
+        """Worst-case generation time estimate for a call"""
+        speed = MODEL_SPEEDS.get(model, MODEL_SPEEDS[LLM_DEFAULT_MODEL])
+        return (
+            speed["overhead_ms"]
+            + prompt_tokens / speed["prefill_tps"] * 1000.0
+            + max_tokens / speed["decode_tps"] * 1000.0
+        )
+
+    def _fit_max_tokens(self, model: str, prompt_tokens: int, target_ms: float) -> int:
+        speed = MODEL_SPEEDS.get(model, MODEL_SPEEDS[LLM_DEFAULT_MODEL])
+        fixed_ms = speed["overhead_ms"] + prompt_tokens / speed["prefill_tps"] * 1000.0
+        return int(max(0.0, target_ms - fixed_ms) / 1000.0 * speed["decode_tps"])
+
+    def _reasoning_denied(self, intent: str, conclusive: bool, target_ms: int) -> Optional[str]:
+        """Why the reasoning model can't be used here, or None if it can"""
+        if not self.reasoning_enabled:
+            return "disabled by server policy"
+        if intent not in self.reasoning_intents:
+            return f"not enabled for intent '{intent}'"
+        if conclusive:
+            return "answer already determined by direct lookup"
+        if target_ms < self.reasoning_min_latency_ms:
+            return f"latency target {target_ms}ms below {self.reasoning_min_latency_ms}ms"
+        return None
@@ -0,0 +1,9 @@
+"""
+Profiling Service Package
+
+Provides an opt-in sampling profiler for /chat requests of the PartSelect Assistant API.
+"""
+
+from .sampling_profiler import SamplingProfiler, RequestProfiler, get_request_profiler, current_profile, sampled_thread
+
+__all__ = ["SamplingProfiler", "RequestProfiler", "get_request_profiler", "current_profile", "sampled_thread"]
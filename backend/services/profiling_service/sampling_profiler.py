@@ -0,0 +1,247 @@
+"""
+Sampling Profiler - Statistical profiling of individual /chat requests
+
+A sampler thread reads the stack of the thread running the request every
+PROFILE_INTERVAL_MS (via sys._current_frames) and counts identical stacks.
+The request thread itself is never instrumented, so the overhead is the
+sampler's own wake-ups and stays flat no matter how deep the pipeline is.
+
+Part of a request runs on other threads: LLM calls (HTTP and response JSON
+decoding) on the hedge executor, embeddings on the micro-batcher's
+executor. Those register themselves with `sampled_thread` while they work
+for a profiled request and are sampled too, under a "[thread-name]" frame;
+the request thread meanwhile shows up waiting on their futures. An
+embedding batch serves several requests, so its samples appear in the
+profile of every profiled request in it.
+
+Stacks show where time goes: regex extraction, JSON handling, Chroma's
+Python layer, or socket reads waiting on the network.
+
+Output is in the folded-stack format ("root;frame;frame count" per line)
+understood by flamegraph.pl, speedscope and inferno. The root frame is tagged
+with the intent and request ID.
+
+Profiling is opt-in per request (admin token header, or PROFILE_SAMPLE_RATE)
+and capped at PROFILE_MAX_CONCURRENT requests at once, so it's safe to leave
+on at a low rate in production.
+"""
+import contextvars
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from config import (
+    PROFILE_ADMIN_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_INTERVAL_MS,
+    PROFILE_MAX_CONCURRENT,
+    PROFILE_OUTPUT_DIR,
+)
+
+MAX_STACK_DEPTH = 128
+
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent.parent)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(_BACKEND_DIR):
+        path = os.path.relpath(path, _BACKEND_DIR)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    # first line of the function, not the current line, so samples aggregate per function
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack at a fixed interval, plus any worker threads
+    registered with `add_thread` while they run work for the request.
+    """
+
+    def __init__(self, thread_id: int, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.interval_s = interval_ms / 1000.0
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self._workers: Counter = Counter()
+        self._workers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def add_thread(self, thread_id: int):
+        with self._workers_lock:
+            self._workers[thread_id] += 1
+
+    def remove_thread(self, thread_id: int):
+        with self._workers_lock:
+            self._workers[thread_id] -= 1
+            if self._workers[thread_id] <= 0:
+                del self._workers[thread_id]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frames = sys._current_frames()
+            with self._workers_lock:
+                workers = list(self._workers)
+            self._sample(frames.get(self.thread_id))
+            if workers:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id in workers:
+                    self._sample(frames.get(thread_id), f"[{names.get(thread_id, thread_id)}]")
+            self.sample_count += 1
+
+    def _sample(self, frame, root: Optional[str] = None):
+        if frame is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if root:
+            stack.append(root)
+        stack.reverse()
+        self.stacks[";".join(stack)] += 1
+
+    def folded(self, root: str) -> str:
+        """Folded stacks, one "root;frame;...;frame count" line per distinct stack"""
+        return "".join(f"{root};{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# the profiler of the request being handled; pool threads see it through copied contexts
+_current_profile: contextvars.ContextVar[Optional[SamplingProfiler]] = contextvars.ContextVar("current_profile", default=None)
+
+
+def current_profile() -> Optional[SamplingProfiler]:
+    """The SamplingProfiler of the current request, if it is being profiled"""
+    return _current_profile.get()
+
+
+@contextmanager
+def sampled_thread(*profilers: Optional[SamplingProfiler]) -> Iterator[None]:
+    """Have these profilers (None entries ignored) also sample the current thread inside the block"""
+    thread_id = threading.get_ident()
+    # the request thread itself is always sampled
+    active = [p for p in profilers if p is not None and p.thread_id != thread_id]
+    if not active:
+        yield
+        return
+    for profiler in active:
+        profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        for profiler in active:
+            profiler.remove_thread(thread_id)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and runs the pipeline under the sampler.
+    """
+
+    def __init__(
+        self,
+        admin_token: str = PROFILE_ADMIN_TOKEN,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+        max_concurrent: int = PROFILE_MAX_CONCURRENT,
+        output_dir: str = PROFILE_OUTPUT_DIR,
+    ):
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.output_dir = Path(output_dir)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.profiled_count = 0
+        self.skipped_busy_count = 0
+
+    def should_profile(self, token: Optional[str] = None) -> bool:
+        """
+        Whether to profile a request.
+
+        Args:
+            token: Value of the request's X-Profile-Token header
+
+        Returns:
+            True for a matching admin token, else a sample_rate coin flip
+        """
+        if self.is_admin(token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        """Whether `token` is the admin token (only admins are told where the profile went)"""
+        return bool(self.admin_token and token and hmac.compare_digest(token, self.admin_token))
+
+    def run(self, fn: Callable[..., Dict[str, Any]], *args: Any, request_id: Optional[str] = None, **kwargs: Any) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Call `fn` in the current thread with the sampler attached.
+
+        Args:
+            fn: The pipeline entry point (e.g. AgentManager.handle_chat_request)
+            request_id: ID used to tag the profile (random if not given)
+
+        Returns:
+            Tuple of (fn's result, path of the folded-stack file or None if
+            profiling was skipped because too many requests are being profiled)
+        """
+        if not self._slots.acquire(blocking=False):
+            self.skipped_busy_count += 1
+            return fn(*args, **kwargs), None
+
+        request_id = request_id or uuid.uuid4().hex[:16]
+        profiler = SamplingProfiler(threading.get_ident(), self.interval_ms)
+        started = time.perf_counter()
+        profiler.start()
+        token = _current_profile.set(profiler)
+        intent = "error"
+        try:
+            result = fn(*args, **kwargs)
+            intent = result.get("intent", "unknown") if isinstance(result, dict) else "unknown"
+        finally:
+            _current_profile.reset(token)
+            profiler.stop()
+            path = self._write(profiler, intent, request_id, (time.perf_counter() - started) * 1000.0)
+            self._slots.release()
+
+        self.profiled_count += 1
+        return result, path
+
+    def _write(self, profiler: SamplingProfiler, intent: str, request_id: str, elapsed_ms: float) -> Optional[str]:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}_{intent}_{request_id}.folded"
+            root = f"chat [intent={intent} request={request_id} elapsed_ms={elapsed_ms:.0f}]"
+            path.write_text(profiler.folded(root))
+            return str(path)
+        except Exception as e:
+            print(f"Warning: could not write profile: {e}")
+            return None
+
+
+_request_profiler: Optional[RequestProfiler] = None
+
+
+def get_request_profiler() -> RequestProfiler:
+    """The process-wide RequestProfiler"""
+    global _request_profiler
+    if _request_profiler is None:
+        _request_profiler = RequestProfiler()
+    return _request_profiler
@@ -0,0 +1,9 @@
+"""
+Prompt Service Package
+
+Provides precompiled, cache-friendly prompt templates for the PartSelect Assistant API.
+"""
+
+from .prompt_templates import PromptTemplate, PROMPT_TEMPLATES, get_prompt_template
+
+__all__ = ["PromptTemplate", "PROMPT_TEMPLATES", "get_prompt_template"]
@@ -0,0 +1,20 @@
+"""
+Resilience Package
+
+Provides request deadlines and per-upstream circuit breakers for the PartSelect Assistant API.
+"""
+
+from .deadline import Deadline, DeadlineExceeded
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker, get_circuit_states
+from .degradation import semantic_search_skip_reason, retrieval_timeout
+
+__all__ = [
+    "Deadline",
+    "DeadlineExceeded",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_circuit_breaker",
+    "get_circuit_states",
+    "semantic_search_skip_reason",
+    "retrieval_timeout",
+]
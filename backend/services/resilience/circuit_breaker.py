@@ -0,0 +1,116 @@
+"""
+Circuit Breaker - Stops calling an upstream that keeps failing
+
+After `failure_threshold` consecutive failures the breaker opens and calls
+fail fast. Once `recovery_timeout_s` has passed, one trial call is let
+through (half-open): success closes the breaker, failure re-opens it.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT_S
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, recovery_timeout_s: float = CIRCUIT_RECOVERY_TIMEOUT_S):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_s = recovery_timeout_s
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through right now. In half-open state only one
+        trial call is allowed at a time.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected_count += 1
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError if the call isn't allowed"""
+        if not self.allow():
+            raise CircuitOpenError(f"circuit '{self.name}' is open")
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected_count": self.rejected_count,
+            }
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout_s:
+            self._state = HALF_OPEN
+        return self._state
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the process-wide breaker for an upstream.
+
+    Args:
+        name: Upstream name, e.g. "llm:deepseek" or "embeddings:text-embedding-3-small"
+
+    Returns:
+        The shared CircuitBreaker for that upstream
+    """
+    if name not in _breakers:
+        with _breakers_lock:
+            if name not in _breakers:
+                _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+
+def get_circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker created so far"""
+    return {name: breaker.snapshot() for name, breaker in list(_breakers.items())}
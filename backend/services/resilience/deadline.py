@@ -0,0 +1,80 @@
+"""
+Deadline - An end-to-end request deadline passed through every stage
+
+The API edge creates one Deadline per request. Each stage asks it for a
+budget (a share of the remaining time) and uses that as its timeout, or
+skips optional work when too little time is left.
+"""
+import time
+from typing import Optional
+
+from config import REQUEST_DEADLINE_MS, REQUEST_MAX_DEADLINE_MS
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage starts after the request deadline has passed"""
+
+
+class Deadline:
+    """
+    Absolute point in time by which the request must be answered.
+    """
+
+    def __init__(self, timeout_s: float):
+        self.timeout_s = timeout_s
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + timeout_s
+
+    @classmethod
+    def from_ms(cls, timeout_ms: float) -> "Deadline":
+        return cls(timeout_ms / 1000.0)
+
+    @classmethod
+    def for_request(cls, latency_target_ms: Optional[int] = None) -> "Deadline":
+        """
+        The deadline for one API request: the client's latency target when it
+        gives one (at least REQUEST_DEADLINE_MS, at most REQUEST_MAX_DEADLINE_MS),
+        else REQUEST_DEADLINE_MS.
+        """
+        timeout_ms = max(latency_target_ms or 0, REQUEST_DEADLINE_MS)
+        return cls.from_ms(min(timeout_ms, max(REQUEST_MAX_DEADLINE_MS, REQUEST_DEADLINE_MS)))
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> float:
+        return self.remaining() * 1000.0
+
+    def cap_ms(self, target_ms: float) -> int:
+        """`target_ms`, never more than the time remaining"""
+        return int(min(target_ms, self.remaining_ms()))
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started_at) * 1000.0
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def budget(self, fraction: float = 1.0, minimum_s: float = 0.0, maximum_s: Optional[float] = None) -> float:
+        """
+        Timeout for a stage: a share of the remaining time.
+
+        Args:
+            fraction: Share of the remaining time this stage may use
+            minimum_s: Floor for the budget (still capped at what remains)
+            maximum_s: Optional ceiling for the budget
+
+        Returns:
+            Budget in seconds, never more than the time remaining
+        """
+        remaining = self.remaining()
+        budget = max(remaining * fraction, minimum_s)
+        if maximum_s is not None:
+            budget = min(budget, maximum_s)
+        return min(budget, remaining)
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if the deadline has already passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"deadline exceeded before {stage} ({self.elapsed_ms():.0f}ms elapsed)")
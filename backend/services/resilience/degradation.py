@@ -0,0 +1,38 @@
+"""
+Degradation - Decides which optional retrieval work to drop under pressure
+
+Semantic search is the optional half of retrieval: the direct JSON lookups
+answer part/model questions on their own. When the request is close to its
+deadline, or the embeddings provider's circuit is open, semantic search is
+skipped and the response is marked degraded instead of timing out.
+"""
+from typing import Optional
+
+from config import EMBED_MODEL, RETRIEVAL_BUDGET_FRACTION, SEMANTIC_SEARCH_MIN_REMAINING_MS
+from .circuit_breaker import OPEN, get_circuit_breaker
+from .deadline import Deadline
+
+
+def semantic_search_skip_reason(deadline: Optional[Deadline], model: str = EMBED_MODEL) -> Optional[str]:
+    """
+    Why semantic search should be skipped, if it should.
+
+    Args:
+        deadline: The request deadline (None means no deadline)
+        model: Embedding model whose circuit breaker is checked
+
+    Returns:
+        A degradation marker such as "semantic_search_skipped:deadline", or None
+    """
+    if deadline is not None and deadline.remaining_ms() < SEMANTIC_SEARCH_MIN_REMAINING_MS:
+        return "semantic_search_skipped:deadline"
+    if get_circuit_breaker(f"embeddings:{model}").state == OPEN:
+        return "semantic_search_skipped:embeddings_circuit_open"
+    return None
+
+
+def retrieval_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+    """Timeout in seconds for the retrieval stage (None when there is no deadline)"""
+    if deadline is None:
+        return None
+    return deadline.budget(RETRIEVAL_BUDGET_FRACTION)
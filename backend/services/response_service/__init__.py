@@ -0,0 +1,10 @@
+"""
+Response Service Package
+
+Provides /chat response projection and fast JSON serialization for the PartSelect Assistant API.
+"""
+
+from .response_projection import VIEWS, project_chat_response, build_cards
+from .json_response import FastJSONResponse
+
+__all__ = ["VIEWS", "project_chat_response", "build_cards", "FastJSONResponse"]
@@ -0,0 +1,18 @@
+"""
+Fast JSON response class backed by orjson
+"""
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson, several times faster than the stdlib
+    encoder on our nested retrieval payloads. Chroma can hand back numpy
+    scalars, so those are serialized natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
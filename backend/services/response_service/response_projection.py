@@ -0,0 +1,112 @@
+"""
+Response Projection - Shapes the /chat payload for the client
+
+AgentManager returns everything it used, including full compatible-model
+lists, raw Chroma documents/metadatas/distances and installation text that is
+already in the answer. The browser only renders the answer, so the payload is
+projected to one of three views:
+
+- answer: the answer and a few flags
+- cards: the answer plus compact, capped result cards (parts, compatibility checks)
+- debug: the full AgentManager response, unchanged
+"""
+from typing import Any, Dict, List, Optional
+
+from config import CHAT_RESPONSE_VIEW, CHAT_RESPONSE_MAX_CARDS, CHAT_RESPONSE_MAX_LIST_ITEMS
+
+VIEWS = ("answer", "cards", "debug")
+
+# fields kept in every view
+ANSWER_FIELDS = ["response", "intent", "model", "answer_mode", "degraded"]
+
+# metadata kept on a semantic-search card
+CARD_FIELDS = ["title", "url", "brand", "price", "availability", "appliance", "symptom"]
+
+
+def project_chat_response(response: Dict[str, Any], view: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Project an AgentManager response to a view.
+
+    Args:
+        response: The full response from AgentManager.handle_chat_request
+        view: "answer", "cards" or "debug" (default: CHAT_RESPONSE_VIEW)
+
+    Returns:
+        The projected response dict
+    """
+    view = view or CHAT_RESPONSE_VIEW
+    if view == "debug" or view not in VIEWS:
+        return response
+
+    projected = {field: response[field] for field in ANSWER_FIELDS if field in response}
+    if view == "cards":
+        projected["cards"] = build_cards(response.get("retrieved_data"))
+    return projected
+
+
+def build_cards(retrieved_data: Any, max_cards: int = CHAT_RESPONSE_MAX_CARDS, max_list_items: int = CHAT_RESPONSE_MAX_LIST_ITEMS) -> List[Dict[str, Any]]:
+    """
+    Compact cards for the direct-lookup matches and semantic-search hits.
+
+    Args:
+        retrieved_data: Data returned by the intent's retriever
+        max_cards: Maximum number of cards
+        max_list_items: Maximum entries kept from a compatible models/parts list
+
+    Returns:
+        List of card dicts, direct-lookup cards first
+    """
+    if not isinstance(retrieved_data, dict):
+        return []
+
+    cards: List[Dict[str, Any]] = []
+    seen_parts = set()
+
+    for match in retrieved_data.get("direct_lookup", {}).get("direct_matches", []):
+        match_type = match.get("type")
+        if match_type == "part_to_models":
+            cards.append({
+                "type": match_type,
+                "part_number": match["part_number"],
+                "compatible_models": match["compatible_models"][:max_list_items],
+                "count": match["count"],
+            })
+            seen_parts.add(match["part_number"])
+        elif match_type == "model_to_parts":
+            cards.append({
+                "type": match_type,
+                "model_number": match["model_number"],
+                "compatible_parts": match["compatible_parts"][:max_list_items],
+                "count": match["count"],
+            })
+        elif match_type == "cross_check":
+            cards.append({
+                "type": match_type,
+                "results": [
+                    {k: c[k] for k in ("part_number", "model_number", "is_compatible")}
+                    for c in match["cross_check_results"]
+                ],
+            })
+        elif match_type == "installation_manual":
+            # the installation text itself is already in the answer
+            cards.append({"type": match_type, "part_number": match["part_number"], "title": match["title"], "url": match["url"]})
+            seen_parts.add(match["part_number"])
+
+    # compatibility/installation nest their Chroma results; qna/troubleshoot return them directly
+    semantic = retrieved_data.get("semantic_search", retrieved_data)
+    metadatas = (semantic.get("metadatas") or [[]])[0] or []
+    distances = (semantic.get("distances") or [[]])[0] or []
+    for i, meta in enumerate(metadatas):
+        meta = meta or {}
+        part_number = meta.get("part_number") or meta.get("part_id")
+        if part_number and part_number in seen_parts:
+            continue
+        seen_parts.add(part_number)
+
+        card = {"type": meta.get("source", "part"), "part_number": part_number}
+        card.update({k: meta[k] for k in CARD_FIELDS if meta.get(k) not in (None, "", "N/A")})
+        if i < len(distances):
+            card["distance"] = round(float(distances[i]), 4)
+        cards.append({k: v for k, v in card.items() if v is not None})
+
+    return cards[:max_cards]
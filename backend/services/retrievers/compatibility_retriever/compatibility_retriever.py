@@ -3,7 +3,10 @@ import json
 import re
 import chromadb
 from chromadb.config import Settings
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from services.embedding_service import CoalescingOpenAIEmbeddingFunction
+from services.resilience import Deadline, semantic_search_skip_reason, retrieval_timeout
+from services.metrics_service import stage_timer
+from config import CHROMA_DOCS_PATH
 from dotenv import load_dotenv
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
@@ -44,7 +47,7 @@ class CompatibilityRetriever:
             if not openai_key:
                 raise ValueError("OPENAI_API_KEY not set")
             
-            chroma_path = self.project_root / "backend" / "chroma_store"
+            chroma_path = CHROMA_DOCS_PATH
             
             self.client = chromadb.Client(
                 Settings(
@@ -53,7 +56,7 @@ class CompatibilityRetriever:
                 )
             )
             
-            self.embed_fn = OpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
+            self.embed_fn = CoalescingOpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
             self.collection = self.client.get_collection(
                 name="partselect-docs",
                 embedding_function=self.embed_fn
@@ -141,8 +144,8 @@ class CompatibilityRetriever:
         
         return results
     
-    def _semantic_search(self, query: str, appliance: Optional[str] = None, k: int = 3) -> Dict[str, Any]:
-        """Perform ChromaDB semantic search as fallback"""
+    def _semantic_search(self, query: str, appliance: Optional[str] = None, k: int = 3, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Perform ChromaDB semantic search as fallback (embedding waits at most `timeout` seconds)"""
         if not self.collection:
             return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
         
@@ -152,18 +155,21 @@ class CompatibilityRetriever:
             where_filter["appliance"] = appliance
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=k,
-                where=where_filter,
-                include=["documents", "metadatas", "distances"]
-            )
+            with stage_timer("compatibility_embedding"):
+                query_embedding = self.embed_fn.dispatcher.embed(query, timeout=timeout)
+            with stage_timer("compatibility_vector_query"):
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=k,
+                    where=where_filter,
+                    include=["documents", "metadatas", "distances"]
+                )
             return results
         except Exception as e:
             print(f"Error in semantic search: {e}")
-            return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+            return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "error": True}
     
-    def retrieve(self, query: str, appliance: Optional[str] = None, k: int = 3) -> Dict[str, Any]:
+    def retrieve(self, query: str, appliance: Optional[str] = None, k: int = 3, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Main retrieval method combining direct lookup + semantic search
         
@@ -171,6 +177,8 @@ class CompatibilityRetriever:
             query: User's compatibility question
             appliance: Optional appliance filter (dishwasher, refrigerator)
             k: Number of results to return for semantic search
+            deadline: Optional request deadline; semantic search is skipped when
+                      it is close (the direct lookup always runs)
         
         Returns:
             Combined results from direct lookup and semantic search
@@ -179,10 +187,19 @@ class CompatibilityRetriever:
         part_numbers, model_numbers = self._extract_identifiers(query)
         
         # Perform direct lookup
-        direct_results = self._direct_lookup(part_numbers, model_numbers)
-        
-        # Perform semantic search
-        semantic_results = self._semantic_search(query, appliance, k)
+        with stage_timer("compatibility_direct_lookup"):
+            direct_results = self._direct_lookup(part_numbers, model_numbers)
+        
+        # Perform semantic search unless the deadline or the embeddings circuit says not to
+        degraded = []
+        skip_reason = semantic_search_skip_reason(deadline)
+        if skip_reason:
+            degraded.append(skip_reason)
+            semantic_results = {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+        else:
+            semantic_results = self._semantic_search(query, appliance, k, timeout=retrieval_timeout(deadline))
+            if semantic_results.pop("error", False):
+                degraded.append("semantic_search_failed")
         
         # Combine results
         combined_results = {
@@ -193,7 +210,8 @@ class CompatibilityRetriever:
             },
             "direct_lookup": direct_results,
             "semantic_search": semantic_results,
-            "strategy_used": []
+            "strategy_used": [],
+            "degraded": degraded
         }
         
         # Determine primary strategy
@@ -207,7 +225,14 @@ class CompatibilityRetriever:
 # Create global instance
 _retriever_instance = None
 
-def compatibility_retrieve(query: str, appliance: str | None = None, k: int = 3):
+def get_compatibility_retriever() -> CompatibilityRetriever:
+    """The shared retriever instance (created on first use)"""
+    global _retriever_instance
+    if _retriever_instance is None:
+        _retriever_instance = CompatibilityRetriever()
+    return _retriever_instance
+
+def compatibility_retrieve(query: str, appliance: str | None = None, k: int = 3, deadline: Optional[Deadline] = None):
     """
     Global function interface for compatibility retrieval (maintains backward compatibility)
     
@@ -215,14 +240,9 @@ def compatibility_retrieve(query: str, appliance: str | None = None, k: int = 3)
         query: User's compatibility question
         appliance: Optional appliance filter (dishwasher, refrigerator)
         k: Number of results to return (default 3)
+        deadline: Optional request deadline
     
     Returns:
         Enhanced compatibility results with direct lookup + semantic search
     """
-    global _retriever_instance
-    
-    # Initialize retriever instance once
-    if _retriever_instance is None:
-        _retriever_instance = CompatibilityRetriever()
-    
-    return _retriever_instance.retrieve(query, appliance, k)
+    return get_compatibility_retriever().retrieve(query, appliance, k, deadline)
@@ -3,7 +3,10 @@ import json
 import re
 import chromadb
 from chromadb.config import Settings
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from services.embedding_service import CoalescingOpenAIEmbeddingFunction
+from services.resilience import Deadline, semantic_search_skip_reason, retrieval_timeout
+from services.metrics_service import stage_timer
+from config import CHROMA_DOCS_PATH, INSTALLATION_PASSAGES_COLLECTION, INSTALLATION_MAX_PASSAGES
 from dotenv import load_dotenv
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
@@ -11,6 +14,54 @@ from typing import Dict, List, Any, Optional, Tuple
 # Load environment variables
 load_dotenv()
 
+# how much each passage kind matters to an installation question with no other cue
+KIND_PRIOR = {"step": 1.0, "tools": 0.9, "safety": 0.8, "note": 0.0}
+KIND_CUES = {
+    "tools": re.compile(r"\b(tools?|need|equipment|screwdriver|socket|wrench|driver)\b", re.IGNORECASE),
+    "safety": re.compile(r"\b(safe\w*|power|unplug|electric\w*|shock|water supply|danger\w*)\b", re.IGNORECASE),
+}
+STOPWORDS = {
+    "the", "and", "for", "how", "can", "you", "your", "this", "that", "with", "what", "need",
+    "install", "installing", "installation", "part", "number", "please", "does", "into", "from",
+}
+
+
+def _terms(text: str) -> set:
+    return {t for t in re.findall(r"[a-z0-9/]+", text.lower()) if len(t) > 2 and t not in STOPWORDS}
+
+
+def select_passages(query: str, passages: List[Dict[str, Any]], limit: int = INSTALLATION_MAX_PASSAGES) -> List[Dict[str, Any]]:
+    """
+    Pick the passages of one manual that answer `query`.
+
+    Args:
+        query: The user's question
+        passages: The manual's passages (from installation_passages.json)
+        limit: Maximum passages to return
+
+    Returns:
+        At most `limit` passages in manual order; never empty when `passages` isn't
+    """
+    query_terms = _terms(re.sub(r"PS\d+", " ", query, flags=re.IGNORECASE))
+    scored = []
+    for passage in passages:
+        score = KIND_PRIOR.get(passage.get("kind"), 0.0)
+        score += len(query_terms & _terms(passage["text"]))
+        cue = KIND_CUES.get(passage.get("kind"))
+        if cue and cue.search(query):
+            score += 2.0
+        scored.append((score, passage["step"], passage))
+
+    if not scored:
+        return []
+    ranked = sorted(scored, key=lambda s: (-s[0], s[1]))
+    chosen = [p for score, _, p in ranked[:limit] if score > 0]
+    if not chosen:
+        # only descriptive notes: the opening passage still identifies the part
+        chosen = [ranked[0][2]]
+    return sorted(chosen, key=lambda p: p["step"])
+
+
 class InstallationRetriever:
     """Enhanced installation retriever using JSON manual + ChromaDB semantic search"""
     
@@ -20,8 +71,9 @@ class InstallationRetriever:
         # From services/retrievers/installation_retriever/installation_retriever.py -> go up 5 levels to project root
         self.project_root = self.current_file.parent.parent.parent.parent.parent
         
-        # Load installation manual
+        # Load installation manual and its step-level passages
         self.installation_manual = self._load_installation_manual()
+        self.installation_passages = self._load_installation_passages()
         
         # Setup ChromaDB
         self._setup_chromadb()
@@ -36,6 +88,16 @@ class InstallationRetriever:
             print(f"Warning: Could not load installation_manual.json: {e}")
             return {}
     
+    def _load_installation_passages(self) -> Dict[str, Dict[str, Any]]:
+        """Load installation_passages.json (built by scripts/ingest/build_installation_passages.py)"""
+        try:
+            passages_path = self.project_root / "backend" / "data" / "maps" / "installation_passages.json"
+            with open(passages_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load installation_passages.json, answers will use whole manuals: {e}")
+            return {}
+    
     def _setup_chromadb(self):
         """Setup ChromaDB connection"""
         try:
@@ -43,7 +105,7 @@ class InstallationRetriever:
             if not openai_key:
                 raise ValueError("OPENAI_API_KEY not set")
             
-            chroma_path = self.project_root / "backend" / "chroma_store"
+            chroma_path = CHROMA_DOCS_PATH
             
             self.client = chromadb.Client(
                 Settings(
@@ -52,7 +114,7 @@ class InstallationRetriever:
                 )
             )
             
-            self.embed_fn = OpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
+            self.embed_fn = CoalescingOpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
             self.collection = self.client.get_collection(
                 name="partselect-docs",
                 embedding_function=self.embed_fn
@@ -60,6 +122,17 @@ class InstallationRetriever:
         except Exception as e:
             print(f"Warning: ChromaDB setup failed: {e}")
             self.collection = None
+
+        # semantic search over passages when they were indexed, else whole docs in partselect-docs
+        self.passage_collection = None
+        if self.collection is not None:
+            try:
+                self.passage_collection = self.client.get_collection(
+                    name=INSTALLATION_PASSAGES_COLLECTION,
+                    embedding_function=self.embed_fn
+                )
+            except Exception as e:
+                print(f"Warning: {INSTALLATION_PASSAGES_COLLECTION} not available, searching whole installation docs: {e}")
     
     def _extract_part_numbers(self, query: str) -> List[str]:
         """Extract part numbers from query (PS followed by digits)"""
@@ -67,8 +140,8 @@ class InstallationRetriever:
         # Remove duplicates while preserving order
         return list(dict.fromkeys(part_numbers))
     
-    def _direct_lookup(self, part_numbers: List[str]) -> Dict[str, Any]:
-        """Perform direct installation manual lookup"""
+    def _direct_lookup(self, part_numbers: List[str], query: str = "") -> Dict[str, Any]:
+        """Perform direct installation manual lookup, with the passages relevant to `query`"""
         results = {
             "direct_matches": [],
             "confidence": "HIGH",
@@ -78,40 +151,49 @@ class InstallationRetriever:
         for part_num in part_numbers:
             if part_num in self.installation_manual:
                 manual_entry = self.installation_manual[part_num]
-                results["direct_matches"].append({
+                match = {
                     "type": "installation_manual",
                     "part_number": part_num,
                     "title": manual_entry["title"],
                     "installation_text": manual_entry["installation_text"],
                     "url": manual_entry["url"],
                     "confidence": "VERY_HIGH"
-                })
+                }
+                # the prompt gets these instead of the whole text
+                passages = self.installation_passages.get(part_num, {}).get("passages")
+                if passages:
+                    match["passages"] = select_passages(query, passages)
+                results["direct_matches"].append(match)
         
         return results
     
-    def _semantic_search(self, query: str, appliance: Optional[str] = None, k: int = 3) -> Dict[str, Any]:
-        """Perform ChromaDB semantic search as fallback"""
+    def _semantic_search(self, query: str, appliance: Optional[str] = None, k: int = 3, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Perform ChromaDB semantic search as fallback (embedding waits at most `timeout` seconds)"""
         if not self.collection:
             return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
         
-        # Build filter for installation source
-        where_filter = {"source": "installation"}
+        # Build filter for installation source (every passage is an installation doc)
+        collection = self.passage_collection or self.collection
+        where_filter = {} if self.passage_collection else {"source": "installation"}
         if appliance:
             where_filter["appliance"] = appliance
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=k,
-                where=where_filter,
-                include=["documents", "metadatas", "distances"]
-            )
+            with stage_timer("installation_embedding"):
+                query_embedding = self.embed_fn.dispatcher.embed(query, timeout=timeout)
+            with stage_timer("installation_vector_query"):
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=k,
+                    where=where_filter or None,
+                    include=["documents", "metadatas", "distances"]
+                )
             return results
         except Exception as e:
             print(f"Error in installation semantic search: {e}")
-            return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+            return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "error": True}
     
-    def retrieve(self, query: str, appliance: Optional[str] = None, k: int = 3) -> Dict[str, Any]:
+    def retrieve(self, query: str, appliance: Optional[str] = None, k: int = 3, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Main retrieval method combining direct manual lookup + semantic search
         
@@ -119,6 +201,8 @@ class InstallationRetriever:
             query: User's installation question
             appliance: Optional appliance filter (dishwasher, refrigerator)
             k: Number of results to return for semantic search
+            deadline: Optional request deadline; semantic search is skipped when
+                      it is close (the direct lookup always runs)
         
         Returns:
             Combined results from direct lookup and semantic search
@@ -127,10 +211,19 @@ class InstallationRetriever:
         part_numbers = self._extract_part_numbers(query)
         
         # Perform direct lookup
-        direct_results = self._direct_lookup(part_numbers)
+        with stage_timer("installation_direct_lookup"):
+            direct_results = self._direct_lookup(part_numbers, query)
         
-        # Perform semantic search
-        semantic_results = self._semantic_search(query, appliance, k)
+        # Perform semantic search unless the deadline or the embeddings circuit says not to
+        degraded = []
+        skip_reason = semantic_search_skip_reason(deadline)
+        if skip_reason:
+            degraded.append(skip_reason)
+            semantic_results = {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+        else:
+            semantic_results = self._semantic_search(query, appliance, k, timeout=retrieval_timeout(deadline))
+            if semantic_results.pop("error", False):
+                degraded.append("semantic_search_failed")
         
         # Combine results
         combined_results = {
@@ -140,7 +233,8 @@ class InstallationRetriever:
             },
             "direct_lookup": direct_results,
             "semantic_search": semantic_results,
-            "strategy_used": []
+            "strategy_used": [],
+            "degraded": degraded
         }
         
         # Determine primary strategy
@@ -154,7 +248,14 @@ class InstallationRetriever:
 # Create global instance
 _retriever_instance = None
 
-def installation_retrieve(query: str, appliance: str | None = None, k: int = 3):
+def get_installation_retriever() -> InstallationRetriever:
+    """The shared retriever instance (created on first use)"""
+    global _retriever_instance
+    if _retriever_instance is None:
+        _retriever_instance = InstallationRetriever()
+    return _retriever_instance
+
+def installation_retrieve(query: str, appliance: str | None = None, k: int = 3, deadline: Optional[Deadline] = None):
     """
     Global function interface for installation retrieval (maintains backward compatibility)
     
@@ -162,14 +263,9 @@ def installation_retrieve(query: str, appliance: str | None = None, k: int = 3):
         query: User's installation question
         appliance: Optional appliance filter (dishwasher, refrigerator)
         k: Number of results to return (default 3)
+        deadline: Optional request deadline
     
     Returns:
         Enhanced installation results with direct lookup + semantic search
     """
-    global _retriever_instance
-    
-    # Initialize retriever instance once
-    if _retriever_instance is None:
-        _retriever_instance = InstallationRetriever()
-    
-    return _retriever_instance.retrieve(query, appliance, k)
\ No newline at end of file
+    return get_installation_retriever().retrieve(query, appliance, k, deadline)
\ No newline at end of file
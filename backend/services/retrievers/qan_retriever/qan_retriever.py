@@ -1,38 +1,43 @@
-import os
 import chromadb
-from openai import OpenAI
 from dotenv import load_dotenv
-from pathlib import Path
+from typing import Optional
+from services.embedding_service import get_embedding_dispatcher
+from services.resilience import Deadline, semantic_search_skip_reason, retrieval_timeout
+from services.metrics_service import stage_timer
+from config import CHROMA_PARTS_PATH
 
 # Load environment variables
 load_dotenv()
 
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-
-# Get the correct path to ChromaDB - go up from this file to find backend/chroma_db
-current_file = Path(__file__)
-# From services/retrievers/qan_retriever/qan_retriever.py -> go up 3 levels to backend/
-backend_dir = current_file.parent.parent.parent.parent
-chroma_path = backend_dir / "backend" / "chroma_db"
-
-chroma = chromadb.PersistentClient(path=str(chroma_path))
+# backend/backend/chroma_db unless CHROMA_PARTS_PATH points elsewhere
+chroma = chromadb.PersistentClient(path=str(CHROMA_PARTS_PATH))
 
 EMBED_MODEL = "text-embedding-3-small"
 
-def embed_query(text: str):
-    emb = client.embeddings.create(model=EMBED_MODEL, input=[text]).data[0].embedding
-    return emb
+def embed_query(text: str, timeout: Optional[float] = None):
+    # coalesced with concurrent queries into one batched embeddings call
+    return get_embedding_dispatcher(EMBED_MODEL).embed(text, timeout=timeout)
 
-def qan_retrieve(query: str, appliance: str | None = None, k: int = 5):
+def qan_retrieve(query: str, appliance: str | None = None, k: int = 5, deadline: Optional[Deadline] = None):
     collections = {
         "dishwasher": "dishwasher_parts",
         "refrigerator": "refrigerator_parts"
     }
-    qvec = embed_query(query)
+    # qna is all semantic search: without time or a working embeddings provider, return nothing
+    skip_reason = semantic_search_skip_reason(deadline, EMBED_MODEL)
+    if skip_reason:
+        return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "degraded": [skip_reason]}
+    try:
+        with stage_timer("qna_embedding"):
+            qvec = embed_query(query, timeout=retrieval_timeout(deadline))
+    except Exception as e:
+        print(f"Warning: Could not embed query: {e}")
+        return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "degraded": ["semantic_search_failed"]}
 
     def _search(col_name):
         col = chroma.get_collection(col_name)
-        return col.query(query_embeddings=[qvec], n_results=k, include=["documents", "metadatas", "distances"])
+        with stage_timer("qna_vector_query"):
+            return col.query(query_embeddings=[qvec], n_results=k, include=["documents", "metadatas", "distances"])
 
     if appliance and appliance in collections:
         return _search(collections[appliance])
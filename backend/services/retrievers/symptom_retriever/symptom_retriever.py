@@ -1,14 +1,17 @@
 import os
 import chromadb
 from chromadb.config import Settings
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from services.embedding_service import CoalescingOpenAIEmbeddingFunction
+from services.resilience import Deadline, semantic_search_skip_reason, retrieval_timeout
+from services.metrics_service import stage_timer
+from config import CHROMA_DOCS_PATH
 from dotenv import load_dotenv
-from pathlib import Path
+from typing import Optional
 
 # Load environment variables
 load_dotenv()
 
-def symptom_retrieve(query: str, appliance: str | None = None, k: int = 3):
+def symptom_retrieve(query: str, appliance: str | None = None, k: int = 3, deadline: Optional[Deadline] = None):
     """
     Retrieve troubleshooting information from ChromaDB.
     
@@ -16,21 +19,25 @@ def symptom_retrieve(query: str, appliance: str | None = None, k: int = 3):
         query: User's troubleshooting question or symptom description
         appliance: Optional appliance filter (dishwasher, refrigerator)
         k: Number of results to return (default 3)
+        deadline: Optional request deadline; the search is skipped when it is close
     
     Returns:
-        ChromaDB query results with troubleshooting documents
+        ChromaDB query results with troubleshooting documents, plus a
+        "degraded" list naming anything that was skipped or failed
     """
     
+    # troubleshooting has no direct lookup, so a skipped search means no documents
+    skip_reason = semantic_search_skip_reason(deadline)
+    if skip_reason:
+        return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "degraded": [skip_reason]}
+    
     # Setup ChromaDB client
     openai_key = os.getenv("OPENAI_API_KEY")
     if not openai_key:
         raise ValueError("OPENAI_API_KEY not set")
     
-    # Get the correct path to ChromaDB - go up from this file to find backend/chroma_store
-    current_file = Path(__file__)
-    # From services/retrievers/symptom_retriever/symptom_retriever.py -> go up 4 levels to project root
-    project_root = current_file.parent.parent.parent.parent.parent
-    chroma_path = project_root / "backend" / "chroma_store"
+    # backend/chroma_store unless CHROMA_DOCS_PATH points elsewhere
+    chroma_path = CHROMA_DOCS_PATH
     
     # Connect to ChromaDB
     client = chromadb.Client(
@@ -40,7 +47,7 @@ def symptom_retrieve(query: str, appliance: str | None = None, k: int = 3):
         )
     )
     
-    embed_fn = OpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
+    embed_fn = CoalescingOpenAIEmbeddingFunction(api_key=openai_key, model_name="text-embedding-3-small")
     
     # Get the collection
     collection = client.get_collection(
@@ -57,15 +64,19 @@ def symptom_retrieve(query: str, appliance: str | None = None, k: int = 3):
     
     try:
         # Query ChromaDB
-        results = collection.query(
-            query_texts=[query],
-            n_results=k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"]
-        )
+        with stage_timer("troubleshoot_embedding"):
+            query_embedding = embed_fn.dispatcher.embed(query, timeout=retrieval_timeout(deadline))
+        with stage_timer("troubleshoot_vector_query"):
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=k,
+                where=where_filter,
+                include=["documents", "metadatas", "distances"]
+            )
         
+        results["degraded"] = []
         return results
         
     except Exception as e:
         print(f"Error in symptom_retrieve: {e}")
-        return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+        return {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]], "degraded": ["semantic_search_failed"]}
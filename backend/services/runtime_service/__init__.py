@@ -0,0 +1,11 @@
+"""
+Runtime Service Package
+
+Provides runtime internals (map memory, cache hit rates, queue depths,
+event-loop lag, upstream connections) for the PartSelect Assistant API.
+"""
+
+from .event_loop_lag import EventLoopLagMonitor
+from .runtime_stats import approx_size, collect_runtime_stats, open_connections
+
+__all__ = ["EventLoopLagMonitor", "approx_size", "collect_runtime_stats", "open_connections"]
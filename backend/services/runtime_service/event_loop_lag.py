@@ -0,0 +1,68 @@
+"""
+Event Loop Lag - How late the asyncio loop runs a scheduled callback
+
+A task sleeps for a fixed interval and records how much later than asked it
+woke up. Anything blocking the loop (sync work in an async endpoint, a
+saturated threadpool hand-off, GC pauses) shows up as lag.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class EventLoopLagMonitor:
+    """
+    Samples event-loop lag over a sliding window.
+    """
+
+    def __init__(self, interval_ms: float = 100.0, window: int = 600):
+        self.interval_s = interval_ms / 1000.0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running loop (call from async code)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def observe(self, lag_ms: float):
+        with self._lock:
+            self._samples.append(max(0.0, lag_ms))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Lag percentiles over the window.
+
+        Returns:
+            Dict with sample count and p50/p95/p99/max lag in milliseconds
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+
+        return {
+            "samples": len(samples),
+            "interval_ms": self.interval_s * 1000.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(samples[-1], 3),
+        }
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.observe((time.perf_counter() - started - self.interval_s) * 1000.0)
@@ -0,0 +1,255 @@
+"""
+Runtime Stats - Operational internals for the /debug/runtime endpoint
+
+Collects what tuning worker counts and cache sizes needs: approximate memory
+of the in-process lookup maps, per-cache hit rates and entry counts,
+executor / batcher queue depths, open upstream connections and process
+memory. Everything reads in-memory state or /proc, and the deep size of a
+map is only recomputed when the map changes, so a snapshot stays cheap
+enough to scrape every few seconds.
+"""
+import gc
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics_service.metrics import CACHE_EVENTS
+
+
+def approx_size(obj: Any) -> int:
+    """
+    Approximate deep size in bytes of a JSON-like structure (dicts, lists,
+    strings, numbers). Shared objects are counted once.
+
+    Args:
+        obj: The object to measure
+
+    Returns:
+        Size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+# id(obj) -> (len(obj), bytes); the maps are loaded once and only read afterwards
+_size_cache: Dict[int, Tuple[int, int]] = {}
+
+
+def cached_size(obj: Any) -> int:
+    """approx_size, recomputed only when the object's identity or length changes"""
+    key = id(obj)
+    length = len(obj) if hasattr(obj, "__len__") else -1
+    cached = _size_cache.get(key)
+    if cached is None or cached[0] != length:
+        cached = (length, approx_size(obj))
+        _size_cache[key] = cached
+    return cached[1]
+
+
+def map_stats(maps: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Entry counts and approximate bytes of each lookup map ({"loaded": False} for None)"""
+    return {
+        name: {"entries": len(value), "approx_bytes": cached_size(value)} if value is not None else {"loaded": False}
+        for name, value in maps.items()
+    }
+
+
+def cache_event_stats() -> Dict[str, Dict[str, Any]]:
+    """Hits, misses and hit rate per cache from the Prometheus cache counter"""
+    caches: Dict[str, Dict[str, Any]] = {}
+    for metric in CACHE_EVENTS.collect():
+        for sample in metric.samples:
+            if not sample.name.endswith("_total"):
+                continue
+            entry = caches.setdefault(sample.labels["cache"], {"hits": 0, "misses": 0})
+            entry["hits" if sample.labels["result"] == "hit" else "misses"] += int(sample.value)
+    for entry in caches.values():
+        lookups = entry["hits"] + entry["misses"]
+        entry["hit_rate"] = round(entry["hits"] / lookups, 4) if lookups else 0.0
+    return caches
+
+
+def executor_stats(executor: Any) -> Optional[Dict[str, Any]]:
+    """Queue depth and thread count of a concurrent.futures.ThreadPoolExecutor"""
+    if executor is None:
+        return None
+    return {
+        "max_workers": executor._max_workers,
+        "threads": len(executor._threads),
+        "queue_depth": executor._work_queue.qsize(),
+    }
+
+
+def threadpool_limiter_stats() -> Optional[Dict[str, Any]]:
+    """The AnyIO threadpool that runs the blocking /chat pipeline (call from the event loop)"""
+    try:
+        from anyio.to_thread import current_default_thread_limiter
+        limiter = current_default_thread_limiter()
+        return {
+            "total_tokens": limiter.total_tokens,
+            "borrowed_tokens": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        }
+    except Exception:
+        return None
+
+
+def _socket_inodes() -> set:
+    inodes = set()
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            target = os.readlink(f"/proc/self/fd/{fd}")
+        except OSError:
+            continue
+        if target.startswith("socket:["):
+            inodes.add(target[8:-1])
+    return inodes
+
+
+def _decode_address(address: str) -> Tuple[str, int]:
+    host, port = address.split(":")
+    if len(host) == 8:
+        ip = ".".join(str(int(host[i:i + 2], 16)) for i in (6, 4, 2, 0))
+    else:
+        # ipv6: four little-endian 32-bit words
+        words = [host[i:i + 8] for i in range(0, 32, 8)]
+        raw = "".join("".join(w[j:j + 2] for j in (6, 4, 2, 0)) for w in words)
+        ip = ":".join(raw[i:i + 4] for i in range(0, 32, 4))
+    return ip, int(port, 16)
+
+
+def open_connections() -> Optional[Dict[str, Any]]:
+    """
+    TCP connections owned by this process, from /proc (Linux only).
+
+    Returns:
+        Dict with inbound / outbound established counts and the outbound
+        (upstream) connections grouped by remote address, or None off Linux
+    """
+    try:
+        inodes = _socket_inodes()
+        rows: List[Tuple[str, int, str, int, str]] = []
+        for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+            if not os.path.exists(table):
+                continue
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[9] in inodes:
+                        local_ip, local_port = _decode_address(fields[1])
+                        remote_ip, remote_port = _decode_address(fields[2])
+                        rows.append((local_ip, local_port, remote_ip, remote_port, fields[3]))
+    except OSError:
+        return None
+
+    # 0A = LISTEN, 01 = ESTABLISHED
+    listening = {local_port for _, local_port, _, _, state in rows if state == "0A"}
+    inbound = 0
+    upstream: Dict[str, int] = {}
+    for _, local_port, remote_ip, remote_port, state in rows:
+        if state != "01":
+            continue
+        if local_port in listening:
+            inbound += 1
+        else:
+            remote = f"{remote_ip}:{remote_port}"
+            upstream[remote] = upstream.get(remote, 0) + 1
+    return {"inbound": inbound, "outbound": sum(upstream.values()), "upstream": upstream}
+
+
+def process_stats() -> Dict[str, Any]:
+    """Resident memory, thread count and GC generation counts"""
+    stats: Dict[str, Any] = {
+        "threads": threading.active_count(),
+        "gc_counts": list(gc.get_count()),
+    }
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key = "rss_mb" if line.startswith("VmRSS") else "peak_rss_mb"
+                    stats[key] = round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return stats
+
+
+def collect_runtime_stats(agent_manager: Any = None, intent_services: Optional[List[Any]] = None, lag_monitor: Any = None) -> Dict[str, Any]:
+    """
+    One snapshot of the runtime internals.
+
+    Args:
+        agent_manager: The app's AgentManager (fast answers, intent batcher)
+        intent_services: Other IntentService instances whose batchers to report
+        lag_monitor: EventLoopLagMonitor sampling the serving loop
+
+    Returns:
+        Dict with "maps", "caches", "executors", "batchers", "event_loop_lag",
+        "connections" and "process" sections
+    """
+    from services.embedding_service import get_all_embedding_stats
+    from services.external_api import deepseek_client
+    from services.retrievers.compatibility_retriever import compatibility_retriever
+    from services.retrievers.installation_retriever import installation_retriever
+
+    # the shared instances only if something already built them: building one here would
+    # load JSON maps and open Chroma on the event loop this endpoint measures
+    compatibility = compatibility_retriever._retriever_instance
+    installation = installation_retriever._retriever_instance
+    maps = map_stats({
+        "parts_to_models": getattr(compatibility, "parts_to_models", None),
+        "model_to_parts": getattr(compatibility, "model_to_parts", None),
+        "installation_manual": getattr(installation, "installation_manual", None),
+        "installation_passages": getattr(installation, "installation_passages", None),
+    })
+
+    caches: Dict[str, Any] = cache_event_stats()
+    usage = deepseek_client.get_usage_stats()
+    caches["llm_prompt_prefix"] = {
+        "hit_tokens": usage["prompt_cache_hit_tokens"],
+        "miss_tokens": usage["prompt_cache_miss_tokens"],
+        "hit_rate": usage["prompt_cache_hit_ratio"],
+    }
+
+    executors: Dict[str, Any] = {
+        "chat_threadpool": threadpool_limiter_stats(),
+        "llm_calls": executor_stats(deepseek_client._hedge_executor),
+    }
+    batchers = [{k: s[k] for k in ("name", "queue_depth", "total_batches", "total_items")} for s in get_all_embedding_stats()]
+
+    services = list(intent_services or [])
+    fast_answers = getattr(agent_manager, "fast_answer_service", None)
+    if agent_manager is not None:
+        services.append(agent_manager.intent_service)
+    if fast_answers is not None:
+        polish = caches.setdefault("fast_answer_polish", {"hits": 0, "misses": 0, "hit_rate": 0.0})
+        polish.update(entries=fast_answers.get_stats()["cached_polishes"], capacity=fast_answers.cache_size)
+        executors["fast_answer_polish"] = executor_stats(fast_answers._executor)
+    for service in services:
+        if getattr(service, "batcher", None) is not None:
+            batchers.append({"name": service.batcher.name, "queue_depth": service.batcher.queue_depth()})
+
+    return {
+        "maps": maps,
+        "caches": caches,
+        "executors": executors,
+        "batchers": batchers,
+        "event_loop_lag": lag_monitor.get_stats() if lag_monitor is not None else None,
+        "connections": open_connections(),
+        "process": process_stats(),
+    }
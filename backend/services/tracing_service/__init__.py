@@ -0,0 +1,20 @@
+"""
+Tracing Service Package
+
+Provides per-request trace spans, OpenTelemetry (OTLP/JSON) export and Server-Timing summaries for the PartSelect Assistant API.
+"""
+
+from .tracing import Span, Trace, start_trace, span, current_trace, set_span_attribute
+from .exporter import SpanExporter, get_exporter, to_otlp_json
+
+__all__ = [
+    "Span",
+    "Trace",
+    "start_trace",
+    "span",
+    "current_trace",
+    "set_span_attribute",
+    "SpanExporter",
+    "get_exporter",
+    "to_otlp_json",
+]
@@ -0,0 +1,134 @@
+"""
+Exporter - Ships finished traces as OpenTelemetry OTLP/JSON
+
+Traces are queued and written by a background thread, so exporting never
+adds latency to the request. "file" appends one OTLP/JSON document per line;
+"otlp" POSTs the same document to a collector's OTLP/HTTP endpoint.
+"""
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+from config import TRACE_EXPORTER, TRACE_EXPORT_FILE, TRACE_OTLP_ENDPOINT, TRACE_SERVICE_NAME
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp_json(trace: Any, service_name: str = TRACE_SERVICE_NAME) -> Dict[str, Any]:
+    """
+    Convert a Trace to an OTLP/JSON ExportTraceServiceRequest.
+
+    Args:
+        trace: The finished Trace
+        service_name: Value of the service.name resource attribute
+
+    Returns:
+        Dict in the OTLP/JSON trace format
+    """
+    spans = []
+    for i, s in enumerate(list(trace.spans)):
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": SPAN_KIND_SERVER if i == 0 else SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [_attribute(k, v) for k, v in s.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": s.error} if s.error else {"code": STATUS_OK},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "partselect.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class SpanExporter:
+    """
+    Background exporter for finished traces.
+    """
+
+    def __init__(self, mode: str = TRACE_EXPORTER, file_path: str = TRACE_EXPORT_FILE, endpoint: str = TRACE_OTLP_ENDPOINT, max_queue: int = 1000):
+        self.mode = mode
+        self.file_path = Path(file_path)
+        self.endpoint = endpoint
+        self.dropped = 0
+        self.exported = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, trace: Any):
+        """Queue a finished trace; dropped (and counted) if the queue is full"""
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Wait for queued traces to be written (used by tests and shutdown)"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self._write(to_otlp_json(item))
+                self.exported += 1
+            except Exception as e:
+                print(f"Warning: trace export failed: {e}")
+
+    def _write(self, payload: Dict[str, Any]):
+        if self.mode == "file":
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, "a") as f:
+                f.write(json.dumps(payload) + "\n")
+        elif self.mode == "otlp":
+            response = requests.post(self.endpoint, json=payload, timeout=5)
+            response.raise_for_status()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """The process-wide exporter, or None when TRACE_EXPORTER is "none" """
+    global _exporter
+    if TRACE_EXPORTER not in ("file", "otlp"):
+        return None
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = SpanExporter()
+    return _exporter
@@ -0,0 +1,180 @@
+"""
+Tracing - Lightweight per-request spans
+
+A trace is started per HTTP request and carried in a contextvar, so spans
+opened anywhere below it (intent classification, retrievers, Chroma queries,
+LLM calls) attach to the right request, including inside threadpool workers.
+
+Only sampled requests (TRACE_SAMPLE_RATE, or for trusted callers a sampled
+W3C `traceparent` or the TRACE_FORCE_HEADER header) record spans. For everything else `span()` is a
+single contextvar read, so tracing costs next to nothing when sampling is off.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import TRACE_SAMPLE_RATE
+from .exporter import get_exporter
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("partselect_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("partselect_span", default=None)
+
+
+class Span:
+    """
+    One timed operation inside a trace.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class Trace:
+    """
+    All spans recorded for one request.
+    """
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self._add(Span(name, self.trace_id, parent_span_id))
+
+    def _add(self, new_span: Span) -> Span:
+        # spans can be added from several threads (hedged LLM calls)
+        with self._lock:
+            self.spans.append(new_span)
+        return new_span
+
+    def server_timing(self, max_entries: int = 20) -> str:
+        """
+        Summarize the spans as a Server-Timing header value, durations
+        summed per span name, e.g. `intent_classification;dur=812.4, total;dur=2210.7`.
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for s in self.spans[1:]:
+                totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+        entries = [f"{_token(name)};dur={ms:.1f}" for name, ms in list(totals.items())[:max_entries]]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+
+def _token(name: str) -> str:
+    # Server-Timing metric names are HTTP tokens
+    return "".join(c if c.isalnum() or c in "_-." else "_" for c in name)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a W3C traceparent header (version-traceid-spanid-flags)"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 0x01)
+    except ValueError:
+        return None
+    return {"trace_id": parts[1], "parent_span_id": parts[2], "sampled": sampled}
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, force: bool = False, sample_rate: Optional[float] = None, exporter: Any = None, trust_parent: bool = True) -> Iterator[Optional[Trace]]:
+    """
+    Start a trace for one request if it is sampled.
+
+    Args:
+        name: Root span name, e.g. "POST /chat"
+        traceparent: Incoming W3C traceparent header; a sampled parent is always traced
+                     when `trust_parent`, and its trace ID is reused either way
+        force: Trace regardless of the sample rate
+        sample_rate: Share of requests to trace (default: TRACE_SAMPLE_RATE)
+        exporter: Where finished traces go (default: the configured exporter)
+        trust_parent: Whether the caller may decide sampling through `traceparent`
+
+    Yields:
+        The Trace, or None if this request isn't sampled
+    """
+    parent = parse_traceparent(traceparent)
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    sampled = force or (trust_parent and parent is not None and parent["sampled"]) or (rate > 0 and random.random() < rate)
+    if not sampled:
+        yield None
+        return
+
+    trace = Trace(name, trace_id=parent["trace_id"] if parent else None, parent_span_id=parent["parent_span_id"] if parent else None)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = repr(e)
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if exporter is None:
+            exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a span under the current request's trace (no-op when not sampled).
+
+    Args:
+        name: Span name, e.g. "compatibility_vector_query"
+        **attributes: Span attributes
+
+    Yields:
+        The Span, or None when the request isn't traced
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    new_span = trace._add(Span(name, trace.trace_id, parent.span_id if parent else None, attributes))
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = repr(e)
+        raise
+    finally:
+        new_span.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def set_span_attribute(key: str, value: Any):
+    """Attach an attribute to the innermost open span, if the request is traced"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[key] = value
@@ -0,0 +1,66 @@
+"""
+Test the benchmark stand-in servers and latency statistics
+"""
+
+import sys
+from pathlib import Path
+
+import requests
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from benchmarks.run_benchmark import percentile
+from benchmarks.stub_servers import LatencyModel, start_stub_server, stub_embedding
+
+
+def test_stub_embeddings_are_deterministic_and_similar():
+    """Same text, same vector; texts sharing words are closer than unrelated ones"""
+    a = stub_embedding("dishwasher drain pump")
+    assert a == stub_embedding("dishwasher drain pump")
+    assert len(a) == 1536
+
+    def cosine(x, y):
+        return sum(i * j for i, j in zip(x, y))
+
+    assert cosine(a, stub_embedding("drain pump for dishwasher")) > cosine(a, stub_embedding("refrigerator ice maker"))
+
+
+def test_stub_server_answers_both_apis():
+    """The stand-in serves DeepSeek chat completions and OpenAI embeddings"""
+    print("🧪 Testing stub DeepSeek/OpenAI server...")
+
+    server = start_stub_server(llm_latency="fixed:1", embed_latency="fixed:1", decode_tps=100000)
+    base = f"http://127.0.0.1:{server.server_port}/v1"
+    try:
+        intent = requests.post(f"{base}/chat/completions", json={"messages": [
+            {"role": "system", "content": "You are an intent classifier for an appliance parts assistant"},
+            {"role": "user", "content": "Is PS11752778 compatible with WDT780SAEM1?"},
+        ], "max_tokens": 10}).json()
+        assert intent["choices"][0]["message"]["content"] == "compatibility"
+
+        embeddings = requests.post(f"{base}/embeddings", json={"input": ["a", "b"], "model": "text-embedding-3-small"}).json()
+        assert [d["index"] for d in embeddings["data"]] == [0, 1]
+        assert server.state.counts == {"chat": 1, "embeddings": 1, "embedded_texts": 2}
+    finally:
+        server.shutdown()
+
+
+def test_latency_models_and_percentiles():
+    """Seeded latency draws repeat; nearest-rank percentiles"""
+    first, again = LatencyModel("lognormal:800,0.5", seed=3), LatencyModel("lognormal:800,0.5", seed=3)
+    assert [first.sample_ms() for _ in range(5)] == [again.sample_ms() for _ in range(5)]
+    assert LatencyModel("fixed:25").sample_ms() == 25
+
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) is None
+
+
+if __name__ == "__main__":
+    test_stub_embeddings_are_deterministic_and_similar()
+    test_stub_server_answers_both_apis()
+    test_latency_models_and_percentiles()
+    print("\n✅ Benchmark stub tests complete!")
@@ -0,0 +1,98 @@
+"""
+Test the token-budgeted context builder with synthetic retriever output
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.context_service import ContextService, count_tokens
+
+
+def _compatibility_data(model_count: int):
+    models = [f"WDT{i:03d}SAEM1" for i in range(model_count)]
+    return {
+        "query": "Is PS10065979 compatible with WDT001SAEM1?",
+        "extracted_identifiers": {"part_numbers": ["PS10065979"], "model_numbers": ["WDT001SAEM1"]},
+        "direct_lookup": {
+            "direct_matches": [
+                {"type": "part_to_models", "part_number": "PS10065979", "compatible_models": models, "count": len(models)},
+                {"type": "cross_check", "cross_check_results": [
+                    {"part_number": "PS10065979", "model_number": "WDT001SAEM1", "is_compatible": True, "confidence": "VERY_HIGH"}
+                ]},
+            ],
+            "confidence": "HIGH",
+        },
+        "semantic_search": {
+            "documents": [["Compatible models: ...", "Another rack adjuster"]],
+            "metadatas": [[{"part_number": "PS10065979", "title": "Upper Rack Adjuster"}, {"part_number": "PS11756150", "title": "Rack Adjuster"}]],
+            "ids": [["a", "b"]],
+            "distances": [[0.1, 0.2]],
+        },
+    }
+
+
+def test_budget_is_respected_for_huge_model_lists():
+    """Hundreds of compatible models must not blow past the budget"""
+    print("🧪 Testing budget with a 600-model part...")
+
+    service = ContextService(token_budget=300, max_list_items=1000)
+    context = service.build_context("compatibility", _compatibility_data(600))
+
+    print(f"📊 Tokens: {context['tokens']} / {context['budget']} ({context['tokenizer']})")
+    assert context["tokens"] <= context["budget"]
+    assert context["truncated"]
+    assert "more)" in context["text"]
+
+    # cross-check is the conclusive answer, so it is packed before the model list
+    text = context["text"]
+    assert text.index("CROSS-CHECK") < text.index("Models:")
+    # the supplement for the part direct lookup already covers is skipped
+    assert "PS11756150" in text
+    assert "Part PS10065979: Upper Rack Adjuster" not in text
+
+
+def test_installation_text_included_once():
+    """The manual text used to be pasted twice (preview + full)"""
+    print("🧪 Testing installation text de-duplication...")
+
+    instructions = "Unplug the refrigerator. Remove the door bin. Snap the new cam into place. " * 3
+    data = {
+        "extracted_identifiers": {"part_numbers": ["PS11752991"]},
+        "direct_lookup": {
+            "direct_matches": [{
+                "type": "installation_manual", "part_number": "PS11752991", "title": "Door Cam",
+                "installation_text": instructions, "url": "https://example.com", "confidence": "VERY_HIGH",
+            }],
+            "confidence": "HIGH",
+        },
+        "semantic_search": {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]},
+    }
+
+    context = ContextService(token_budget=1000).build_context("installation", data)
+    assert context["text"].count("Unplug the refrigerator") == 3
+    assert "Full Instructions" not in context["text"]
+
+
+def test_documents_drop_redundant_fields():
+    """Parts documents shouldn't repeat title, brand and part id already in the header"""
+    print("🧪 Testing parts document formatting...")
+
+    data = {
+        "documents": [["Door Bin — Holds jars. | brand: Whirlpool | part_id: PS1234"]],
+        "metadatas": [[{"part_id": "PS1234", "brand": "Whirlpool", "title": "Door Bin", "price": "12.50"}]],
+    }
+    context = ContextService().build_context("qna", data)
+    print(context["text"])
+    assert "Description: Holds jars.\n" in context["text"]
+    assert context["tokens"] == count_tokens(context["text"])
+
+
+if __name__ == "__main__":
+    test_budget_is_respected_for_huge_model_lists()
+    test_installation_text_included_once()
+    test_documents_drop_redundant_fields()
+    print("\n✅ Context service tests complete!")
@@ -0,0 +1,120 @@
+"""
+Test the micro-batching embedding dispatcher with a fake OpenAI client
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.batching import MicroBatcher
+from services.embedding_service import EmbeddingDispatcher
+
+
+class FakeEmbeddingsClient:
+    """Stands in for openai.OpenAI - records every batched call"""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input):
+        self.calls.append(list(input))
+        # return out of order to make sure the dispatcher re-sorts by index
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), float(i)]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def test_concurrent_requests_share_one_call():
+    """Concurrent single-text requests should be coalesced into one API call"""
+    print("🧪 Testing embedding coalescing...")
+
+    fake = FakeEmbeddingsClient()
+    dispatcher = EmbeddingDispatcher(model="test-model", max_batch_size=16, max_wait_ms=50, client=fake)
+
+    texts = [f"query {'x' * i}" for i in range(8)]
+    results = {}
+    barrier = threading.Barrier(len(texts))
+
+    def worker(text):
+        barrier.wait()
+        results[text] = dispatcher.embed(text)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"📊 API calls made: {len(fake.calls)} for {len(texts)} requests")
+    assert len(fake.calls) < len(texts)
+    for text in texts:
+        assert results[text][0] == float(len(text))
+
+    stats = dispatcher.get_stats()
+    print(f"📊 Stats: {stats}")
+    assert stats["total_items"] == len(texts)
+    assert stats["batch_size"]["max"] > 1
+
+
+def test_batch_size_cap_and_errors():
+    """Batches never exceed max_batch_size, and handler errors reach every caller"""
+    print("🧪 Testing batch size cap and error fan-out...")
+
+    seen_sizes = []
+
+    def handler(items):
+        seen_sizes.append(len(items))
+        if "boom" in items:
+            raise RuntimeError("upstream failed")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=3, max_wait_ms=20, name="test-batcher")
+    futures = batcher.submit_many(["a", "b", "c", "d", "e"])
+    assert [f.result(timeout=2) for f in futures] == ["A", "B", "C", "D", "E"]
+    assert max(seen_sizes) <= 3
+
+    failing = batcher.submit("boom")
+    try:
+        failing.result(timeout=2)
+        assert False, "expected the handler error to propagate"
+    except RuntimeError as e:
+        print(f"✅ Error propagated: {e}")
+
+    assert batcher.get_stats()["total_errors"] == 1
+    batcher.shutdown()
+
+
+def test_slow_batch_does_not_stall_the_queue():
+    """A slow handler call leaves other slots free for the batches behind it"""
+    print("🧪 Testing concurrent batches in flight...")
+
+    release = threading.Event()
+
+    def handler(items):
+        if "slow" in items:
+            release.wait(timeout=5)
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=1, max_wait_ms=0, name="test-inflight", max_in_flight=2)
+    slow = batcher.submit("slow")
+    time.sleep(0.05)
+    assert batcher.submit("fast").result(timeout=1) == "FAST"
+    assert not slow.done()
+    assert batcher.get_stats()["in_flight"] == 1
+
+    release.set()
+    assert slow.result(timeout=2) == "SLOW"
+    batcher.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_one_call()
+    test_batch_size_cap_and_errors()
+    test_slow_batch_does_not_stall_the_queue()
+    print("\n✅ Embedding batching tests complete!")
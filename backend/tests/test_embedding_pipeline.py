@@ -0,0 +1,148 @@
+"""
+Test the concurrent, rate-limited embedding pipeline used by the ingest scripts
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from embedding_pipeline import MAX_TOKENS_PER_INPUT, EmbeddingPipeline, TokenBucket, count_tokens, retry_after_seconds, token_batches
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+class FakeEmbeddings:
+    def __init__(self, latency=0.05, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def create(self, model, input):
+        with self.lock:
+            self.calls.append((time.monotonic(), list(input)))
+            if len(self.calls) <= self.fail_first:
+                raise FakeRateLimitError(0.2)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        # reversed on purpose: the pipeline must re-order by index
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _items(n, words=10):
+    return [{"id": f"doc-{i}", "text": " ".join(["word"] * words) + f" {i}"} for i in range(n)]
+
+
+def test_batches_are_cut_by_tokens():
+    """Batches respect the token budget and the input cap; oversized items go alone"""
+    print("🧪 Testing token-sized batches...")
+
+    items = [{"text": "x", "tokens": t} for t in (40, 40, 40, 500, 10, 10, 10, 10)]
+    batches = [[i["tokens"] for i in b] for b in token_batches(items, max_tokens=100, max_items=3)]
+    assert batches == [[40, 40], [40], [500], [10, 10, 10], [10]]
+
+
+def test_concurrent_embedding_writes_everything():
+    """Several batches are in flight at once and every vector reaches the writer"""
+    print("🧪 Testing concurrent embedding...")
+
+    embeddings = FakeEmbeddings(latency=0.05)
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=embeddings), concurrency=4, batch_tokens=40, max_batch_size=64)
+    written = {}
+
+    def write(batch, vectors):
+        for item, vector in zip(batch, vectors):
+            written[item["id"]] = vector[0]
+
+    started = time.perf_counter()
+    stats = pipeline.run(_items(40), write)
+    elapsed = time.perf_counter() - started
+
+    print(f"⏱️ {stats['batches']} batches in {elapsed * 1000:.0f}ms, max {embeddings.max_in_flight} in flight")
+    assert stats["items"] == 40 and len(written) == 40
+    assert written["doc-7"] == float(len(_items(40)[7]["text"]))
+    assert embeddings.max_in_flight > 1
+    assert elapsed < stats["batches"] * 0.05
+
+
+def test_retry_after_pauses_all_workers():
+    """A 429 pauses the shared buckets for its Retry-After, then the batch is retried"""
+    print("🧪 Testing Retry-After handling...")
+
+    embeddings = FakeEmbeddings(latency=0.0, fail_first=1)
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=embeddings), concurrency=2, batch_tokens=10_000)
+    stats = pipeline.run(_items(5), lambda batch, vectors: None)
+
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1 and stats["items"] == 5
+    first_call, retry = embeddings.calls[0][0], embeddings.calls[1][0]
+    assert retry - first_call >= 0.19
+    assert retry_after_seconds(FakeRateLimitError(3)) == 3.0
+
+
+def test_token_bucket_rate():
+    """The bucket hands out no more than its rate once the burst is spent"""
+    print("🧪 Testing token bucket...")
+
+    bucket = TokenBucket(rate_per_min=600, capacity=5)  # 10/s
+    started = time.perf_counter()
+    for _ in range(10):
+        bucket.acquire(1)
+    elapsed = time.perf_counter() - started
+    assert 0.4 <= elapsed < 1.0
+
+
+def test_oversized_input_is_truncated():
+    """An input over the per-input limit is embedded from its head; the full text is still written"""
+    print("🧪 Testing oversized inputs...")
+
+    class StrictEmbeddings(FakeEmbeddings):
+        def create(self, model, input):
+            if any(count_tokens(t) > MAX_TOKENS_PER_INPUT for t in input):
+                raise ValueError("400: input exceeds the token limit")
+            return super().create(model, input)
+
+    embeddings = StrictEmbeddings(latency=0.0)
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=embeddings), concurrency=2, batch_tokens=MAX_TOKENS_PER_INPUT * 2)
+    big = {"id": "big", "text": " ".join(f"word{i}" for i in range(MAX_TOKENS_PER_INPUT * 2))}
+    written = {}
+
+    def write(batch, vectors):
+        for item in batch:
+            written[item["id"]] = item["text"]
+
+    stats = pipeline.run([big] + _items(3), write)
+
+    sent = [t for _, inputs in embeddings.calls for t in inputs]
+    assert stats["truncated"] == 1
+    assert stats["tokens"] <= MAX_TOKENS_PER_INPUT + 3 * 20
+    assert all(count_tokens(t) <= MAX_TOKENS_PER_INPUT for t in sent)
+    assert written["big"] == big["text"]
+    assert len(written) == 4
+
+
+if __name__ == "__main__":
+    test_batches_are_cut_by_tokens()
+    test_concurrent_embedding_writes_everything()
+    test_retry_after_pauses_all_workers()
+    test_token_bucket_rate()
+    test_oversized_input_is_truncated()
+    print("\n✅ Embedding pipeline tests complete!")
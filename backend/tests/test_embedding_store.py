@@ -0,0 +1,99 @@
+"""
+Test the content-addressed embedding store used by the ingest scripts
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import chromadb
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from embedding_pipeline import EmbeddingPipeline
+from embedding_store import EmbeddingStore
+from incremental import sync_collection
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.texts = []
+
+    def create(self, model, input):
+        self.texts.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t)), 0.5, -1.0]) for i, t in enumerate(input)])
+
+
+def test_store_round_trip_and_torn_tail():
+    """Vectors survive a reopen; a torn last record is dropped, not misread"""
+    print("🧪 Testing embedding store persistence...")
+
+    directory = tempfile.mkdtemp()
+    try:
+        store = EmbeddingStore(directory, "text-embedding-3-small")
+        assert store.get("door gasket") is None
+        assert store.put_many(["door gasket", "ice maker"], [[1.0, 2.0], [3.0, 4.0]]) == 2
+        assert store.put_many(["door gasket"], [[9.0, 9.0]]) == 0  # append-only, first write wins
+        store.close()
+
+        with open(store.path, "ab") as f:
+            f.write(b"\x01" * 10)
+
+        reopened = EmbeddingStore(directory, "text-embedding-3-small")
+        assert len(reopened) == 2 and reopened.dim == 2
+        assert reopened.get("door gasket") == [1.0, 2.0]
+        assert reopened.get("ice maker") == [3.0, 4.0]
+        assert reopened.put_many(["water filter"], [[5.0, 6.0]]) == 1
+        assert reopened.get("water filter") == [5.0, 6.0]
+
+        # another model never sees these vectors
+        other = EmbeddingStore(directory, "text-embedding-3-large")
+        assert other.get("door gasket") is None
+        reopened.close()
+        other.close()
+        print("✅ Round trip, dedupe and torn-record recovery work")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_rebuild_and_second_collection_use_cache():
+    """A rebuilt or different collection with the same texts makes no API calls"""
+    print("🧪 Testing cache reuse across collections...")
+
+    directory = tempfile.mkdtemp()
+    try:
+        embeddings = FakeEmbeddings()
+        client = SimpleNamespace(embeddings=embeddings)
+        items = [{"id": f"PS{i}", "text": f"part {i} description", "metadata": {"n": i}} for i in range(30)]
+        chroma = chromadb.EphemeralClient()
+
+        pipeline = EmbeddingPipeline(client, concurrency=2, store=EmbeddingStore(directory, "text-embedding-3-small"))
+        sync_collection(chroma.get_or_create_collection("test_store_a"), [dict(i) for i in items], pipeline)
+        assert len(embeddings.texts) == 30
+        pipeline.close()
+
+        # a fresh process building another collection from overlapping texts
+        pipeline = EmbeddingPipeline(client, concurrency=2, store=EmbeddingStore(directory, "text-embedding-3-small"))
+        extra = [{"id": "PS99", "text": "a brand new text", "metadata": {}}]
+        collection = chroma.get_or_create_collection("test_store_b")
+        result = sync_collection(collection, [dict(i) for i in items] + extra, pipeline)
+        pipeline.close()
+
+        assert embeddings.texts[30:] == ["a brand new text"]
+        assert result["pipeline"]["cached"] == 30 and result["embedded"] == 31
+        stored = collection.get(ids=["PS3"], include=["embeddings"])["embeddings"][0]
+        assert list(stored) == [float(len("part 3 description")), 0.5, -1.0]
+        print("✅ Only the unseen text was sent to the API")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_store_round_trip_and_torn_tail()
+    test_rebuild_and_second_collection_use_cache()
+    print("\n✅ Embedding store tests complete!")
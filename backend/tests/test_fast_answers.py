@@ -0,0 +1,127 @@
+"""
+Test templated fast answers for conclusive direct lookups
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.fast_answer_service import FastAnswerService
+
+
+def _cross_check(*checks):
+    return {
+        "direct_lookup": {
+            "direct_matches": [{
+                "type": "cross_check",
+                "cross_check_results": [
+                    {"part_number": p, "model_number": m, "is_compatible": ok, "confidence": "VERY_HIGH"}
+                    for p, m, ok in checks
+                ]
+            }]
+        }
+    }
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def chat_with_system(self, system_prompt, user_prompt, model="deepseek-chat", max_tokens=1000, temperature=0.7, timeout=None):
+        self.calls += 1
+        return "Good news! " + user_prompt
+
+
+def test_cross_check_is_templated():
+    """A part/model cross-check is answered without the LLM"""
+    print("🧪 Testing cross-check fast answer...")
+
+    service = FastAnswerService(intents=["compatibility"], polish=False)
+
+    yes = service.answer("compatibility", _cross_check(("PS11752778", "WDT780SAEM1", True)))
+    print(f"💬 {yes['response']}")
+    assert yes["answer_mode"] == "template" and yes["answer_source"] == "direct_lookup"
+    assert yes["response"].startswith("Yes, part PS11752778 is compatible with model WDT780SAEM1")
+
+    mixed = service.answer("compatibility", _cross_check(("PS1", "M1", True), ("PS1", "M2", False)))
+    assert "- No, part PS1 is not listed as compatible with model M2." in mixed["response"]
+
+
+def test_installation_manual_is_templated():
+    """An exact installation manual entry is answered without the LLM"""
+    service = FastAnswerService(intents=["installation"], polish=False)
+    data = {"direct_lookup": {"direct_matches": [{
+        "type": "installation_manual",
+        "part_number": "PS11752778",
+        "title": "Upper Rack Adjuster Kit",
+        "installation_text": "Snap into place.",
+        "url": "https://www.partselect.com/PS11752778.htm",
+    }]}}
+
+    answer = service.answer("installation", data)
+    assert "Snap into place." in answer["response"]
+    assert "https://www.partselect.com/PS11752778.htm" in answer["response"]
+
+
+def test_installation_passages_replace_whole_manual():
+    """When the retriever selected passages, only those steps are answered, plus the URL"""
+    service = FastAnswerService(intents=["installation"], polish=False)
+    data = {"direct_lookup": {"direct_matches": [{
+        "type": "installation_manual",
+        "part_number": "PS11752778",
+        "title": "Upper Rack Adjuster Kit",
+        "installation_text": "Unplug the dishwasher. Remove the rack. Snap the adjuster into place.",
+        "url": "https://www.partselect.com/PS11752778.htm",
+        "passages": [
+            {"step": 0, "kind": "safety", "text": "Unplug the dishwasher."},
+            {"step": 2, "kind": "step", "text": "Snap the adjuster into place."},
+        ],
+    }]}}
+
+    response = service.answer("installation", data)["response"]
+    assert "- Unplug the dishwasher.\n- Snap the adjuster into place." in response
+    assert "Remove the rack." not in response
+    assert "https://www.partselect.com/PS11752778.htm" in response
+
+
+def test_inconclusive_or_disabled_falls_through():
+    """Non-conclusive lookups and disabled intents go to the LLM"""
+    service = FastAnswerService(intents=["installation"], polish=False)
+    assert service.answer("compatibility", _cross_check(("PS1", "M1", True))) is None
+
+    service = FastAnswerService(intents=["compatibility"], polish=False)
+    assert service.answer("compatibility", {"direct_lookup": {"direct_matches": []}}) is None
+    assert service.answer("qna", {"documents": [[]]}) is None
+
+
+def test_background_polish_is_cached():
+    """The first answer is the template; once polished, the cached rewrite is served"""
+    print("🧪 Testing background polish cache...")
+
+    llm = FakeLLM()
+    service = FastAnswerService(intents=["compatibility"], polish=True, llm_client=llm)
+    data = _cross_check(("PS1", "M1", True))
+
+    assert service.answer("compatibility", data)["answer_mode"] == "template"
+    for _ in range(100):
+        if service.get_stats()["cached_polishes"]:
+            break
+        time.sleep(0.01)
+
+    polished = service.answer("compatibility", data)
+    assert polished["answer_mode"] == "polished"
+    assert polished["response"].startswith("Good news!")
+    assert llm.calls == 1
+
+
+if __name__ == "__main__":
+    test_cross_check_is_templated()
+    test_installation_manual_is_templated()
+    test_installation_passages_replace_whole_manual()
+    test_inconclusive_or_disabled_falls_through()
+    test_background_polish_is_cached()
+    print("\n✅ Fast answer tests complete!")
@@ -0,0 +1,116 @@
+"""
+Test cached liveness / readiness reporting from the background health prober
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.health_service import HealthCheck, HealthProber, HealthService
+from services.health_service import health_prober
+
+
+def test_readiness_reflects_component_status():
+    """A critical component that is down makes the worker not ready; degraded ones don't"""
+    print("🧪 Testing readiness statuses...")
+
+    state = {"store": "ok", "llm": "ok"}
+    prober = HealthProber([
+        HealthCheck("store", lambda: {"status": state["store"], "count": 10}, 60),
+        HealthCheck("llm", lambda: {"status": state["llm"], "reason": "unreachable"}, 60),
+    ])
+
+    snapshot = prober.snapshot()
+    assert snapshot["status"] == "not_ready" and "prober:stale" in snapshot["degraded"]
+
+    prober.run_once()
+    snapshot = prober.snapshot()
+    assert snapshot["status"] == "ready" and snapshot["components"]["store"]["count"] == 10
+
+    state["llm"] = "degraded"
+    prober.run_once(force=True)
+    snapshot = prober.snapshot()
+    assert snapshot["ready"] and snapshot["status"] == "degraded"
+    assert snapshot["degraded"] == ["llm:unreachable"]
+
+    state["store"] = "down"
+    prober.run_once(force=True)
+    assert prober.snapshot()["status"] == "not_ready"
+
+
+def test_failing_check_counts_as_down():
+    """An exception in a check is recorded, not raised"""
+    print("🧪 Testing failing checks...")
+
+    def broken():
+        raise RuntimeError("store failed to open")
+
+    prober = HealthProber([HealthCheck("store", broken, 60)])
+    prober.run_once()
+    component = prober.snapshot()["components"]["store"]
+    assert component["status"] == "down" and "store failed" in component["error"]
+
+
+def test_checks_run_on_their_own_interval():
+    """Snapshots never run checks; slow upstream checks aren't re-run every cycle"""
+    print("🧪 Testing probe intervals...")
+
+    calls = {"fast": 0, "slow": 0}
+
+    def counted(name):
+        def fn():
+            calls[name] += 1
+            return {"status": "ok"}
+        return fn
+
+    prober = HealthProber([HealthCheck("fast", counted("fast"), 0.0), HealthCheck("slow", counted("slow"), 60)])
+    prober.run_once()
+    prober.run_once()
+    for _ in range(100):
+        prober.snapshot()
+    assert calls == {"fast": 2, "slow": 1}
+
+    started = time.perf_counter()
+    HealthService(time.time(), prober=prober).get_readiness_status()
+    assert time.perf_counter() - started < 0.01
+
+
+def test_upstream_without_key_is_down(monkeypatch):
+    """A missing API key is down without making any request"""
+    print("🧪 Testing upstream probe without a key...")
+
+    def fail_get(*args, **kwargs):
+        raise AssertionError("no request expected")
+
+    monkeypatch.setattr(health_prober.requests, "get", fail_get)
+    result = health_prober.probe_upstream("llm:test-health", "http://llm.test/v1", None)
+    assert result["status"] == "down" and result["reason"] == "api_key_missing"
+
+
+def test_upstream_rejected_key_and_unreachable(monkeypatch):
+    """401 from GET /models is down; a connection error is only degraded"""
+    print("🧪 Testing upstream reachability probe...")
+
+    class FakeResponse:
+        status_code = 401
+
+    monkeypatch.setattr(health_prober.requests, "get", lambda url, headers, timeout: FakeResponse())
+    assert health_prober.probe_upstream("llm:test-health", "http://llm.test/v1", "k")["reason"] == "api_key_rejected"
+
+    def unreachable(url, headers, timeout):
+        raise health_prober.requests.ConnectionError("refused")
+
+    monkeypatch.setattr(health_prober.requests, "get", unreachable)
+    result = health_prober.probe_upstream("llm:test-health", "http://llm.test/v1", "k")
+    assert result["status"] == "degraded" and result["reachable"] is False
+
+
+if __name__ == "__main__":
+    test_readiness_reflects_component_status()
+    test_failing_check_counts_as_down()
+    test_checks_run_on_their_own_interval()
+    print("\n✅ Health tests complete! (run with pytest for the upstream probe tests)")
@@ -0,0 +1,69 @@
+"""
+Test the brute-force ground truth and Pareto marking used by the HNSW sweep
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from benchmarks.hnsw_sweep import brute_force, estimate_index_mb, make_queries, mark_pareto
+
+
+def test_brute_force_matches_sorted_distances():
+    """Exact neighbours come back nearest-first for l2 and cosine"""
+    print("🧪 Testing brute-force ground truth...")
+
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    queries = rng.standard_normal((5, 16)).astype(np.float32)
+
+    l2 = brute_force(vectors, queries, 4, "l2")
+    for q, row in zip(queries, l2):
+        expected = np.argsort(((vectors - q) ** 2).sum(1))[:4]
+        assert list(row) == list(expected)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    cosine = brute_force(vectors, queries, 4, "cosine")
+    for q, row in zip(queries, cosine):
+        expected = np.argsort(-(unit @ (q / np.linalg.norm(q))))[:4]
+        assert list(row) == list(expected)
+
+    # k larger than the collection returns every row
+    assert brute_force(vectors[:3], queries, 10, "l2").shape == (5, 3)
+
+
+def test_noisy_queries_stay_near_their_source():
+    """Low-noise queries have their source vector as nearest neighbour"""
+    print("🧪 Testing query sampling...")
+
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((100, 32)).astype(np.float32)
+    queries, rows = make_queries(vectors, 20, 0.05, rng)
+    assert queries.shape == (20, 32)
+    assert list(brute_force(vectors, queries, 1, "l2")[:, 0]) == list(rows)
+
+
+def test_pareto_and_memory_estimate():
+    """Dominated configurations are not on the front; memory grows with M"""
+    print("🧪 Testing Pareto marking...")
+
+    results = [
+        {"recall@5": 0.90, "latency_p95_ms": 2.0},
+        {"recall@5": 0.95, "latency_p95_ms": 3.0},
+        {"recall@5": 0.90, "latency_p95_ms": 4.0},
+    ]
+    mark_pareto(results, "recall@5")
+    assert [r["pareto"] for r in results] == [True, True, False]
+    assert estimate_index_mb(10000, 1536, 32) > estimate_index_mb(10000, 1536, 8)
+
+
+if __name__ == "__main__":
+    test_brute_force_matches_sorted_distances()
+    test_noisy_queries_stay_near_their_source()
+    test_pareto_and_memory_estimate()
+    print("\n✅ HNSW sweep tests complete!")
@@ -0,0 +1,187 @@
+"""
+Test the raw HTML archive and offline re-extraction against it
+"""
+
+import asyncio
+import gzip
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend and the scrape scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "scrape"))
+
+from html_archive import HtmlArchive
+from scrape_engine import OfflineEngine, ScrapeEngine, commit_output, fresh_output
+
+PAGE = "<html><body><h1>Door Cam</h1><p>PS11752991</p></body></html>"
+
+
+class FakeResponse:
+    status = 200
+
+    async def all_headers(self):
+        return {}
+
+
+class FakePage:
+    """Serves `site[url]` online; set_content() loads archived HTML offline"""
+
+    def __init__(self, site):
+        self.site = site
+        self.html = ""
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        self.html = self.site[url]
+        return FakeResponse()
+
+    async def set_content(self, html, wait_until=None):
+        self.html = html
+
+    async def content(self):
+        return self.html
+
+    async def wait_for_selector(self, selector, timeout=None, state=None):
+        if f"<{selector}>" not in self.html:
+            raise TimeoutError(selector)
+
+
+class FakePool:
+    blocked_requests = 0
+
+    def __init__(self, site, size=2):
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait({"page": FakePage(site), "uses": 0})
+
+    async def acquire(self):
+        return await self.idle.get()
+
+    async def release(self, slot, broken=False):
+        await self.idle.put(slot)
+
+    async def close(self):
+        pass
+
+
+async def title_of(page, url):
+    html = await page.content()
+    return html.split("<h1>", 1)[1].split("</h1>", 1)[0]
+
+
+def test_archive_dedupes_and_survives_reopen():
+    """Identical bodies share one gzip blob; the latest fetch per url wins"""
+    print("🧪 Testing HTML archive...")
+
+    root = tempfile.mkdtemp()
+    try:
+        archive = HtmlArchive(root)
+        first = archive.put("https://x/PS1", PAGE, 200)
+        assert archive.put("https://x/PS1-alias", PAGE, 200) == first
+        assert archive.stats["stored"] == 1 and archive.stats["deduplicated"] == 1
+
+        blobs = list((Path(root) / "objects").rglob("*.html.gz"))
+        assert len(blobs) == 1 and gzip.decompress(blobs[0].read_bytes()).decode() == PAGE
+
+        archive.put("https://x/PS1", PAGE.replace("Door Cam", "Door Cam v2"), 200)
+        with open(archive.index_path, "a") as f:
+            f.write('{"url": "https://x/torn"')  # interrupted crawl
+
+        reopened = HtmlArchive(root)
+        assert len(reopened) == 2 and "https://x/torn" not in reopened
+        assert "Door Cam v2" in reopened.get("https://x/PS1")
+        assert reopened.get("https://x/missing") is None
+        print("✅ Archive dedupes, indexes and reloads")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_crawl_archives_then_offline_reextracts():
+    """Pages archived while crawling are re-extracted later without the site"""
+    print("🧪 Testing offline re-extraction...")
+
+    root = tempfile.mkdtemp()
+    try:
+        site = {f"https://x/PS{i}": PAGE.replace("Door Cam", f"Part {i}") for i in range(6)}
+        site["https://x/broken"] = "<html><body>no title</body></html>"
+
+        async def crawl():
+            engine = ScrapeEngine(max_concurrency=2, max_retries=0, archive=HtmlArchive(root))
+            engine.pool = FakePool(site)
+            engine._started = time.perf_counter()
+            return {url: v async for url, v in engine.map(list(site), title_of, wait_for="h1")}
+
+        online = asyncio.run(crawl())
+        assert online["https://x/PS3"] == "Part 3" and online["https://x/broken"] is None
+
+        async def reextract():
+            engine = OfflineEngine(HtmlArchive(root), processes=1, pages_per_process=2)
+            engine.pool = FakePool({})  # nothing reachable: pages only come from the archive
+            engine._started = time.perf_counter()
+            urls = list(site) + ["https://x/never-crawled"]
+            results = {url: v async for url, v in engine.map(urls, title_of, wait_for="h1")}
+            return engine, results
+
+        engine, offline = asyncio.run(reextract())
+        assert {u: v for u, v in offline.items() if v} == {u: v for u, v in online.items() if v}
+        # the broken page never loaded, so it was never archived either
+        assert engine.stats["pages"] == 6 and engine.stats["missing"] == 2
+        print(f"✅ Offline: {engine.summary()}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_archive_keeps_what_the_handler_revealed():
+    """A tab the handler clicks open is in the archived HTML, so offline extraction finds it"""
+    print("🧪 Testing archive after handler interactions...")
+
+    root = tempfile.mkdtemp()
+    try:
+        site = {"https://x/PS7": PAGE}
+
+        async def open_tab_then_read(page, url):
+            if "<table>" not in page.html:
+                page.html = page.html.replace("</body>", "<table>Not draining</table></body>")  # the click
+            return page.html.split("<table>", 1)[1].split("</table>", 1)[0]
+
+        async def crawl():
+            engine = ScrapeEngine(max_concurrency=1, max_retries=0, archive=HtmlArchive(root))
+            engine.pool = FakePool(site, size=1)
+            engine._started = time.perf_counter()
+            return await engine.run("https://x/PS7", open_tab_then_read, wait_for="h1")
+
+        assert asyncio.run(crawl()) == "Not draining"
+        assert "<table>Not draining</table>" in HtmlArchive(root).get("https://x/PS7")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_offline_output_replaces_instead_of_appending():
+    """--offline writes a fresh CSV that replaces the old one; online runs append"""
+    print("🧪 Testing offline output file...")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        out_csv = root / "parts.csv"
+        out_csv.write_text("part_id\nPS1-stale\n")
+        assert fresh_output(out_csv, offline=False) == out_csv
+
+        written = fresh_output(out_csv, offline=True)
+        assert written != out_csv
+        written.write_text("part_id\nPS1\n")
+        commit_output(written, out_csv)
+        assert out_csv.read_text() == "part_id\nPS1\n" and not written.exists()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_archive_dedupes_and_survives_reopen()
+    test_crawl_archives_then_offline_reextracts()
+    test_archive_keeps_what_the_handler_revealed()
+    test_offline_output_replaces_instead_of_appending()
+    print("\n✅ HTML archive tests complete!")
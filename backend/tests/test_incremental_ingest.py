@@ -0,0 +1,93 @@
+"""
+Test content-hashed incremental ingest against an in-memory Chroma collection
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import chromadb
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from embedding_pipeline import EmbeddingPipeline
+from incremental import HASH_FIELD, content_hash, sync_collection
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.texts = []
+
+    def create(self, model, input):
+        self.texts.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t)), 1.0, 0.5]) for i, t in enumerate(input)])
+
+
+def _catalog():
+    return {
+        "PS1": ("Door latch — fits many models", {"price": 10.5, "availability": "In Stock"}),
+        "PS2": ("Rack adjuster kit", {"price": 52.44, "availability": "In Stock"}),
+        "PS3": ("Water inlet valve", {"price": 30.0, "availability": "In Stock"}),
+    }
+
+
+def _items(catalog):
+    return [{"id": k, "text": text, "metadata": dict(meta)} for k, (text, meta) in catalog.items()]
+
+
+def test_only_changed_documents_are_embedded():
+    """Unchanged docs are skipped, price changes are metadata-only, removed ids are deleted"""
+    print("🧪 Testing incremental ingest...")
+
+    collection = chromadb.EphemeralClient().get_or_create_collection("test_incremental_ingest")
+    embeddings = CountingEmbeddings()
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=embeddings), concurrency=2)
+
+    catalog = _catalog()
+    first = sync_collection(collection, _items(catalog), pipeline)
+    assert first["embedded"] == 3 and len(embeddings.texts) == 3
+
+    # nothing changed: nothing embedded or written
+    again = sync_collection(collection, _items(catalog), pipeline)
+    assert again["unchanged"] == 3 and again["embedded"] == 0 and len(embeddings.texts) == 3
+
+    # price change, text change, removal, addition
+    catalog["PS1"] = (catalog["PS1"][0], {"price": 9.99, "availability": "In Stock"})
+    catalog["PS2"] = ("Rack adjuster kit (upgraded metal design)", catalog["PS2"][1])
+    del catalog["PS3"]
+    catalog["PS4"] = ("Drain pump", {"price": 80.0, "availability": "Backorder"})
+    result = sync_collection(collection, _items(catalog), pipeline)
+
+    print(f"📊 {result['embedded']} embedded, {result['metadata_only']} metadata-only, {result['deleted']} deleted")
+    assert result["embedded"] == 2 and result["metadata_only"] == 1 and result["deleted"] == 1
+    assert sorted(embeddings.texts[3:]) == ["Drain pump", "Rack adjuster kit (upgraded metal design)"]
+
+    stored = collection.get(ids=["PS1", "PS2"], include=["metadatas", "documents", "embeddings"])
+    by_id = dict(zip(stored["ids"], zip(stored["metadatas"], stored["documents"], stored["embeddings"])))
+    assert by_id["PS1"][0]["price"] == 9.99
+    assert by_id["PS1"][2][0] == float(len("Door latch — fits many models"))  # vector kept
+    assert by_id["PS2"][1] == "Rack adjuster kit (upgraded metal design)"
+    assert by_id["PS2"][0][HASH_FIELD] == content_hash(by_id["PS2"][1], pipeline.model)
+    assert sorted(collection.get()["ids"]) == ["PS1", "PS2", "PS4"]
+
+
+def test_no_prune_keeps_missing_ids_and_model_change_reembeds():
+    """Pruning can be turned off; switching embedding model changes every hash"""
+    print("🧪 Testing prune flag and model hashing...")
+
+    collection = chromadb.EphemeralClient().get_or_create_collection("test_incremental_prune")
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=CountingEmbeddings()))
+    sync_collection(collection, _items(_catalog()), pipeline)
+
+    result = sync_collection(collection, _items(_catalog())[:1], pipeline, prune=False)
+    assert result["deleted"] == 0 and collection.count() == 3
+    assert content_hash("same text", "text-embedding-3-small") != content_hash("same text", "text-embedding-3-large")
+
+
+if __name__ == "__main__":
+    test_only_changed_documents_are_embedded()
+    test_no_prune_keeps_missing_ids_and_model_change_reembeds()
+    print("\n✅ Incremental ingest tests complete!")
@@ -0,0 +1,112 @@
+"""
+Test durable ingest checkpoints and resuming a crashed ingest
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import chromadb
+import pytest
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from checkpoint import IngestCheckpoint
+from embedding_pipeline import EmbeddingPipeline
+from incremental import sync_collection
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+class CrashingEmbeddings:
+    """Fails (without retry) on the `crash_on`-th call"""
+
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.calls = 0
+        self.texts = []
+
+    def create(self, model, input):
+        self.calls += 1
+        if self.calls == self.crash_on:
+            raise BadRequestError("simulated crash")
+        self.texts.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[1.0, float(i)]) for i in range(len(input))])
+
+
+def _items(n=12):
+    return [{"id": f"PS{i}", "text": f"part number {i} " * 8, "metadata": {"price": float(i)}} for i in range(n)]
+
+
+def test_crashed_ingest_resumes_without_reembedding(tmp_path):
+    """Batches committed before a crash are journaled and not paid for again"""
+    print("🧪 Testing resume after a crash...")
+
+    collection = chromadb.EphemeralClient().get_or_create_collection("test_ingest_checkpoint")
+    journal = tmp_path / "ingest.jsonl"
+    source = tmp_path / "parts.csv"
+    source.write_text("part_id\n")
+
+    crashing = CrashingEmbeddings(crash_on=3)
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=crashing), concurrency=1, batch_tokens=50)
+    checkpoint = IngestCheckpoint(str(journal), "test", resume=False)
+    checkpoint.begin_source(collection.name, source)
+    with pytest.raises(BadRequestError):
+        sync_collection(collection, _items(), pipeline, checkpoint=checkpoint)
+    checkpoint.close()
+
+    committed_before = len(crashing.texts)
+    batches = [json.loads(line) for line in journal.read_text().splitlines() if '"batch"' in line]
+    # batches already in flight when the failure hit may still have committed
+    assert len(batches) == crashing.calls - 1 and batches[-1]["offset"] == committed_before
+    assert collection.count() == committed_before
+
+    resumed = IngestCheckpoint(str(journal), "test", resume=True)
+    assert resumed.offsets[collection.name] == committed_before
+    assert all(resumed.is_committed(collection.name, i, h) for i, h in batches[0]["ids"].items())
+
+    fresh = CrashingEmbeddings()
+    result = sync_collection(collection, _items(), EmbeddingPipeline(SimpleNamespace(embeddings=fresh), batch_tokens=50), checkpoint=resumed)
+    resumed.close()
+
+    print(f"📊 {committed_before} docs committed before the crash, {result['embedded']} embedded on resume")
+    assert result["embedded"] == 12 - committed_before
+    assert len(fresh.texts) == 12 - committed_before
+    assert collection.count() == 12 and collection.name in IngestCheckpoint(str(journal), "test", resume=True).completed
+
+
+def test_journal_survives_a_torn_write_and_restarts_without_resume(tmp_path):
+    """A half-written last line is ignored; without --resume the journal starts over"""
+    print("🧪 Testing journal replay...")
+
+    journal = tmp_path / "ingest.jsonl"
+    checkpoint = IngestCheckpoint(str(journal), "test")
+    checkpoint.record_batch("parts", [{"id": "PS1", "metadata": {"content_hash": "abc"}}])
+    checkpoint.close()
+    with open(journal, "a") as f:
+        f.write('{"type": "batch", "collection": "parts", "ids": {"PS2"')
+
+    replayed = IngestCheckpoint(str(journal), "test", resume=True)
+    assert replayed.is_committed("parts", "PS1", "abc")
+    assert not replayed.is_committed("parts", "PS1", "changed")
+    assert not replayed.is_committed("parts", "PS2", "abc")
+    replayed.close()
+
+    restarted = IngestCheckpoint(str(journal), "test", resume=False)
+    assert not restarted.is_committed("parts", "PS1", "abc")
+    restarted.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        test_crashed_ingest_resumes_without_reembedding(Path(d))
+    with tempfile.TemporaryDirectory() as d:
+        test_journal_survives_a_torn_write_and_restarts_without_resume(Path(d))
+    print("\n✅ Ingest checkpoint tests complete!")
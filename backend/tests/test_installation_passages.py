@@ -0,0 +1,97 @@
+"""
+Test step-level installation passages: build-time splitting, query-time
+selection, and the prompt context that uses them
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from build_installation_passages import build_passages_map, passage_items, split_passages
+from services.context_service import ContextService
+from services.retrievers.installation_retriever.installation_retriever import get_installation_retriever, select_passages
+
+DOOR_CAM = (
+    "The Door Cam is a black plastic part which helps the door pivot shut. "
+    "To do this repair you will need a 5/16 socket, and a ratchet. "
+    "For safety purposes, do not forget to turn off your appliance before making this repair. "
+    "Remove the two screws and slide the new cam onto the hinge pin. "
+    "Restore your refrigerator with this high-quality replacement part."
+)
+
+
+def test_manuals_split_into_tagged_passages():
+    """Passages carry their kind, the tools they mention and part numbers"""
+    print("🧪 Testing passage splitting...")
+
+    passages = split_passages(DOOR_CAM)
+    kinds = [p["kind"] for p in passages]
+    print(f"   kinds: {kinds}")
+    assert kinds == ["note", "tools", "safety", "step", "note"]
+    assert passages[1]["tools"] == ["5/16 socket", "ratchet"]
+    assert split_passages("Installation is tool-free. Snap it in.")[0]["tools"] == ["tool-free"]
+
+    passages_map = build_passages_map([{
+        "part_number": "PS11752991", "title": "Refrigerator Door Cam WPW10329686",
+        "url": "https://example.com/PS11752991.htm?SourceCode=18", "text": DOOR_CAM,
+    }])
+    entry = passages_map["PS11752991"]
+    assert entry["part_numbers"] == ["PS11752991", "WPW10329686"]
+    assert entry["url"] == "https://example.com/PS11752991.htm"
+
+    items = passage_items(passages_map, {"PS11752991": "refrigerator"})
+    assert [i["id"] for i in items][:2] == ["PS11752991-install-0", "PS11752991-install-1"]
+    assert items[1]["metadata"]["tools"] == "5/16 socket, ratchet"
+    assert items[1]["metadata"]["appliance"] == "refrigerator"
+
+
+def test_selection_follows_the_question():
+    """Tool questions get the tools passage; marketing notes are dropped"""
+    print("🧪 Testing passage selection...")
+
+    passages = split_passages(DOOR_CAM)
+    chosen = select_passages("What tools do I need for PS11752991?", passages, limit=1)
+    assert [p["kind"] for p in chosen] == ["tools"]
+
+    chosen = select_passages("How do I install PS11752991?", passages, limit=3)
+    assert {p["kind"] for p in chosen} == {"tools", "safety", "step"}
+    assert [p["step"] for p in chosen] == sorted(p["step"] for p in chosen)
+
+    only_notes = split_passages("This bin holds jars.")
+    assert select_passages("How do I install it?", only_notes) == only_notes
+
+
+def test_direct_lookup_guarantee_and_smaller_context():
+    """Every PS number in the manual still gets a direct match, with fewer prompt tokens"""
+    print("🧪 Testing direct lookup with passages...")
+
+    retriever = get_installation_retriever()
+    context_service = ContextService()
+    for part_number in retriever.installation_manual:
+        data = retriever.retrieve(f"How do I install {part_number}?", deadline=None)
+        matches = data["direct_lookup"]["direct_matches"]
+        assert [m["part_number"] for m in matches] == [part_number]
+        assert "direct_lookup" in data["strategy_used"]
+        # fast answers and response cards still see the whole manual text
+        assert matches[0]["installation_text"]
+        if not retriever.installation_passages:
+            continue
+
+        assert matches[0]["passages"]
+        with_passages = context_service.build_context("installation", data)
+        matches[0].pop("passages")
+        whole_manual = context_service.build_context("installation", data)
+        print(f"   {part_number}: {whole_manual['tokens']} -> {with_passages['tokens']} context tokens")
+        assert with_passages["tokens"] < whole_manual["tokens"]
+        assert "Relevant steps:" in with_passages["text"]
+
+
+if __name__ == "__main__":
+    test_manuals_split_into_tagged_passages()
+    test_selection_follows_the_question()
+    test_direct_lookup_guarantee_and_smaller_context()
+    print("\n✅ Installation passage tests complete!")
@@ -0,0 +1,127 @@
+"""
+Test batched intent classification with a fake DeepSeek client
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.intent_service.intent_service import IntentService, BATCH_INTENT_SYSTEM_PROMPT
+
+
+class FakeDeepSeekClient:
+    """Answers batch prompts with a JSON array and single prompts with one label"""
+
+    def __init__(self, broken_batch: bool = False, rate_limited: bool = False):
+        self.broken_batch = broken_batch
+        self.rate_limited = rate_limited
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _label(self, query: str) -> str:
+        if "fit" in query or "compatible" in query:
+            return "compatibility"
+        if "install" in query:
+            return "installation"
+        if "not" in query:
+            return "troubleshoot"
+        return "qna"
+
+    def chat_with_system(self, system_prompt, user_prompt, model="deepseek-chat", max_tokens=1000, temperature=0.7, timeout=None):
+        with self.lock:
+            self.calls.append(user_prompt)
+        if self.rate_limited:
+            raise Exception("DeepSeek API error: 429 Too Many Requests")
+        if system_prompt == BATCH_INTENT_SYSTEM_PROMPT:
+            if self.broken_batch:
+                return "Sure! Here are the labels: compatibility, qna"
+            queries = [line.split(". ", 1)[1] for line in user_prompt.splitlines()]
+            return "[" + ", ".join(f'"{self._label(q)}"' for q in queries) + "]"
+        return self._label(user_prompt)
+
+
+QUERIES = [
+    "Will PS10065979 fit my WDT780SAEM1?",
+    "How do I install the door cam?",
+    "My ice maker is not working",
+    "What does the drain pump do?",
+]
+EXPECTED = ["compatibility", "installation", "troubleshoot", "qna"]
+
+
+def test_classify_intents_single_call():
+    """A batch of queries should be labeled with one LLM call"""
+    print("🧪 Testing batch classification...")
+
+    service = IntentService(batching=False)
+    service.deepseek_client = FakeDeepSeekClient()
+
+    intents = service.classify_intents(QUERIES)
+    print(f"🎯 Intents: {intents}")
+    assert intents == EXPECTED
+    assert len(service.deepseek_client.calls) == 1
+
+
+def test_parse_failure_falls_back_to_single_calls():
+    """An unparseable batch response should fall back to one call per query"""
+    print("🧪 Testing parse-failure fallback...")
+
+    service = IntentService(batching=False)
+    service.deepseek_client = FakeDeepSeekClient(broken_batch=True)
+
+    intents = service.classify_intents(QUERIES)
+    assert intents == EXPECTED
+    assert len(service.deepseek_client.calls) == 1 + len(QUERIES)
+
+
+def test_transport_error_fails_whole_batch():
+    """A 429 on the batch call must not turn into one more call per query"""
+    print("🧪 Testing transport-error handling...")
+
+    service = IntentService(batching=False)
+    service.deepseek_client = FakeDeepSeekClient(rate_limited=True)
+
+    try:
+        service.classify_intents(QUERIES)
+        assert False, "expected the batch to fail"
+    except Exception as e:
+        assert "429" in str(e)
+    assert len(service.deepseek_client.calls) == 1
+
+
+def test_batching_mode_coalesces_concurrent_callers():
+    """Concurrent classify_intent calls should share LLM calls when batching is on"""
+    print("🧪 Testing batching mode...")
+
+    service = IntentService(batching=True)
+    service.batcher.max_wait_s = 0.05
+    service.deepseek_client = FakeDeepSeekClient()
+
+    results = {}
+    barrier = threading.Barrier(len(QUERIES))
+
+    def worker(query):
+        barrier.wait()
+        results[query] = service.classify_intent(query)
+
+    threads = [threading.Thread(target=worker, args=(q,)) for q in QUERIES]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"📊 LLM calls: {len(service.deepseek_client.calls)} for {len(QUERIES)} queries")
+    assert [results[q] for q in QUERIES] == EXPECTED
+    assert len(service.deepseek_client.calls) < len(QUERIES)
+
+
+if __name__ == "__main__":
+    test_classify_intents_single_call()
+    test_parse_failure_falls_back_to_single_calls()
+    test_transport_error_fails_whole_batch()
+    test_batching_mode_coalesces_concurrent_callers()
+    print("\n✅ Intent batching tests complete!")
@@ -0,0 +1,148 @@
+"""
+Test hedged DeepSeek requests against fake slow / fast upstreams
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.external_api import deepseek_client
+from services.external_api.deepseek_client import DeepSeekClient, LLMProvider
+from services.external_api.latency_histogram import LatencyHistogram
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}], "usage": {}}
+
+
+def _client_with_secondary():
+    client = DeepSeekClient()
+    client.api_key = "test-key"
+    client.primary = LLMProvider("test-primary", "http://primary.test/v1", "k")
+    client.secondary = LLMProvider("test-secondary", "http://secondary.test/v1", "k", "other-model")
+    return client
+
+
+def test_straggler_is_hedged_to_secondary(monkeypatch):
+    """A primary slower than the hedge delay loses to the secondary"""
+    print("🧪 Testing hedge on a straggling primary...")
+
+    def fake_post(url, headers, json, timeout):
+        if "primary" in url:
+            time.sleep(1.0)
+            return FakeResponse("slow primary")
+        assert json["model"] == "other-model"
+        return FakeResponse("fast secondary")
+
+    monkeypatch.setattr(deepseek_client.requests, "post", fake_post)
+    monkeypatch.setattr(deepseek_client, "LLM_HEDGE_DEFAULT_DELAY_MS", 50)
+
+    started = time.perf_counter()
+    completion = _client_with_secondary().chat_completion("system", "user")
+    elapsed = time.perf_counter() - started
+
+    print(f"⏱️ {elapsed * 1000:.0f}ms via {completion['provider']}")
+    assert completion["content"] == "fast secondary"
+    assert completion["hedged"] and completion["provider"] == "test-secondary"
+    assert elapsed < 0.8
+
+
+def test_fast_primary_is_not_hedged(monkeypatch):
+    """A primary that answers within the hedge delay sends no duplicate"""
+    print("🧪 Testing no hedge on a fast primary...")
+
+    calls = []
+
+    def fake_post(url, headers, json, timeout):
+        calls.append(url)
+        return FakeResponse("primary")
+
+    monkeypatch.setattr(deepseek_client.requests, "post", fake_post)
+    monkeypatch.setattr(deepseek_client, "LLM_HEDGE_DEFAULT_DELAY_MS", 500)
+
+    completion = _client_with_secondary().chat_completion("system", "user")
+    assert completion["content"] == "primary" and not completion["hedged"]
+    assert len(calls) == 1
+
+
+def test_throttled_primary_is_not_resent(monkeypatch):
+    """Without a secondary, a fast 429 from DeepSeek is not hedged back to DeepSeek"""
+    print("🧪 Testing no same-provider hedge after a 429...")
+
+    calls = []
+
+    class ThrottledResponse(FakeResponse):
+        status_code = 429
+
+        def raise_for_status(self):
+            raise deepseek_client.requests.exceptions.HTTPError("429 Too Many Requests", response=self)
+
+    def fake_post(url, headers, json, timeout):
+        calls.append(url)
+        return ThrottledResponse("")
+
+    monkeypatch.setattr(deepseek_client.requests, "post", fake_post)
+    monkeypatch.setattr(deepseek_client, "LLM_HEDGE_DEFAULT_DELAY_MS", 500)
+
+    client = _client_with_secondary()
+    client.primary = LLMProvider("test-throttled", "http://primary.test/v1", "k")
+    client.secondary = None
+    try:
+        client.chat_completion("system", "user")
+        assert False, "expected the 429 to surface"
+    except deepseek_client.LLMRequestError as e:
+        assert e.status == 429
+    assert len(calls) == 1
+
+
+def test_hedge_delay_is_per_call_class():
+    """Short intent calls and long generations keep separate latency histograms"""
+    print("🧪 Testing per-call-class hedge delays...")
+
+    for _ in range(50):
+        deepseek_client.get_latency_histogram("test-classes", "m", max_tokens=10).observe(180)
+        deepseek_client.get_latency_histogram("test-classes", "m", max_tokens=800).observe(6000)
+
+    client = DeepSeekClient()
+    provider = LLMProvider("test-classes", "http://classes.test/v1", "k")
+    short = client._hedge_delay_ms(provider, "m", max_tokens=10)
+    long = client._hedge_delay_ms(provider, "m", max_tokens=800)
+    print(f"⏱️ hedge delay: intent {short}ms, generation {long}ms")
+    assert short < 1000 < long
+
+
+def test_histogram_percentiles():
+    """The hedge threshold comes from the sliding-window histogram"""
+    print("🧪 Testing latency histogram percentiles...")
+
+    histogram = LatencyHistogram(window=100)
+    for _ in range(95):
+        histogram.observe(180)
+    for _ in range(5):
+        histogram.observe(9000)
+
+    assert histogram.percentile(0.50) == 200
+    assert histogram.percentile(0.99) == 10000
+
+    # old samples age out of the window
+    for _ in range(100):
+        histogram.observe(40)
+    assert histogram.percentile(0.99) == 50
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles()
+    print("\n✅ Hedging tests complete! (run with pytest for the upstream tests)")
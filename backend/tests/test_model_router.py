@@ -0,0 +1,92 @@
+"""
+Test the server-side LLM model router
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.model_router import ModelRouter, is_conclusive_lookup
+from services.resilience import Deadline
+from config import REQUEST_DEADLINE_MS, REQUEST_MAX_DEADLINE_MS, LLM_DEFAULT_LATENCY_TARGET_MS
+
+
+def test_conclusive_compatibility_gets_small_budget():
+    """A YES/NO cross-check shouldn't get the full completion budget"""
+    print("🧪 Testing conclusive compatibility routing...")
+
+    retrieved = {"direct_lookup": {"direct_matches": [{"type": "cross_check", "cross_check_results": []}]}}
+    assert is_conclusive_lookup("compatibility", retrieved)
+
+    route = ModelRouter().route("compatibility", "deepseek-chat", context_tokens=200, conclusive=True)
+    print(f"🛤️ Route: {route}")
+    assert route["model"] == "deepseek-chat"
+    assert route["max_tokens"] <= 150
+
+
+def test_reasoning_model_is_policy_gated():
+    """Clients can't send everything to the reasoning model"""
+    print("🧪 Testing reasoning model policy...")
+
+    router = ModelRouter(reasoning_enabled=True, reasoning_intents=["troubleshoot"], reasoning_min_latency_ms=20000)
+
+    # wrong intent
+    route = router.route("compatibility", "deepseek-reasoning", latency_target_ms=60000)
+    assert route["model"] == "deepseek-chat"
+    assert any("denied" in r for r in route["reasons"])
+
+    # tight latency target
+    route = router.route("troubleshoot", "deepseek-reasoning", latency_target_ms=5000)
+    assert route["model"] == "deepseek-chat"
+
+    # allowed: right intent, generous target, evidence not conclusive
+    route = router.route("troubleshoot", "deepseek-reasoning", latency_target_ms=60000)
+    assert route["model"] == "deepseek-reasoner"
+
+    # disabled entirely
+    route = ModelRouter(reasoning_enabled=False).route("troubleshoot", "deepseek-reasoning", latency_target_ms=60000)
+    assert route["model"] == "deepseek-chat"
+
+
+def test_reasoning_reachable_within_request_deadline():
+    """With the default config, a generous latency target still reaches the reasoning model"""
+    print("🧪 Testing reasoning route under the request deadline...")
+
+    # what AgentManager does: the target is capped by the time left on the request
+    deadline = Deadline.for_request(60000)
+    route = ModelRouter().route("troubleshoot", "deepseek-reasoning", latency_target_ms=deadline.cap_ms(60000))
+    print(f"🛤️ Route: {route}")
+    assert route["model"] == "deepseek-reasoner"
+
+    # no target: the default deadline and target stay on the chat model
+    deadline = Deadline.for_request(None)
+    assert deadline.timeout_s * 1000 == REQUEST_DEADLINE_MS
+    route = ModelRouter().route("troubleshoot", "deepseek-reasoning", latency_target_ms=deadline.cap_ms(LLM_DEFAULT_LATENCY_TARGET_MS))
+    assert route["model"] == "deepseek-chat"
+
+    # the client can't stretch its deadline past the server maximum
+    assert Deadline.for_request(10 ** 9).timeout_s * 1000 == REQUEST_MAX_DEADLINE_MS
+
+
+def test_latency_target_caps_max_tokens():
+    """A tight target shrinks the completion budget so the estimate fits"""
+    print("🧪 Testing latency-target capping...")
+
+    router = ModelRouter()
+    relaxed = router.route("installation", "deepseek-chat", context_tokens=1000, latency_target_ms=60000)
+    tight = router.route("installation", "deepseek-chat", context_tokens=1000, latency_target_ms=4000)
+
+    print(f"📏 relaxed={relaxed['max_tokens']} tight={tight['max_tokens']}")
+    assert tight["max_tokens"] < relaxed["max_tokens"]
+    assert tight["estimated_ms"] <= 4000 or tight["max_tokens"] == 64
+
+
+if __name__ == "__main__":
+    test_conclusive_compatibility_gets_small_budget()
+    test_reasoning_model_is_policy_gated()
+    test_reasoning_reachable_within_request_deadline()
+    test_latency_target_caps_max_tokens()
+    print("\n✅ Model router tests complete!")
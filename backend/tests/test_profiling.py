@@ -0,0 +1,95 @@
+"""
+Test the on-demand sampling profiler
+"""
+
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.profiling_service import RequestProfiler, current_profile, sampled_thread
+
+
+def slow_regex_stage(query):
+    deadline = time.perf_counter() + 0.15
+    while time.perf_counter() < deadline:
+        re.findall(r"PS\d+", query * 50)
+    return {"response": "ok", "intent": "compatibility"}
+
+
+def test_profile_is_written_as_folded_stacks(tmp_path):
+    """A profiled call writes folded stacks tagged with intent and request ID"""
+    print("🧪 Testing folded-stack profile output...")
+
+    profiler = RequestProfiler(admin_token="secret", sample_rate=0.0, interval_ms=2, output_dir=str(tmp_path))
+    assert profiler.should_profile("secret")
+    assert not profiler.should_profile("wrong") and not profiler.should_profile(None)
+
+    result, path = profiler.run(slow_regex_stage, "does PS11752778 fit WDT780SAEM1", request_id="req123")
+    assert result["intent"] == "compatibility"
+    assert path.endswith("_compatibility_req123.folded")
+
+    lines = Path(path).read_text().splitlines()
+    print(f"🔥 {len(lines)} distinct stacks, top: {lines[0][-80:]}")
+    assert all(re.match(r"^chat \[intent=compatibility request=req123 .*\];.* \d+$", line) for line in lines)
+    assert any("slow_regex_stage (tests/test_profiling.py:" in line for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) > 10
+
+
+def test_worker_threads_are_sampled(tmp_path):
+    """Work handed to a pool thread shows up under that thread's name, not as an opaque wait"""
+    print("🧪 Testing worker-thread sampling...")
+
+    from concurrent.futures import ThreadPoolExecutor
+    import contextvars
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-call")
+
+    def decode_on_worker():
+        with sampled_thread(current_profile()):
+            slow_regex_stage("PS11752778")
+
+    def pipeline():
+        pool.submit(contextvars.copy_context().run, decode_on_worker).result()
+        return {"intent": "qna"}
+
+    profiler = RequestProfiler(admin_token="secret", interval_ms=2, output_dir=str(tmp_path))
+    _, path = profiler.run(pipeline, request_id="req456")
+    pool.shutdown()
+
+    lines = Path(path).read_text().splitlines()
+    assert any(";[llm-call_0];" in line and "slow_regex_stage" in line for line in lines)
+    assert not profiler.is_admin("wrong") and profiler.is_admin("secret")
+
+
+def test_concurrency_cap_skips_profiling(tmp_path):
+    """Past max_concurrent, requests run unprofiled instead of waiting"""
+    profiler = RequestProfiler(admin_token="secret", interval_ms=2, max_concurrent=1, output_dir=str(tmp_path))
+    release = threading.Event()
+
+    def blocked():
+        release.wait(2)
+        return {"intent": "qna"}
+
+    first = threading.Thread(target=profiler.run, args=(blocked,))
+    first.start()
+    time.sleep(0.05)
+
+    result, path = profiler.run(lambda: {"intent": "qna"})
+    release.set()
+    first.join()
+
+    assert result == {"intent": "qna"} and path is None
+    assert profiler.skipped_busy_count == 1 and profiler.profiled_count == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_profile_is_written_as_folded_stacks(Path(tempfile.mkdtemp()))
+    test_worker_threads_are_sampled(Path(tempfile.mkdtemp()))
+    print("\n✅ Profiling tests complete!")
@@ -0,0 +1,69 @@
+"""
+Test the precompiled prompt templates and prompt-cache usage tracking
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.prompt_service import PROMPT_TEMPLATES, get_prompt_template
+from services.external_api import deepseek_client
+
+
+def test_static_prefix_is_byte_identical():
+    """Two different requests must share the system prompt and the head of the user prompt"""
+    print("🧪 Testing stable prompt prefixes...")
+
+    template = get_prompt_template("compatibility")
+    first = template.render_user_prompt("Does PS1 fit WDT780SAEM1?", "COMPATIBILITY DATA RETRIEVED:\n- A")
+    second = template.render_user_prompt("Will PS2 fit KDTM354DSS5?", "COMPATIBILITY DATA RETRIEVED:\n- B")
+
+    assert get_prompt_template("compatibility") is template  # built once, not per call
+    assert first.startswith(template.user_prefix) and second.startswith(template.user_prefix)
+    # the variable parts come last: the query is the tail of the prompt
+    assert first.endswith("User Question: Does PS1 fit WDT780SAEM1?")
+    print(f"📏 Shared user prefix: {len(template.user_prefix)} chars")
+
+    assert set(PROMPT_TEMPLATES) == {"compatibility", "troubleshoot", "qna", "installation"}
+    assert get_prompt_template("unknown").system_prompt == "You are a helpful appliance parts assistant."
+
+
+def test_cache_hit_tokens_are_recorded(monkeypatch):
+    """The usage block's prompt-cache fields should be returned and accumulated"""
+    print("🧪 Testing prompt cache usage tracking...")
+
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {
+                "choices": [{"message": {"content": " YES "}}],
+                "usage": {"prompt_tokens": 900, "completion_tokens": 20,
+                          "prompt_cache_hit_tokens": 640, "prompt_cache_miss_tokens": 260},
+            }
+
+    monkeypatch.setattr(deepseek_client.requests, "post", lambda *args, **kwargs: FakeResponse())
+
+    client = deepseek_client.DeepSeekClient()
+    client.api_key = "test-key"
+    before = deepseek_client.get_usage_stats()
+
+    completion = client.chat_completion("system", "user")
+    after = deepseek_client.get_usage_stats()
+
+    assert completion["content"] == "YES"
+    assert completion["usage"]["prompt_cache_hit_tokens"] == 640
+    assert after["prompt_cache_hit_tokens"] - before["prompt_cache_hit_tokens"] == 640
+    assert after["requests"] - before["requests"] == 1
+    print(f"📊 Usage stats: {after}")
+
+
+if __name__ == "__main__":
+    test_static_prefix_is_byte_identical()
+    print("\n✅ Prompt template tests complete! (run with pytest for the usage test)")
@@ -0,0 +1,118 @@
+"""
+Test request deadlines, circuit breakers and graceful degradation
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    get_circuit_breaker,
+    semantic_search_skip_reason,
+)
+from services.resilience import circuit_breaker as circuit_breaker_module
+from services.intent_service import IntentService
+
+
+def test_deadline_budgets():
+    """Stage budgets are a share of what's left and never exceed it"""
+    print("🧪 Testing deadline budgets...")
+
+    deadline = Deadline(2.0)
+    assert 0.9 < deadline.budget(0.5) <= 1.0
+    assert deadline.budget(0.01, minimum_s=0.5) >= 0.5
+    assert deadline.budget(1.0, maximum_s=0.25) == 0.25
+    assert not deadline.expired()
+
+    short = Deadline.from_ms(20)
+    time.sleep(0.03)
+    assert short.expired() and short.remaining() == 0.0
+    assert short.budget(1.0, minimum_s=5.0) == 0.0
+
+    try:
+        short.check("generation")
+        assert False, "expected DeadlineExceeded"
+    except Exception as e:
+        print(f"✅ {e}")
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """closed → open after N failures → half-open trial → closed"""
+    print("🧪 Testing circuit breaker transitions...")
+
+    breaker = CircuitBreaker("test-upstream", failure_threshold=3, recovery_timeout_s=0.05)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    try:
+        breaker.check()
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()        # the single trial call
+    assert not breaker.allow()    # everyone else still fails fast
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["rejected_count"] == 2
+
+
+def test_failed_trial_reopens():
+    """A failed half-open trial re-opens the breaker immediately"""
+    breaker = CircuitBreaker("test-trial", failure_threshold=5, recovery_timeout_s=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_semantic_search_skipped_under_pressure(monkeypatch):
+    """Semantic search is dropped near the deadline or when embeddings are down"""
+    print("🧪 Testing semantic search degradation...")
+
+    monkeypatch.setattr(circuit_breaker_module, "_breakers", {})
+
+    assert semantic_search_skip_reason(Deadline(30.0), "test-embed") is None
+    assert semantic_search_skip_reason(Deadline(0.5), "test-embed") == "semantic_search_skipped:deadline"
+
+    breaker = get_circuit_breaker("embeddings:test-embed")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert semantic_search_skip_reason(Deadline(30.0), "test-embed") == "semantic_search_skipped:embeddings_circuit_open"
+
+
+def test_intent_outage_is_degraded_not_out_of_scope():
+    """A failing classifier answers as the fallback intent and says so, instead of refusing"""
+    print("🧪 Testing intent classification outage...")
+
+    class DownClient:
+        def chat_with_system(self, *args, **kwargs):
+            raise CircuitOpenError("circuit for llm:deepseek is open")
+
+    service = IntentService(batching=False)
+    service.deepseek_client = DownClient()
+    classified = service.classify("Is my dishwasher's drain pump covered?", deadline=Deadline(5.0))
+    print(f"🎯 {classified}")
+    assert classified == {"intent": "qna", "degraded": ["intent_unavailable"]}
+
+
+if __name__ == "__main__":
+    test_deadline_budgets()
+    test_circuit_breaker_opens_and_recovers()
+    test_failed_trial_reopens()
+    test_intent_outage_is_degraded_not_out_of_scope()
+    print("\n✅ Resilience tests complete!")
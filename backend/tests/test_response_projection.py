@@ -0,0 +1,85 @@
+"""
+Test /chat response projection views and the orjson response class
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.response_service import FastJSONResponse, build_cards, project_chat_response
+
+COMPATIBILITY_RESPONSE = {
+    "response": "Yes, part PS1 is compatible with model WDT780SAEM1.",
+    "intent": "compatibility",
+    "model": None,
+    "answer_mode": "template",
+    "degraded": [],
+    "usage": None,
+    "retrieved_data": {
+        "direct_lookup": {"direct_matches": [
+            {"type": "part_to_models", "part_number": "PS1", "compatible_models": [f"M{i}" for i in range(400)], "count": 400},
+            {"type": "cross_check", "cross_check_results": [
+                {"part_number": "PS1", "model_number": "WDT780SAEM1", "is_compatible": True, "confidence": "VERY_HIGH"}
+            ]},
+        ]},
+        "semantic_search": {
+            "documents": [["long document text " * 50, "another"]],
+            "metadatas": [[
+                {"source": "compatibility", "part_number": "PS1", "title": "Pump", "url": "https://example.com/PS1"},
+                {"source": "compatibility", "part_number": "PS2", "title": "Valve", "url": "", "notes": "x"},
+            ]],
+            "distances": [[0.1, 0.23456789]],
+        },
+    },
+}
+
+
+def test_views():
+    """answer drops retrieval data, cards keeps compact cards, debug keeps everything"""
+    print("🧪 Testing response views...")
+
+    answer = project_chat_response(COMPATIBILITY_RESPONSE, "answer")
+    assert set(answer) == {"response", "intent", "model", "answer_mode", "degraded"}
+
+    debug = project_chat_response(COMPATIBILITY_RESPONSE, "debug")
+    assert debug is COMPATIBILITY_RESPONSE
+
+    cards = project_chat_response(COMPATIBILITY_RESPONSE, "cards")
+    full_size = len(FastJSONResponse(debug).body)
+    cards_size = len(FastJSONResponse(cards).body)
+    print(f"📦 debug {full_size} bytes → cards {cards_size} bytes")
+    assert cards_size < full_size / 4
+
+
+def test_cards_are_capped_and_deduplicated():
+    """Long model lists are capped; semantic hits already covered by a direct match are dropped"""
+    cards = build_cards(COMPATIBILITY_RESPONSE["retrieved_data"], max_list_items=10)
+
+    assert cards[0]["type"] == "part_to_models"
+    assert len(cards[0]["compatible_models"]) == 10 and cards[0]["count"] == 400
+    assert cards[1]["results"] == [{"part_number": "PS1", "model_number": "WDT780SAEM1", "is_compatible": True}]
+
+    semantic = [c for c in cards if c["type"] == "compatibility"]
+    assert [c["part_number"] for c in semantic] == ["PS2"]
+    assert "url" not in semantic[0] and semantic[0]["distance"] == 0.2346
+
+
+def test_qna_results_become_part_cards():
+    """qna returns raw Chroma results; parts metadata becomes part cards"""
+    data = {
+        "documents": [["Pump — drains water | brand: Whirlpool | part_id: PS3"]],
+        "metadatas": [[{"part_id": "PS3", "title": "Pump", "brand": "Whirlpool", "price": 52.44, "description": "long"}]],
+        "distances": [[0.3]],
+    }
+    assert build_cards(data) == [{"type": "part", "part_number": "PS3", "title": "Pump", "brand": "Whirlpool", "price": 52.44, "distance": 0.3}]
+    assert build_cards(None) == []
+
+
+if __name__ == "__main__":
+    test_views()
+    test_cards_are_capped_and_deduplicated()
+    test_qna_results_become_part_cards()
+    print("\n✅ Response projection tests complete!")
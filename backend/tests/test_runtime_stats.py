@@ -0,0 +1,119 @@
+"""
+Test the runtime internals behind /debug/runtime
+"""
+
+import asyncio
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from services.metrics_service import record_cache_event
+from services.runtime_service import EventLoopLagMonitor, approx_size, open_connections
+from services.runtime_service.runtime_stats import cache_event_stats, cached_size, collect_runtime_stats, executor_stats
+
+
+def test_map_sizes_are_cached_until_the_map_changes():
+    """Deep sizes grow with content and are only recomputed on a length change"""
+    print("🧪 Testing approximate map sizes...")
+
+    small = {"PS1": ["M1"]}
+    large = {f"PS{i}": [f"MODEL{j}" for j in range(20)] for i in range(100)}
+    assert approx_size(large) > approx_size(small) > sys.getsizeof(small)
+
+    mapping = {"PS1": ["M1"]}
+    first = cached_size(mapping)
+    mapping["PS1"].append("M2" * 1000)  # same length: cached value kept
+    assert cached_size(mapping) == first
+    mapping["PS2"] = []
+    assert cached_size(mapping) > first
+
+
+def test_cache_hit_rates_from_counters():
+    """Per-cache hit rates come from the Prometheus cache counter"""
+    print("🧪 Testing cache hit rates...")
+
+    for hit in (True, True, True, False):
+        record_cache_event("test_runtime_cache", hit)
+    stats = cache_event_stats()["test_runtime_cache"]
+    assert stats["hits"] == 3 and stats["misses"] == 1 and stats["hit_rate"] == 0.75
+
+
+def test_event_loop_lag_detects_blocking():
+    """A coroutine that blocks the loop shows up as lag"""
+    print("🧪 Testing event-loop lag monitor...")
+
+    monitor = EventLoopLagMonitor(interval_ms=10)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    stats = monitor.get_stats()
+    print(f"⏱️ lag p50 {stats['p50_ms']}ms max {stats['max_ms']}ms")
+    assert stats["samples"] >= 2 and stats["max_ms"] >= 50
+
+
+def test_executor_queue_depth_and_connections():
+    """Executor backlog and this process's outbound TCP connections are reported"""
+    print("🧪 Testing executor and connection stats...")
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(time.sleep, 0.2)
+    for _ in range(3):
+        executor.submit(time.sleep, 0)
+    stats = executor_stats(executor)
+    assert stats["max_workers"] == 1 and stats["queue_depth"] == 3
+    executor.shutdown(wait=True)
+
+    if not Path("/proc/net/tcp").exists():
+        return
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    client = socket.create_connection(server.getsockname())
+    accepted, _ = server.accept()
+    try:
+        connections = open_connections()
+        port = server.getsockname()[1]
+        assert connections["upstream"].get(f"127.0.0.1:{port}") == 1
+        assert connections["inbound"] >= 1
+    finally:
+        for s in (client, accepted, server):
+            s.close()
+
+
+def test_snapshot_does_not_build_retrievers(monkeypatch):
+    """Retrievers nobody has built yet are reported as not loaded, not constructed on the loop"""
+    print("🧪 Testing snapshot with cold retrievers...")
+
+    from services.retrievers.compatibility_retriever import compatibility_retriever
+    from services.retrievers.installation_retriever import installation_retriever
+
+    def forbidden():
+        raise AssertionError("the snapshot must not build a retriever")
+
+    for module, cls in ((compatibility_retriever, "CompatibilityRetriever"), (installation_retriever, "InstallationRetriever")):
+        monkeypatch.setattr(module, "_retriever_instance", None)
+        monkeypatch.setattr(module, cls, forbidden)
+
+    maps = collect_runtime_stats()["maps"]
+    assert maps["parts_to_models"] == {"loaded": False}
+    assert maps["installation_passages"] == {"loaded": False}
+
+
+if __name__ == "__main__":
+    test_map_sizes_are_cached_until_the_map_changes()
+    test_cache_hit_rates_from_counters()
+    test_event_loop_lag_detects_blocking()
+    test_executor_queue_depth_and_connections()
+    print("\n✅ Runtime stats tests complete!")
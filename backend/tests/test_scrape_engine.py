@@ -0,0 +1,194 @@
+"""
+Test the shared scraping engine: AIMD throttle, resource blocking, and
+run/map retries (with a fake page pool, so no browser is needed)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend and the scrape scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "scrape"))
+
+from scrape_engine import AIMDThrottle, ScrapeEngine, in_order, is_blocked
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    async def all_headers(self):
+        return {"retry-after": "0.05"} if self.status == 429 else {}
+
+
+class FakePage:
+    def __init__(self, site):
+        self.site = site
+        self.url = None
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        self.url = url
+        return await self.site.visit(url)
+
+    async def wait_for_selector(self, selector, timeout=None, state=None):
+        if self.url in self.site.empty:
+            raise TimeoutError(selector)
+        return True
+
+
+class FakeSite:
+    """Answers 200 after `latency`; urls in `flaky` get a 429 first, urls in `empty` never show the selector"""
+
+    def __init__(self, latency=0.01, flaky=(), empty=()):
+        self.latency = latency
+        self.flaky = set(flaky)
+        self.empty = set(empty)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.visits = []
+
+    async def visit(self, url):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.visits.append(url)
+        try:
+            await asyncio.sleep(self.latency)
+            if url in self.flaky:
+                self.flaky.discard(url)
+                return FakeResponse(429)
+            return FakeResponse(200)
+        finally:
+            self.in_flight -= 1
+
+
+class FakePool:
+    blocked_requests = 0
+
+    def __init__(self, site, size):
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait({"page": FakePage(site), "uses": 0})
+
+    async def acquire(self):
+        return await self.idle.get()
+
+    async def release(self, slot, broken=False):
+        await self.idle.put(slot)
+
+    async def close(self):
+        pass
+
+
+def test_aimd_increases_and_backs_off():
+    """+1 per clean fast window, halve on errors/slow windows, once per cooldown"""
+    print("🧪 Testing AIMD throttle...")
+
+    throttle = AIMDThrottle(initial=2, max_limit=6, target_latency_s=1.0, window=5, cooldown_s=60)
+    for _ in range(5 * 10):
+        throttle.record(0.2)
+    assert throttle.limit == 6 and throttle.stats["peak_limit"] == 6
+
+    throttle.record(0.2, ok=False)
+    assert throttle.limit == 3
+    throttle.record(0.2, status=429)  # same burst, inside the cooldown
+    assert throttle.limit == 3
+
+    slow = AIMDThrottle(initial=4, window=3, target_latency_s=1.0, cooldown_s=0)
+    for _ in range(3):
+        slow.record(5.0)
+    assert slow.limit == 2
+
+    paused = AIMDThrottle(initial=2)
+    paused.record(0.1, status=429, retry_after_s=30)
+    assert paused.paused_until > time.monotonic() + 25
+    print("✅ Limit follows latency and errors")
+
+
+def test_resource_blocking():
+    """Images, fonts and trackers are blocked; documents and scripts are not"""
+    print("🧪 Testing resource blocking...")
+
+    assert is_blocked("image", "https://www.partselect.com/img/part.jpg")
+    assert is_blocked("font", "https://www.partselect.com/fonts/x.woff2")
+    assert is_blocked("script", "https://www.googletagmanager.com/gtm.js")
+    assert is_blocked("xhr", "https://stats.g.doubleclick.net/collect")
+    assert not is_blocked("document", "https://www.partselect.com/PS11752778.htm")
+    assert not is_blocked("script", "https://www.partselect.com/js/app.js")
+
+
+def test_map_respects_throttle_and_retries():
+    """Pages in flight never exceed the throttle limit; a 429 is retried"""
+    print("🧪 Testing engine run/map...")
+
+    async def scenario():
+        site = FakeSite(latency=0.01, flaky={"https://x/3"})
+        engine = ScrapeEngine(max_concurrency=4, initial_concurrency=2, max_retries=2)
+        engine.throttle.window = 5
+        engine.pool = FakePool(site, 4)
+        engine._started = time.perf_counter()
+
+        async def extract(page, url):
+            return url.rsplit("/", 1)[-1]
+
+        urls = [f"https://x/{i}" for i in range(40)]
+        results = {url: value async for url, value in engine.map(urls, extract, wait_for="h1")}
+        return site, engine, urls, results
+
+    site, engine, urls, results = asyncio.run(scenario())
+    assert results == {url: url.rsplit("/", 1)[-1] for url in urls}
+    assert site.visits.count("https://x/3") == 2
+    assert engine.stats["throttled"] == 1 and engine.stats["retries"] == 1 and engine.stats["failed"] == 0
+    assert site.max_in_flight <= engine.throttle.stats["peak_limit"] <= 4
+    print(f"✅ {engine.summary()}")
+
+
+def test_missing_optional_selector_is_an_empty_page():
+    """A listing without cards yields the handler's empty result: no retries, no back-off"""
+    print("🧪 Testing optional selectors...")
+
+    async def scenario():
+        site = FakeSite(empty={"https://x/empty"})
+        engine = ScrapeEngine(max_concurrency=2, initial_concurrency=2, max_retries=2)
+        engine.pool = FakePool(site, 2)
+        engine._started = time.perf_counter()
+
+        async def cards(page, url):
+            return [] if url in site.empty else [url + "/PS1"]
+
+        optional = await engine.run("https://x/empty", cards, wait_for="a.card", wait_optional=True)
+        required = await engine.run("https://x/empty", cards, wait_for="a.card")
+        return site, engine, optional, required
+
+    site, engine, optional, required = asyncio.run(scenario())
+    assert optional == [] and required is None
+    # one visit for the optional wait, 1 + 2 retries for the required one
+    assert site.visits.count("https://x/empty") == 4
+    assert engine.stats["pages"] == 1 and engine.stats["failed"] == 1
+
+
+def test_in_order_restores_crawl_order():
+    """Results finishing out of order are re-yielded in url order"""
+    print("🧪 Testing in-order streaming...")
+
+    async def scenario():
+        urls = [f"https://x/{i}" for i in range(5)]
+
+        async def finished_out_of_order():
+            for i in (2, 0, 4, 1, 3):
+                yield urls[i], i
+
+        return [value async for _, value in in_order(finished_out_of_order(), urls)]
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+
+
+if __name__ == "__main__":
+    test_aimd_increases_and_backs_off()
+    test_resource_blocking()
+    test_map_respects_throttle_and_retries()
+    test_missing_optional_selector_is_an_empty_page()
+    test_in_order_restores_crawl_order()
+    print("\n✅ Scrape engine tests complete!")
@@ -0,0 +1,117 @@
+"""
+Test the streaming CSV ingest: chunked parsing, compact dedupe and bounded queues
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import chromadb
+
+# Add backend and the ingest scripts to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+sys.path.append(str(backend_path / "scripts" / "ingest"))
+
+from embedding_pipeline import EmbeddingPipeline, prefetch
+from incremental import CompactIdSet, sync_stream
+from ingest_parts import iter_csv_items
+
+
+class FakeEmbeddings:
+    def create(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[1.0, 0.0]) for i in range(len(input))])
+
+
+def _write_csv(path: Path, rows: int, duplicate_every: int = 0):
+    lines = ["title,description,brand,part_id,price"]
+    for i in range(rows):
+        part_id = f"PS{i - 1 if duplicate_every and i and i % duplicate_every == 0 else i}"
+        lines.append(f"Part {i},Description {i},Whirlpool,{part_id},{i}.99")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_is_read_in_chunks():
+    """The CSV is parsed a chunk at a time with the same document text as before"""
+    print("🧪 Testing chunked CSV parsing...")
+
+    csv_path = Path(__file__).parent / "_stream_test.csv"
+    try:
+        _write_csv(csv_path, 25)
+        chunks = list(iter_csv_items(csv_path, chunk_rows=10))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        first = chunks[0][0]
+        assert first["id"] == "PS0"
+        assert first["text"] == "Part 0 — Description 0 | brand: Whirlpool | part_id: PS0"
+        assert first["metadata"]["price"] == 0.99
+    finally:
+        csv_path.unlink(missing_ok=True)
+
+
+def test_prefetch_is_bounded_and_propagates_errors():
+    """The reader never runs more than `maxsize` chunks ahead; its errors surface"""
+    print("🧪 Testing bounded prefetch...")
+
+    produced = []
+
+    def producer():
+        for i in range(50):
+            produced.append(i)
+            yield i
+
+    consumed = 0
+    for _ in prefetch(producer(), maxsize=3):
+        consumed += 1
+        time.sleep(0.005)
+        assert len(produced) - consumed <= 3 + 1  # queue + the item in the producer's hand
+    assert consumed == 50
+
+    def failing():
+        yield 1
+        raise ValueError("bad row")
+
+    try:
+        list(prefetch(failing(), maxsize=2))
+        raise AssertionError("expected the producer error")
+    except ValueError:
+        pass
+
+    # abandoning the consumer stops the reader thread
+    before = threading.active_count()
+    for _ in prefetch(iter(range(1000)), maxsize=2):
+        break
+    time.sleep(0.3)
+    assert threading.active_count() <= before
+
+
+def test_stream_sync_dedupes_across_chunks():
+    """Duplicate ids in different chunks are dropped (first wins) by the compact seen-set"""
+    print("🧪 Testing streaming sync with duplicates...")
+
+    seen = CompactIdSet()
+    assert seen.add("PS1") and not seen.add("PS1") and "PS1" in seen and len(seen) == 1
+
+    collection = chromadb.EphemeralClient().get_or_create_collection("test_streaming_ingest")
+    pipeline = EmbeddingPipeline(SimpleNamespace(embeddings=FakeEmbeddings()), concurrency=2, batch_tokens=30)
+    chunks = [
+        [{"id": f"PS{i}", "text": f"part {i}", "metadata": {"n": i}} for i in range(0, 10)],
+        [{"id": f"PS{i}", "text": f"part {i} again", "metadata": {"n": -i}} for i in range(5, 15)],
+    ]
+    result = sync_stream(collection, iter(chunks), pipeline)
+
+    assert result["duplicates"] == 5 and result["embedded"] == 15
+    assert collection.count() == 15
+    assert collection.get(ids=["PS7"])["documents"] == ["part 7"]
+
+    # a second pass with fewer ids prunes the rest, one page at a time
+    result = sync_stream(collection, iter([chunks[0]]), pipeline)
+    assert result["unchanged"] == 10 and result["deleted"] == 5 and collection.count() == 10
+
+
+if __name__ == "__main__":
+    test_csv_is_read_in_chunks()
+    test_prefetch_is_bounded_and_propagates_errors()
+    test_stream_sync_dedupes_across_chunks()
+    print("\n✅ Streaming ingest tests complete!")
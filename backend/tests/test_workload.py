@@ -0,0 +1,63 @@
+"""
+Test the catalog-grounded workload generator
+"""
+
+import json
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from benchmarks.workload import WorkloadGenerator, ZipfSampler, parse_mix
+
+
+def test_same_seed_same_workload():
+    """A workload is reproducible from its seed"""
+    print("🧪 Testing workload reproducibility...")
+    assert WorkloadGenerator(seed=11).generate(200) == WorkloadGenerator(seed=11).generate(200)
+    assert WorkloadGenerator(seed=11).generate(50) != WorkloadGenerator(seed=12).generate(50)
+
+
+def test_queries_use_real_identifiers():
+    """Cross-checks pair mapped parts with models; installation hits the manual"""
+    parts_to_models = json.loads((backend_path / "data" / "maps" / "parts_to_models.json").read_text())
+    manual = json.loads((backend_path / "data" / "maps" / "installation_manual.json").read_text())
+
+    queries = WorkloadGenerator(seed=3, mismatch_rate=0.0).generate(500)
+    for q in queries:
+        ids = q["identifiers"]
+        if q["path"] == "compatibility_cross_check":
+            assert ids["model_number"] in parts_to_models[ids["part_number"]]
+            assert ids["part_number"] in q["query"] and ids["model_number"] in q["query"]
+        elif q["path"] == "installation_manual":
+            assert ids["part_number"] in manual
+
+
+def test_mix_weights_are_respected():
+    """The intent mix follows the requested weights"""
+    queries = WorkloadGenerator(seed=5, mix=parse_mix("compatibility=0.75,out_of_scope=0.25")).generate(2000)
+    counts = Counter(q["intent"] for q in queries)
+    print(f"📊 {dict(counts)}")
+    assert set(counts) == {"compatibility", "out_of_scope"}
+    assert 0.70 < counts["compatibility"] / 2000 < 0.80
+
+
+def test_zipf_skew():
+    """With s > 1 the most popular item dominates; s = 0 is roughly uniform"""
+    skewed = ZipfSampler(range(100), 1.2, random.Random(1))
+    top_share = Counter(skewed.sample() for _ in range(5000)).most_common(1)[0][1] / 5000
+    uniform = ZipfSampler(range(100), 0.0, random.Random(1))
+    uniform_top = Counter(uniform.sample() for _ in range(5000)).most_common(1)[0][1] / 5000
+    assert top_share > 0.2 and uniform_top < 0.05
+
+
+if __name__ == "__main__":
+    test_same_seed_same_workload()
+    test_queries_use_real_identifiers()
+    test_mix_weights_are_respected()
+    test_zipf_skew()
+    print("\n✅ Workload tests complete!")